@@ -1,6 +1,8 @@
 from main.args import get_debug
 from main.options import AAPAConfigOptions, AAPAProcessingOptions, ArgumentOption, get_options_from_commandline
 from main.log import init_logging
+from database.classes.sql_stats import report_statement_statistics
+from debug.index_advisor import report_index_advice
 from process.general.preview import Preview
 from process.main.aapa_config import AAPAConfiguration, LOGFILENAME
 from process.main.aapa_processor import AAPAProcessor, AAPARunnerContext
@@ -20,4 +22,6 @@ class AAPARunner:
 if __name__=='__main__':
     init_logging(LOGFILENAME, get_debug())
     aapa_runner = AAPARunner(get_options_from_commandline(ArgumentOption.CONFIG))
-    aapa_runner.process(get_options_from_commandline(ArgumentOption.PROCES)) 
+    aapa_runner.process(get_options_from_commandline(ArgumentOption.PROCES))
+    report_statement_statistics()
+    report_index_advice() 
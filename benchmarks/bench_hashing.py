@@ -0,0 +1,50 @@
+""" BENCH_HASHING
+
+    Benchmark: hashing a synthetic tree of PDF files one at a time (for every digest algorithm)
+    and with hash_many (see general/filehash.py) for a number of thread counts.
+
+    The digest cache is disabled, so every file is actually hashed.
+    The files are created in a temporary directory (on the same drive as the system temp directory).
+
+    usage: python -m benchmarks.bench_hashing [number of files] [file size in KB]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from general.digest_cache import digest_cache
+from general.filehash import DIGEST_ALGORITHMS, hash_file_digest, hash_many
+
+THREADS = [2, 4, 8]
+
+def create_tree(root: Path, n_files: int, size_kb: int)->list[Path]:
+    result = []
+    for n in range(n_files):
+        directory = root.joinpath(f'student {n // 20}', f'{n % 4}. Mijlpaal')
+        directory.mkdir(parents=True, exist_ok=True)
+        result.append(filename := directory.joinpath(f'file_{n}.pdf'))
+        filename.write_bytes(os.urandom(size_kb * 1024))
+    return result
+
+def run(n_files: int, size_kb: int):
+    digest_cache.enabled = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = create_tree(Path(tmp_dir), n_files, size_kb)
+        print(f'{n_files} files of {size_kb} KB')
+        print(f'{"method":14} {"seconds":>9} {"MB/s":>9}')
+        megabytes = n_files * size_kb / 1024
+        for algorithm in DIGEST_ALGORITHMS:
+            start = time.perf_counter()
+            for filename in files:
+                hash_file_digest(filename, algorithm)
+            seconds = time.perf_counter() - start
+            print(f'{algorithm:14} {seconds:9.2f} {megabytes/seconds:9.0f}')
+        for threads in THREADS:
+            start = time.perf_counter()
+            hash_many(files, threads=threads)
+            seconds = time.perf_counter() - start
+            print(f'{f"hash_many({threads})":14} {seconds:9.2f} {megabytes/seconds:9.0f}')
+
+if __name__=='__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 256)
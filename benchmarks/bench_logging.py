@@ -0,0 +1,74 @@
+""" BENCH_LOGGING
+
+    Benchmark: throughput of a FilePipeline with logging disabled, with synchronous logging
+    and with asynchronous (queue-based) logging, see AAPAlogger in main/log.py.
+
+    The pipeline stores a File record for every file, with debug logging enabled when logging is on.
+    Every mode runs in a separate process, because logging can only be initialized once per process.
+    The database and the files are created in a temporary directory.
+
+    usage: python -m benchmarks.bench_logging [number of files]
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODES = ['off', 'sync', 'async']
+
+def run_pipeline(mode: str, n_files: int)->float:
+    from main.config import config
+    from main.log import init_logging, stop_logging
+    if mode != 'off':
+        previous = config.get('logging', 'asynchronous')
+        config.set('logging', 'asynchronous', mode == 'async')
+        init_logging('bench_logging', debug=True)
+        config.set('logging', 'asynchronous', previous) # do not change the configuration file
+    from database.aapa_database import AAPaDatabase, AAPaSchema
+    from data.classes.files import File
+    from data.classes.undo_logs import UndoLog
+    from main.options import AAPAProcessingOptions
+    from process.general.base_processor import FileProcessor
+    from process.general.pipeline import FilePipeline
+    from storage.aapa_storage import AAPAStorage
+
+    class BenchFileProcessor(FileProcessor):
+        def process_file(self, filename: str, storage: AAPAStorage, preview = False, **kwargs)->File:
+            return File(filename, filetype=File.Type.UNKNOWN)
+    class BenchFilePipeline(FilePipeline):
+        def _store_new(self, file: File):
+            self.storage.create('files', file)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for n in range(n_files):
+            files.append(filename := Path(tmp_dir).joinpath(f'file_{n}.pdf'))
+            filename.write_text(f'file {n}')
+        storage = AAPAStorage(AAPaDatabase.create_from_schema(AAPaSchema(), str(Path(tmp_dir).joinpath('bench.db'))))
+        pipeline = BenchFilePipeline('bench', BenchFileProcessor(), storage, activity=UndoLog.Action.NOLOG,
+                                     processing_mode=AAPAProcessingOptions.PROCESSINGMODE.AANVRAGEN)
+        start = time.perf_counter()
+        pipeline.process(files)
+        seconds = time.perf_counter() - start
+        stop_logging()
+        storage.database.close()
+    return seconds
+
+def run(n_files: int):
+    print(f'{"logging":8} {"files":>6} {"seconds":>9} {"files/s":>9}')
+    for mode in MODES:
+        result = subprocess.run([sys.executable, '-m', 'benchmarks.bench_logging', str(n_files), mode],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f'{mode:8} failed:\n{result.stderr}')
+            continue
+        seconds = float(result.stdout.strip().split('\n')[-1])
+        print(f'{mode:8} {n_files:6} {seconds:9.2f} {n_files/seconds:9.0f}')
+
+if __name__=='__main__':
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    if len(sys.argv) > 2:
+        print(run_pipeline(sys.argv[2], n_files))
+    else:
+        run(n_files)
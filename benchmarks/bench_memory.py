@@ -0,0 +1,72 @@
+""" BENCH_MEMORY
+
+    Benchmark: memory used by the domain objects (Student, Aanvraag, Verslag, File)
+    after loading a complete synthetic database through AAPAStorage.
+
+    The database (in a temporary directory) contains the given number of files,
+    10 files for every aanvraag or verslag. Reported is the memory allocated (tracemalloc)
+    while reading all aanvragen and verslagen with their students, bedrijven and files.
+
+    usage: python -m benchmarks.bench_memory [number of files]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from database.aapa_database import AAPaDatabase, AAPaSchema
+from database.classes.database import Database
+from data.classes.files import File
+from data.general.class_codes import ClassCodes
+from data.general.const import AanvraagStatus, MijlpaalType
+from storage.aapa_storage import AAPAStorage
+
+FILES_PER_MIJLPAAL = 10
+DATUM = '2024-03-01 12:00:00'
+
+def create_database(database: Database, n_files: int)->tuple[list[int],list[int]]:
+    n_mijlpalen = max(n_files // FILES_PER_MIJLPAAL, 2)
+    n_aanvragen = n_mijlpalen // 2
+    database._execute_many_sql_command('insert into BEDRIJVEN (id,name) values (?,?)', [[n, f'bedrijf {n}'] for n in range(1, 101)])
+    database._execute_many_sql_command('insert into STUDENTEN (id,stud_nr,full_name,first_name,email,status) values (?,?,?,?,?,?)',
+                                       [[n, f'{n:07}', f'Student {n}', 'Student', f'student.{n}@student.nhlstenden.com', 0] for n in range(1, n_aanvragen+1)])
+    aanvragen = list(range(1, n_aanvragen+1))
+    database._execute_many_sql_command('insert into AANVRAGEN (id,datum,stud_id,bedrijf_id,titel,kans,status,beoordeling,datum_str,versie) values (?,?,?,?,?,?,?,?,?,?)',
+                                       [[n, DATUM, n, n % 100 + 1, f'titel {n}', 1, int(AanvraagStatus.READY), 0, '1 maart 2024', 1] for n in aanvragen])
+    verslagen = list(range(1, n_mijlpalen-n_aanvragen+1))
+    database._execute_many_sql_command('insert into VERSLAGEN (id,datum,stud_id,bedrijf_id,titel,kans,status,beoordeling,verslag_type,cijfer) values (?,?,?,?,?,?,?,?,?,?)',
+                                       [[n, DATUM, n, n % 100 + 1, f'titel {n}', 1, 0, 0, int(MijlpaalType.PVA), ''] for n in verslagen])
+    files = []
+    file_code = ClassCodes.classtype_to_code(File)
+    aanvraag_details = []
+    verslag_details = []
+    for n in range(n_mijlpalen*FILES_PER_MIJLPAAL):
+        mijlpaal = n // FILES_PER_MIJLPAAL
+        files.append([n+1, rf'C:\aapa\student {mijlpaal}\bestand {n}.pdf', DATUM, f'{n:064x}', int(File.Type.UNKNOWN), int(MijlpaalType.UNKNOWN)])
+        if mijlpaal < n_aanvragen:
+            aanvraag_details.append([mijlpaal+1, n+1, file_code])
+        else:
+            verslag_details.append([mijlpaal-n_aanvragen+1, n+1, file_code])
+    database._execute_many_sql_command('insert into FILES (id,filename,timestamp,digest,filetype,mijlpaal_type) values (?,?,?,?,?,?)', files)
+    database._execute_many_sql_command('insert into AANVRAGEN_DETAILS (aanvraag_id,detail_id,class_code) values (?,?,?)', aanvraag_details)
+    database._execute_many_sql_command('insert into VERSLAGEN_DETAILS (verslag_id,detail_id,class_code) values (?,?,?)', verslag_details)
+    database.commit()
+    return aanvragen, verslagen
+
+def run(n_files: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = AAPAStorage(AAPaDatabase.create_from_schema(AAPaSchema(), str(Path(tmp_dir).joinpath('bench.db'))))
+        aanvragen, verslagen = create_database(storage.database, n_files)
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = storage.read_many('aanvragen', set(aanvragen)) + storage.read_many('verslagen', set(verslagen))
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        n_loaded_files = sum(len(mijlpaal.files_list) for mijlpaal in loaded)
+        print(f'{"mijlpalen":>9} {"files":>7} {"seconds":>8} {"memory (MB)":>12} {"peak (MB)":>10} {"bytes/file":>11}')
+        print(f'{len(loaded):9} {n_loaded_files:7} {seconds:8.2f} {current/2**20:12.1f} {peak/2**20:10.1f} {current/max(n_loaded_files,1):11.0f}')
+        storage.database.close()
+
+if __name__=='__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
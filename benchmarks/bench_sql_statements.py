@@ -0,0 +1,92 @@
+""" BENCH_SQL_STATEMENTS
+
+    Micro-benchmark: overhead of the SQL for the statements used by the CRUDs.
+
+    baseline: the statement objects (SQLselect, SQE, ...) are built for every query, as in the baseline code.
+              These timings are measured with the code of a baseline revision (git archive, in a subprocess).
+    template: the Database methods with statement templates (database/classes/sql_cache.py):
+              the statement is built once per signature, a query only looks up the template and orders the parameters.
+
+    Only the Python side is measured, no database access.
+
+    usage: python -m benchmarks.bench_sql_statements [number] [baseline revision, default: the first commit]
+"""
+import json
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+KEYS = list(range(50))
+COLUMNS = ['id', 'stud_id', 'bedrijf_id', 'datum', 'titel', 'kans', 'status', 'beoordeling']
+VALUES = [42, 1, 2, '20240101', 'titel', 1, 0, 0]
+
+def _table():
+    from database.classes.table_def import TableDefinition
+    import database.classes.dbConst as dbc
+    table = TableDefinition('AANVRAGEN')
+    table.add_column('id', dbc.INTEGER, primary = True)
+    for column in COLUMNS[1:]:
+        table.add_column(column, dbc.TEXT)
+    return table
+
+def baseline_statements()->dict:
+    # only uses the statement classes as they are in the baseline
+    from database.classes.sql_expr import SQE, Ops
+    from database.classes.sql_table import SQLdelete, SQLinsert, SQLselect, SQLupdate
+    table = _table()
+    def _statement(sql):
+        return (sql.query, sql.parameters)
+    return {'select (key)': lambda: _statement(SQLselect(table, where=SQE('id', Ops.EQ, 42))),
+            'select (IN, 50 keys)': lambda: _statement(SQLselect(table, where=SQE('id', Ops.IN, KEYS, no_column_ref=True))),
+            'select (2 columns)': lambda: _statement(SQLselect(table, columns=['id'],
+                                                               where=SQE(SQE('stud_id', Ops.EQ, 42, no_column_ref=True), Ops.AND, SQE('status', Ops.EQ, 1, no_column_ref=True)))),
+            'insert': lambda: _statement(SQLinsert(table, columns=COLUMNS, values=VALUES)),
+            'update': lambda: _statement(SQLupdate(table, columns=COLUMNS[1:], values=VALUES[1:], where=SQE('id', Ops.EQ, 42))),
+            'delete': lambda: _statement(SQLdelete(table, where=SQE('id', Ops.EQ, 42))),
+            }
+
+def template_statements()->dict:
+    from database.classes.database import Database
+    class _NoDatabase(Database):
+        def __init__(self):
+            pass
+        def _execute_sql_command(self, string, parameters=None, return_values=False):
+            return (string, parameters)
+    database = _NoDatabase()
+    table = _table()
+    return {'select (key)': lambda: database.read_records_where(table, ['id'], [42]),
+            'select (IN, 50 keys)': lambda: database.read_records_where(table, ['id'], [KEYS]),
+            'select (2 columns)': lambda: database.read_records_where(table, ['stud_id', 'status'], [42, 1], columns=['id']),
+            'insert': lambda: database.create_record(table, COLUMNS, VALUES),
+            'update': lambda: database.update_record_where(table, COLUMNS[1:], VALUES[1:], ['id'], [42]),
+            'delete': lambda: database.delete_records_where(table, ['id'], [42]),
+            }
+
+def measure(statements: dict, number: int)->dict:
+    return {name: min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6 for name, statement in statements.items()}
+
+def measure_baseline(number: int, revision: str)->dict:
+    if not revision:
+        revision = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], capture_output=True, text=True, check=True).stdout.split()[0]
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        archive = subprocess.run(['git', 'archive', revision], capture_output=True, check=True).stdout
+        subprocess.run(['tar', '-x', '-C', baseline_dir], input=archive, check=True)
+        result = subprocess.run([sys.executable, str(Path(__file__).resolve()), str(number), '--measure-baseline'],
+                                cwd=baseline_dir, env={'PYTHONPATH': baseline_dir}, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def run(number: int, revision: str):
+    baseline = measure_baseline(number, revision)
+    template = measure(template_statements(), number)
+    print(f'{"statement":24} {"baseline (us)":>14} {"template (us)":>14} {"speedup":>8}')
+    for name in template:
+        print(f'{name:24} {baseline[name]:14.2f} {template[name]:14.2f} {baseline[name]/template[name]:7.1f}x')
+
+if __name__=='__main__':
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    if len(sys.argv) > 2 and sys.argv[2] == '--measure-baseline':
+        print(json.dumps(measure(baseline_statements(), number)))
+    else:
+        run(number, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,49 @@
+""" BENCH_SQLITE_PROFILE
+
+    Benchmark: commit throughput of a file import under each database performance profile
+    (see PERFORMANCE_PROFILES in database/classes/database.py).
+
+    Simulates the FilePipeline: one record is inserted in a FILES-like table and committed per file.
+    The database is created in a temporary directory (on the same drive as the system temp directory).
+
+    usage: python -m benchmarks.bench_sqlite_profile [number of files]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from database.classes.database import PERFORMANCE_PROFILES, Database
+from database.classes.table_def import TableDefinition
+import database.classes.dbConst as dbc
+
+class BenchFilesTableDefinition(TableDefinition):
+    def __init__(self):
+        super().__init__('FILES')
+        self.add_column('id', dbc.INTEGER, primary = True)
+        self.add_column('filename', dbc.TEXT)
+        self.add_column('timestamp', dbc.TEXT)
+        self.add_column('digest', dbc.TEXT)
+        self.add_column('filetype', dbc.INTEGER)
+        self.add_column('mijlpaal_type', dbc.INTEGER)
+
+def import_files(database: Database, table: TableDefinition, n_files: int)->float:
+    start = time.perf_counter()
+    for n in range(n_files):
+        database.create_record(table, columns=['id', 'filename', 'timestamp', 'digest', 'filetype', 'mijlpaal_type'], 
+                               values=[n+1, f'file_{n}.pdf', '2024-03-01 12:00:00', f'{n:064x}', 1, 1])
+        database.commit()
+    return time.perf_counter() - start
+
+def run(n_files: int):
+    print(f'{"profile":14} {"files":>6} {"seconds":>9} {"commits/s":>10}')
+    table = BenchFilesTableDefinition()
+    for profile in PERFORMANCE_PROFILES:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            database = Database(str(Path(tmp_dir).joinpath('bench.db')), _reset_flag=True, profile=profile)
+            database.create_table(table)
+            seconds = import_files(database, table, n_files)
+            database.close()
+        print(f'{profile:14} {n_files:6} {seconds:9.2f} {n_files/seconds:10.0f}')
+
+if __name__=='__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -12,17 +12,18 @@ from general.fileutil import summary_string
 class Aanvraag(MijlpaalGradeable):
     Beoordeling = MijlpaalGradeable.Beoordeling
     Status = AanvraagStatus
+    __slots__ = ('_datum_str', 'versie')
     def __init__(self, student: Student, bedrijf: Bedrijf = None, datum_str='', titel='', 
                  source_info: File = None, datum: datetime.datetime = None, 
                  beoordeling=Beoordeling.TE_BEOORDELEN, status=Status.NEW, id=EMPTY_ID, kans=0, versie=1):
         super().__init__(mijlpaal_type=MijlpaalType.AANVRAAG, 
                          student=student, bedrijf=bedrijf, datum = datum, kans=kans, 
                          status=status, beoordeling=beoordeling, titel=titel, id=id)
-        self.files.allow_multiple = not status in AanvraagStatus.active_states()
+        self._files_allow_multiple = not status in AanvraagStatus.active_states()
         self._datum_str = datum_str
         self.versie=versie
         if source_info:
-            self._files.add(source_info)
+            self.files.add(source_info)
             if not self.datum:
                 self.datum = self.files.get_timestamp(File.Type.AANVRAAG_PDF)
     @property
@@ -3,11 +3,12 @@ import datetime
 from enum import Enum, auto
 from pathlib import Path
 import re
+from typing import Iterable
 from data.general.aapa_class import AAPAclass
 from data.general.aggregator import Aggregator
 from data.general.const import FileType, MijlpaalType
 from database.classes.dbConst import EMPTY_ID
-from general.filehash import hash_file_digest
+from general.filehash import current_digest_algorithm, hash_file_digest, hash_many
 from general.fileutil import last_parts_file, summary_string
 from general.timeutil import TSC
 
@@ -15,12 +16,26 @@ class FilesException(Exception): pass
 class File(AAPAclass):
     AUTODIGEST = ''
     Type = FileType
+    __slots__ = ('filename', '_timestamp', '_digest', '_auto_timestamp', '_auto_digest', 'filetype', 'mijlpaal_type')
     @staticmethod
     def get_timestamp(filename: str)-> datetime.datetime:
         return TSC.rounded_timestamp(datetime.datetime.fromtimestamp(Path(filename).stat().st_mtime))
     @staticmethod
-    def get_digest(filename: str)->str:
-        return hash_file_digest(filename)
+    def get_digest(filename: str, algorithm: str = None)->str:
+        return hash_file_digest(filename, algorithm if algorithm else current_digest_algorithm())
+    @staticmethod
+    def prefetch_digests(files: Iterable[File], digests: dict[str,str] = None):
+        """ computes all pending (AUTODIGEST) digests in one parallel batch, see hash_many. 
+        
+            digests: digests (current algorithm) already computed by the caller, {str(filename): digest}. 
+            These are not computed again.
+        """
+        pending = [file for file in files if file._auto_digest]
+        digests = digests if digests is not None else {}
+        digests = digests | hash_many([file.filename for file in pending if file.filename not in digests])
+        for file in pending:
+            if (digest := digests.get(file.filename)) is not None:
+                file.digest = digest
     @staticmethod
     def display_file(filename: str)->str:
         """ returns shortened filename starting with the year-part of the file (e.g. 2022-2023). """
@@ -38,18 +53,11 @@ class File(AAPAclass):
                  filetype=Type.UNKNOWN, mijlpaal_type = MijlpaalType.UNKNOWN, id=EMPTY_ID):
         super().__init__(id)
         self.filename = str(filename) # to remove the WindowsPath label if needed
-        if Path(filename).is_file():
-            if timestamp == TSC.AUTOTIMESTAMP:
-                self.timestamp = File.get_timestamp(filename)
-            else:
-                self.timestamp = timestamp
-            if digest == File.AUTODIGEST:
-                self.digest = File.get_digest(filename)
-            else:
-                self.digest = digest
-        else:
-            self.timestamp=timestamp
-            self.digest=digest
+        self.timestamp = timestamp
+        self.digest = digest
+        # for an existing file, AUTOTIMESTAMP and AUTODIGEST are computed on first access
+        self._auto_timestamp = timestamp == TSC.AUTOTIMESTAMP
+        self._auto_digest = digest == File.AUTODIGEST
         self.filetype = filetype
         self.mijlpaal_type = mijlpaal_type
     def __str__(self): 
@@ -60,10 +68,27 @@ class File(AAPAclass):
         else:
             return f'{File.display_file(self.filename)}: {str(self.filetype)}-{self.mijlpaal_type} [{TSC.timestamp_to_str(self.timestamp)}]'
     @property    
-    def timestamp(self): return self._timestamp
+    def timestamp(self): 
+        if self._auto_timestamp:
+            self._auto_timestamp = False
+            if Path(self.filename).is_file():
+                self._timestamp = File.get_timestamp(self.filename)
+        return self._timestamp
     @timestamp.setter
     def timestamp(self, value):
         self._timestamp = TSC.rounded_timestamp(value)
+        self._auto_timestamp = False
+    @property    
+    def digest(self): 
+        if self._auto_digest:
+            self._auto_digest = False
+            if Path(self.filename).is_file():
+                self._digest = File.get_digest(self.filename)
+        return self._digest
+    @digest.setter
+    def digest(self, value):
+        self._digest = value
+        self._auto_digest = False
     def is_empty(self)->bool:
         return self.filename==''
     def relevant_attributes(self)->set[str]:
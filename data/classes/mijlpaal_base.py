@@ -10,6 +10,7 @@ from database.classes.dbConst import EMPTY_ID
 from general.timeutil import TSC
 
 class MijlpaalBase(AAPAclass):            
+    __slots__ = ('mijlpaal_type', 'datum', 'kans')
     def __init__(self, mijlpaal_type: MijlpaalType, datum: datetime.datetime, kans=0, id=EMPTY_ID):
         super().__init__(id)
         self.mijlpaal_type = mijlpaal_type
@@ -31,6 +32,7 @@ class MijlpaalBase(AAPAclass):
 
 class MijlpaalGradeable(MijlpaalBase):            
     Beoordeling = MijlpaalBeoordeling
+    __slots__ = ('student', 'bedrijf', 'titel', 'status', 'beoordeling', '_files', '_files_allow_multiple')
     def __init__(self, mijlpaal_type: MijlpaalType, student:Student, datum: datetime.datetime, bedrijf: Bedrijf = None, kans=0, status=0, 
                  beoordeling=Beoordeling.TE_BEOORDELEN, titel='', id=EMPTY_ID):
         super().__init__(mijlpaal_type=mijlpaal_type, datum=datum, kans=kans, id=id)
@@ -39,9 +41,13 @@ class MijlpaalGradeable(MijlpaalBase):
         self.titel = titel
         self.status = status
         self.beoordeling = beoordeling
-        self._files = Files(owner=self)
+        self._files: Files = None # created on first access
+        self._files_allow_multiple = True
     @property
-    def files(self)->Files: return self._files
+    def files(self)->Files: 
+        if self._files is None:
+            self._files = Files(owner=self, allow_multiple=self._files_allow_multiple)
+        return self._files
     def get_directory(self)->str:
         if files := self.files_list:
             return Path(files[0].filename).parent
@@ -53,7 +59,9 @@ class MijlpaalGradeable(MijlpaalBase):
                     return file.filename
         return None            
     @property
-    def files_list(self)->list[File]: return self._files.as_list('files')
+    def files_list(self)->list[File]: return self._files.as_list('files') if self._files is not None else []
+    @property
+    def files_version(self)->int: return self._files.version if self._files is not None else -1
     def register_file(self, filename: str, filetype: File.Type, mijlpaal_type: MijlpaalType)->File:
         result = File(filename=filename, timestamp=TSC.AUTOTIMESTAMP, digest=File.AUTODIGEST, filetype=filetype, mijlpaal_type=mijlpaal_type)
         if self.files.contains(result):
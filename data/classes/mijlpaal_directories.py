@@ -15,11 +15,37 @@ from general.timeutil import TSC
 from main.config import config
 
 class MijlpaalDirectoryAggregator(Aggregator):
+    """ Aggregator for the mijlpalen in a mijlpaaldirectory.
+
+        The files of all mijlpalen are kept in a list and indexed by (case-folded) filename. 
+        These are rebuilt if the mijlpalen or their files are changed (see files_signature).
+    """
     def __init__(self, owner: AAPAclass):
         super().__init__(owner=owner)
         # self.add_class(File, 'files') # to be deleted later
         self.add_class(Aanvraag, 'aanvragen')
         self.add_class(Verslag, 'verslagen')
+        self.__reset_files()
+    def __reset_files(self):
+        self._files_signature: tuple = None
+        self._files: list[File] = []
+        self._filenames: dict[str, File] = {} # casefolded filename -> File
+    def __setstate__(self, state: dict):
+        super().__setstate__(state)
+        self.__reset_files()
+    def files_signature(self)->tuple:
+        return (self.version, tuple(mijlpaal.files_version for class_type in self.class_types() for mijlpaal in self.as_list(class_type)))
+    def __files_index(self)->dict[str, File]:
+        if (signature := self.files_signature()) != self._files_signature:
+            self._files = []
+            for class_type in self.class_types():
+                for mijlpaal in self.as_list(class_type):
+                    self._files.extend(mijlpaal.files_list)
+            self._filenames = {}
+            for file in self._files:
+                self._filenames.setdefault(str(file.filename).casefold(), file)
+            self._files_signature = signature
+        return self._filenames
     # def find_filename(self,filename: str):
     #     obsolete_exception('find_filename')
     def find_mijlpaal(self, mijlpaal: MijlpaalGradeable)->MijlpaalGradeable:
@@ -33,11 +59,10 @@ class MijlpaalDirectoryAggregator(Aggregator):
                 return mijlpaal2
         return None            
     def get_files(self)->list[File]:
-        result = []
-        for class_type in self.class_types():
-            for mijlpaal in self.as_list(class_type):
-                result.extend(mijlpaal.files_list)
-        return result
+        self.__files_index()
+        return list(self._files)
+    def find_file(self, filename: str)->File:
+        return self.__files_index().get(str(filename).casefold(), None)
     
 class MijlpaalDirectory(MijlpaalBase):    
     def __init__(self, mijlpaal_type: MijlpaalType, directory: str, datum: datetime.datetime, kans=0, id=EMPTY_ID):
@@ -46,6 +71,9 @@ class MijlpaalDirectory(MijlpaalBase):
         self.mijlpalen = MijlpaalDirectoryAggregator(self)
     def get_files(self)->list[File]: 
         return self.mijlpalen.get_files()
+    def find_file(self, filename: str)->File:
+        """ Returns the file with this filename (case-insensitive), None if not found """
+        return self.mijlpalen.find_file(filename)
     @property
     def nr_items(self):
         return self.mijlpalen.nr_items('aanvragen') + self.mijlpalen.nr_items('verslagen')
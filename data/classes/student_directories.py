@@ -16,16 +16,62 @@ from general.timeutil import TSC
 from main.log import log_warning
 
 class StudentDirectoryAggregator(Aggregator):
+    """ Aggregator for the mijlpaaldirectories of a studentdirectory.
+
+        Keeps the mijlpaaldirectories per mijlpaal_type (sorted and unsorted) and indexed by (case-folded) directory, 
+        rebuilt if the directories are changed. The files in all mijlpaaldirectories are indexed by (case-folded) filename, 
+        rebuilt if the files are changed (see MijlpaalDirectoryAggregator.files_signature).
+    """
     def __init__(self, owner: StudentDirectory):
         super().__init__(owner=owner)
         self.add_class(MijlpaalDirectory, 'directories')
+        self.__reset_views()
+    def __reset_views(self):
+        self._views_version = -1
+        self._by_type: dict[MijlpaalType, list[MijlpaalDirectory]] = {}
+        self._sorted_by_type: dict[MijlpaalType, list[MijlpaalDirectory]] = {}
+        self._by_directory: dict[str, MijlpaalDirectory] = {} # casefolded directory -> MijlpaalDirectory
+        self._files_signature: tuple = None
+        self._files: list[File] = []
+        self._filenames: dict[str, File] = {} # casefolded filename -> File
+        self._file_directories: dict[int, MijlpaalDirectory] = {} # id(File) -> MijlpaalDirectory
+    def __setstate__(self, state: dict):
+        super().__setstate__(state)
+        self.__reset_views()
+    @staticmethod
+    def __sort_key(mpd: MijlpaalDirectory)->Tuple[MijlpaalType,datetime.datetime]:
+        # some mpd's have a "zero" datum, workaround for this
+        return (mpd.mijlpaal_type, mpd.datum if isinstance(mpd.datum,datetime.datetime) else datetime.datetime(2000,1,1))
+    def __views(self):
+        if self._views_version == self.version:
+            return
+        self._by_type = {}
+        self._by_directory = {}
+        stable = True
+        for mp_dir in self.as_list('directories'):
+            self._by_type.setdefault(mp_dir.mijlpaal_type, []).append(mp_dir)
+            self._by_directory.setdefault(str(mp_dir.directory).casefold(), mp_dir)
+            # the datum of a new mijlpaaldirectory can still be set later (see MijlpaalDirectory.ensure_datum)
+            stable = stable and isinstance(mp_dir.datum, datetime.datetime)
+        self._sorted_by_type = {mijlpaal_type: sorted(mp_dirs, key=StudentDirectoryAggregator.__sort_key) for mijlpaal_type, mp_dirs in self._by_type.items()}
+        self._views_version = self.version if stable else -1
+    def __files_index(self)->dict[str, File]:
+        directories = self.as_list('directories')
+        if (signature := (self.version, tuple(mp_dir.mijlpalen.files_signature() for mp_dir in directories))) != self._files_signature:
+            self._files = []
+            self._filenames = {}
+            self._file_directories = {}
+            for mp_dir in directories:
+                for file in mp_dir.get_files():
+                    self._files.append(file)
+                    self._filenames.setdefault(str(file.filename).casefold(), file)
+                    self._file_directories.setdefault(id(file), mp_dir)
+            self._files_signature = signature
+        return self._filenames
     def __str__(self)->str:
         return "\n".join([str(d) for d in self.as_list('directories')])
     def contains(self, mp_dir: MijlpaalDirectory)->bool:
-        for dir in self.as_list('directories'):
-            if dir.id == mp_dir.id:
-                return True
-        return False
+        return self.contains_id(mp_dir)
     def _find(self, value: MijlpaalDirectory)->MijlpaalDirectory:
         """ Returns mijlpaaldirectory with the same name.
 
@@ -33,9 +79,24 @@ class StudentDirectoryAggregator(Aggregator):
             and Windows-paths are case-insensitive anyway.
 
         """
-        for mp_dir in self.as_list('directories'):
-            if str(mp_dir.directory).lower() == str(value.directory.lower()):
-                return mp_dir 
+        return self.find_directory(value.directory)
+    def find_directory(self, directory: str)->MijlpaalDirectory:
+        self.__views()
+        return self._by_directory.get(str(directory).casefold(), None)
+    def get_directories(self, mijlpaal_type: MijlpaalType, sorted=True)->list[MijlpaalDirectory]:
+        self.__views()
+        return list((self._sorted_by_type if sorted else self._by_type).get(mijlpaal_type, []))
+    def get_files(self)->list[File]:
+        self.__files_index()
+        return list(self._files)
+    def find_file(self, filename: str)->File:
+        return self.__files_index().get(str(filename).casefold(), None)
+    def get_file_directory(self, file: File)->MijlpaalDirectory:
+        filenames = self.__files_index()
+        if (mp_dir := self._file_directories.get(id(file), None)) is not None:
+            return mp_dir
+        if (stored := filenames.get(str(file.filename).casefold(), None)) is not None and stored == file:
+            return self._file_directories[id(stored)]
         return None
 SDA = StudentDirectoryAggregator
     
@@ -55,13 +116,7 @@ class StudentDirectory(AAPAclass):
     def directories(self)->list[MijlpaalDirectory]:
         return self._data.as_list('directories')    
     def get_directories(self, mijlpaal_type: MijlpaalType, sorted=True)->list[MijlpaalDirectory]:
-        def get_key(mpd: MijlpaalDirectory)->Tuple[MijlpaalType,datetime.datetime]:
-            # some mpd's have a "zero" datum, workaround for this
-            return (mpd.mijlpaal_type, mpd.datum if isinstance(mpd.datum,datetime.datetime) else datetime.datetime(2000,1,1))
-        result = [dir for dir in self.directories if dir.mijlpaal_type == mijlpaal_type]
-        if sorted:
-            result.sort(key=get_key)
-        return result
+        return self._data.get_directories(mijlpaal_type, sorted=sorted)
     def get_directory(self, datum: datetime.datetime, mijlpaal_type: MijlpaalType, error_margin = 0.0)->MijlpaalDirectory:
         """ Geeft mijlpaal_directory voor dit mijlpaal_type en deze datum
 
@@ -83,27 +138,20 @@ class StudentDirectory(AAPAclass):
             None als er nog geen bestaat.
 
         """
-        for directory in self.get_directories(mijlpaal_type):
-            new_date = TSC.round_to_day(datum)
+        new_date = TSC.round_to_day(datum)
+        for directory in self._data.get_directories(mijlpaal_type):
             if mijlpaal_type == MijlpaalType.AANVRAAG or TSC.equal_in_range(directory.datum, new_date, error_margin):
                 return directory
         return None
     def get_files(self)->list[File]:
-        result = []
-        for directory in self.directories:
-            result.extend(directory.get_files())
-        return result
+        return self._data.get_files()
+    def find_file(self, filename: str)->File:
+        """ Returns the file with this filename (case-insensitive) in one of the mijlpaaldirectories, None if not found """
+        return self._data.find_file(filename)
     def get_file_directory(self, file: File)->MijlpaalDirectory:
-        for directory in self.directories:
-            if file in directory.get_files():
-                return directory
-        return None
+        return self._data.get_file_directory(file)
     def get_filename_directory(self, filename: str)->MijlpaalDirectory:
-        directory = str(Path(filename).parent).lower()
-        for mp_dir in self.directories:
-            if str(mp_dir.directory).lower() == directory:
-                return mp_dir
-        return None
+        return self._data.find_directory(Path(filename).parent)
     def add(self, mijlpaal: MijlpaalBase):
         if self.get_directory(mijlpaal.datum, mijlpaal.mijlpaal_type):
             log_warning(f'Directory {mijlpaal} is al aanwezig. Wordt overgeslagen.')
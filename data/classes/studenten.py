@@ -7,6 +7,7 @@ from general.valid_email import is_valid_email
 
 class Student(AAPAclass):
     Status = StudentStatus
+    __slots__ = ('full_name', 'first_name', 'stud_nr', 'email', 'status')
     def __init__(self, full_name='', first_name = '', last_name = '', stud_nr='', 
                  email='', status = Status.UNKNOWN, id=EMPTY_ID):        
         super().__init__(id)
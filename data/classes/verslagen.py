@@ -15,12 +15,13 @@ class Verslag(MijlpaalGradeable):
 #                  beoordeling=Beoordeling.TE_BEOORDELEN, status=Status.NEW, id=EMPTY_ID, kans=0, versie=1):
 
     Type = MijlpaalType
+    __slots__ = ('cijfer',)
     def __init__(self, mijlpaal_type: Verslag.Type, student:Student, datum: datetime.datetime,  bedrijf: Bedrijf=None,
                  kans:int=1, beoordeling=MijlpaalBeoordeling.TE_BEOORDELEN, status=Status.NEW, id=EMPTY_ID, titel='', cijfer=''):
         super().__init__(mijlpaal_type=mijlpaal_type, 
                          student=student, datum = datum, bedrijf=bedrijf, kans=kans, 
                          status=status, beoordeling=beoordeling, titel=titel, id=id)
-        self.files.allow_multiple = True 
+        self._files_allow_multiple = True 
         self.cijfer = ''
     def summary(self)->str:
         return f'{TSC.get_date_str(self.datum)}: {self.mijlpaal_type} ({self.kans}) {self.student.full_name} ' +\
@@ -1,8 +1,24 @@
 from database.classes.dbConst import EMPTY_ID
 
 class AAPAclass:
+    __slots__ = ('_id',) # subclasses without __slots__ still have a __dict__
+    _relevant_attributes: dict[type, frozenset[str]] = {} # per class, see cached_relevant_attributes
+    id_changes = 0 # number of times a valid id was changed (e.g. by CRUDQueries.check_already_there), see Aggregator
     def __init__(self, id=EMPTY_ID):
-        self.id = id
+        self._id = id
+    @property
+    def id(self)->int:
+        return self._id
+    @id.setter
+    def id(self, value: int):
+        if value != (id := self._id) and id is not None and id != EMPTY_ID:
+            AAPAclass.id_changes += 1
+        self._id = value
     def relevant_attributes(self)->set[str]:
         #override in subclass if not all attributes are relevant, in particular for database equality
         return {attr for attr in dir(self) if attr[0] != '_'}
+    def cached_relevant_attributes(self)->frozenset[str]:
+        # the relevant attributes are the same for all objects of a class, so they are computed once per class
+        if (result := AAPAclass._relevant_attributes.get(class_type := type(self), None)) is None:
+            result = AAPAclass._relevant_attributes[class_type] = frozenset(self.relevant_attributes())
+        return result
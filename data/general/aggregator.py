@@ -1,75 +1,169 @@
 from __future__ import annotations
 
-from typing import Any, Tuple, Type
+from typing import Any, Callable, Tuple, Type
 from data.general.aapa_class import AAPAclass
-from general.classutil import classname
-from general.keys import get_next_key
+from database.classes.dbConst import EMPTY_ID
 
-main_key_name: str
-class Aggregator(dict):  
+class Aggregator:  
+    """ Container for the detail objects of an AAPA object, by class.
+
+        Every class is stored under an attribute name ('files', 'aanvragen' etc.), in a bucket 
+        (in the order of adding). Objects with a valid id are also indexed by id, 
+        objects without id (not yet stored) are indexed as soon as they have one. 
+        If the id of an AAPAclass object is changed (see AAPAclass.id_changes) the index is rebuilt.
+        contains only compares an object with a valid id with the objects with the same id 
+        and the objects without id.
+
+        The contents can be loaded lazily: if a loader is set (see set_loader), it is called 
+        (once) on the first access to the contents. 
+
+        version changes with every change of the contents, this can be used to keep derived views up to date.
+    """
     def __init__(self, owner: AAPAclass=None):
         self._classes: list[dict] = []
         self.owner = owner
-        self.key = f'{classname(owner)}{get_next_key("Aggregator")}'
+        self._class_attributes: dict[Type[Any], str] = {}
+        self._buckets: dict[str, dict[int, Any]] = {} # attribute -> {id(object): object}
+        self._id_index: dict[str, dict[int, dict[int, Any]]] = {} # attribute -> {object.id: {id(object): object}}
+        self._index_changes: dict[str, int] = {} # attribute -> AAPAclass.id_changes when the index was (re)built
+        self._unkeyed: dict[str, dict[int, Any]] = {} # attribute -> {id(object): object} for objects without valid id (only if there are any)
+        self._loader: Callable[[Aggregator], None] = None
+        self._version = 0
+    def set_loader(self, loader: Callable[[Aggregator], None]):
+        self._loader = loader
+    @property
+    def is_loaded(self)->bool:
+        return self._loader is None
+    @property
+    def version(self)->int:
+        self._ensure_loaded()
+        return self._version
+    def _ensure_loaded(self):
+        if (loader := self._loader) is not None:
+            self._loader = None
+            loader(self)
     @property
     def classes(self)->list[dict]:
         return self._classes
     def nr_items(self, description: str='')->int:
         if description:
-            return len(self.as_list(description))
+            self._ensure_loaded()
+            return len(self._buckets.get(self.__get_attribute(description), {}))
         else:            
-            return sum([self.nr_items(entry['attribute'])for entry in self._classes])
+            return len(self)
     def class_items(self)->list[Tuple[str, Any]]:
         return [(entry['class'], entry['attribute']) for entry in self.classes]
     def class_types(self)->list[Any]:
         return [entry['class'] for entry in self.classes]
     def get_class_type(self, attribute: str)->Type[Any]:
-        for entry in self.classes:
-            if entry['attribute']==attribute:
-                return entry['class']
+        for class_type, class_attribute in self._class_attributes.items():
+            if class_attribute == attribute:
+                return class_type
         return None
     def add_class(self, class_type: Type[Any], attribute: str):
         self._classes.append({'class': class_type, 'attribute': attribute})
-    def __get_hash(self, object: Any)->str:
-        class_attribute = self.__get_class_attribute(object)        
-        return f'{self.key}|{class_attribute}|{get_next_key(self.key)}'
+        self._class_attributes[class_type] = attribute
+        self._buckets[attribute] = {}
+        self._id_index[attribute] = {}
+        self._index_changes[attribute] = AAPAclass.id_changes
     def __get_class_attribute(self, object: Any):
-        target = object if isinstance(object,type) else object.__class__
-        for entry in self._classes:
-            if entry['class']==target:
-                return entry['attribute']
-        self.__type_error(object)
+        if (attribute := self._class_attributes.get(object if isinstance(object,type) else object.__class__, None)) is None:
+            self.__type_error(object)
+        return attribute
+    def __get_attribute(self, class_type: str|Any)->str:
+        return class_type if isinstance(class_type, str) else self.__get_class_attribute(class_type)
+    @staticmethod
+    def __valid_id(object: Any)->bool:
+        return (id := getattr(object, 'id', None)) is not None and id != EMPTY_ID
+    def __rebuild_index(self, attribute: str):
+        index = self._id_index[attribute] = {}
+        self._unkeyed.pop(attribute, None)
+        for key, object in self._buckets[attribute].items():
+            if self.__valid_id(object):
+                index.setdefault(object.id, {})[key] = object
+            else:
+                self._unkeyed.setdefault(attribute, {})[key] = object
+        self._index_changes[attribute] = AAPAclass.id_changes
+    def __index(self, attribute: str)->dict[int, dict[int, Any]]:
+        self._ensure_loaded()
+        if self._index_changes[attribute] != AAPAclass.id_changes:
+            # an id was changed (e.g. by CRUDQueries.check_already_there), possibly of an indexed object
+            self.__rebuild_index(attribute)
+        elif unkeyed := self._unkeyed.get(attribute, None):
+            # objects that were added without id (and were stored later) are moved to the index
+            index = self._id_index[attribute]
+            for key, object in list(unkeyed.items()):
+                if self.__valid_id(object):
+                    del unkeyed[key]
+                    index.setdefault(object.id, {})[key] = object
+        return self._id_index[attribute]
     def contains(self, object: Any)->bool:
-        for item in self.as_list(self.__get_class_attribute(object)):
+        attribute = self.__get_class_attribute(object)
+        index = self.__index(attribute)
+        if id(object) in self._buckets[attribute]:
+            return True
+        if self.__valid_id(object):
+            candidates = list(index.get(object.id, {}).values()) + list(self._unkeyed.get(attribute, {}).values())
+        else:
+            candidates = self._buckets[attribute].values()
+        for item in candidates:
             if item==object:
                 return True
         return False
     def contains_id(self, object: Any)->bool:
-        for item in self.as_list(self.__get_class_attribute(object)):
-            if item.id==object.id:
-                return True
-        return False
+        attribute = self.__get_class_attribute(object)
+        index = self.__index(attribute)
+        if self.__valid_id(object):
+            return object.id in index
+        return any(item.id==object.id for item in self._unkeyed.get(attribute, {}).values())
     def _add(self, object: Any):
-        self[self.__get_hash(object)]={'object': object, 'attribute': self.__get_class_attribute(object)}
+        self._ensure_loaded()
+        attribute = self.__get_class_attribute(object)
+        if id(object) in (bucket := self._buckets[attribute]):
+            return
+        bucket[id(object)] = object
+        self._version += 1
+        if self.__valid_id(object):
+            self._id_index[attribute].setdefault(object.id, {})[id(object)] = object
+        else:
+            self._unkeyed.setdefault(attribute, {})[id(object)] = object
     def add(self, object: Any):
         if isinstance(object, list):
             for o in object:
                 self._add(o)
         else:
             self._add(object)
-    def __find_key(self, object: Any)->str:
-        class_attribute = self.__get_class_attribute(object)
-        for key,value in self.items():
-            if value['attribute'] == class_attribute and value['object'] == object:
-                return key
+    def __find(self, attribute: str, object: Any)->Any:
+        bucket = self._buckets[attribute]
+        if id(object) in bucket:
+            return object
+        for item in bucket.values():
+            if item == object:
+                return item
         return None        
+    def __discard(self, attribute: str, object: Any):
+        index = self.__index(attribute)
+        del self._buckets[attribute][id(object)]
+        self._version += 1
+        if self._unkeyed.get(attribute, {}).pop(id(object), None) is None:
+            same_id = index[object.id]
+            del same_id[id(object)]
+            if not same_id:
+                del index[object.id]
     def remove(self, object: Any)->Any:
-        if (key:=self.__find_key(object)):
-            return self.pop(key)
-        return None
-    def _clear(self, class_type:str):
-        for item in self.as_list(class_type).copy():
-            self.remove(item)
+        self._ensure_loaded()
+        attribute = self.__get_class_attribute(object)
+        if (item := self.__find(attribute, object)) is not None:
+            self.__discard(attribute, item)
+        return item
+    def _clear(self, class_type:str|Any):
+        self._ensure_loaded()
+        attribute = self.__get_attribute(class_type)
+        self._buckets[attribute] = {}
+        self._id_index[attribute] = {}
+        self._index_changes[attribute] = AAPAclass.id_changes
+        self._unkeyed.pop(attribute, None)
+        self._version += 1
     def clear(self, class_type:str|Any = None):
         if not class_type:
             for class_type in self.class_types():
@@ -77,39 +171,64 @@ class Aggregator(dict):
         else:
             self._clear(class_type)
     def _as_list(self, class_attribute: str, sort_key=None, sort_reverse=False)->list:
-        result = [value['object'] for value in self.values() if value['attribute']==class_attribute]
+        self._ensure_loaded()
+        result = list(self._buckets.get(class_attribute, {}).values())
         return result if not sort_key else sorted(result, key=sort_key, reverse=sort_reverse)
     def as_list(self, class_type:str|Any, sort_key=None, sort_reverse=False)->list:
-        if isinstance(class_type, str):
-            return self._as_list(class_type, sort_key=sort_key, sort_reverse=sort_reverse)
-        return self._as_list(self.__get_class_attribute(class_type), sort_reverse=sort_reverse)
+        return self._as_list(self.__get_attribute(class_type), sort_key=sort_key, sort_reverse=sort_reverse)
     def as_class_list(self, aapa_obj:Any)->list:
-        return self._as_list(type(aapa_obj))
-    def _get_ids(self, class_attribute: str):
-        return [value['object'].id for value in self.values() if value['attribute']==class_attribute]
+        return self._as_list(self.__get_class_attribute(aapa_obj))
     def get_ids(self, class_type:str|Any)->list[int]:
-        if isinstance(class_type, str):
-            return self._get_ids(class_type)
-        return self._get_ids(self.__get_class_attribute(class_type))
+        self._ensure_loaded()
+        return [object.id for object in self._buckets.get(self.__get_attribute(class_type), {}).values()]
     def __type_error(self, object):
         raise TypeError(f'Not supported in Aggregator: {object.__class__}')
+    def __getstate__(self)->dict:
+        # the copy is always loaded (the loader is not copied)
+        self._ensure_loaded()
+        return self.__dict__ | {'_loader': None}
+    def __setstate__(self, state: dict):
+        # copied (deepcopy) or unpickled: the objects are new, so the buckets and indexes are rebuilt
+        self.__dict__.update(state)
+        objects = [object for bucket in self._buckets.values() for object in bucket.values()]
+        self.clear()
+        self.add(objects)
+    def __len__(self)->int:
+        self._ensure_loaded()
+        return sum(len(bucket) for bucket in self._buckets.values())
+    def __eq__(self, value2: Aggregator)->bool:
+        # only equal if identical (or both empty), use is_equal to compare the contents 
+        return self is value2 or (isinstance(value2, Aggregator) and not self and not value2)
+    __hash__ = None
+    @staticmethod
+    def __equal_items(list1: list, list2: list)->bool:
+        # compare the objects with the same id
+        same_id: dict[int, list] = {}
+        for item in list2:
+            same_id.setdefault(item.id, []).append(item)
+        for item1 in list1:
+            candidates = same_id.get(item1.id, [])
+            for n,item2 in enumerate(candidates):
+                if item1 == item2:
+                    del candidates[n]
+                    break
+            else:
+                return False
+        return True
     def is_equal(self, value2: Aggregator)->bool:
-        # can not use == because the keys are prob different and standard dict == would fail
         if not value2:
             return False
-        if len(self.class_types()) != len(value2.class_types()):
+        if set(self._class_attributes.items()) != set(value2._class_attributes.items()):
             return False
-        for type1,type2 in zip(sorted(self.class_types()), sorted(value2.class_types())):
-            if type1 != type2:
+        self._ensure_loaded()
+        for attribute, bucket in self._buckets.items():
+            bucket2 = value2._buckets[attribute]
+            if len(bucket) != len(bucket2):
+                return False
+            if set(self.__index(attribute).keys()) != set(value2.__index(attribute).keys()):
                 return False
-        for class_type in self.class_types():
-            list1 = sorted(self.as_list(class_type))
-            list2 = sorted(value2.as_list(class_type))
-            if len(list1) != len(list2):
+            if not Aggregator.__equal_items(list(bucket.values()), list(bucket2.values())):
                 return False
-            for item1,item2 in zip(list1,list2):
-                if item1 != item2:
-                    return False
         return True
 
 if __name__=='__main__':       
@@ -158,10 +277,10 @@ if __name__=='__main__':
         print(e)
     print('==')
     print(f'removing: {t1}')
-    a.remove_filetype(t1)
-    for key,value in a.items():
-        print(f'{str(key)}: {value}')
-    a.remove_filetype(t1)
+    a.remove(t1)
+    for value in a.as_list(twee):
+        print(f'{value}')
+    a.remove(t1)
     d = drie(42, 'galactic')
     try:
         a.add(d)
@@ -35,9 +35,10 @@ Speciale codes
 
 """
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 import re
-from typing import Tuple
+from typing import Iterable, Tuple
 from general.keys import get_next_key, reset_key
 from main.log import log_debug
 from general.onedrive import find_onedrive_path
@@ -138,20 +139,54 @@ class PathRootConvertor:
         if PathRootConvertor.__contains(self.expanded, str(old_onedrive)):
             self.expanded = PathRootConvertor.__substitute(self.expanded, str(old_onedrive), str(new_onedrive))
 
+class RootTrie:
+    """ Prefix trie over the (lowercase) expanded roots. Used by RootsCoder.encode_path. 
+    
+        find(path) returns the converters whose expanded root is a prefix of path, 
+        in O(length of path) instead of O(number of roots).
+    """
+    _CONVERTERS = None # key for the converters ending in a node, can not clash with a character
+    def __init__(self, converters: list[PathRootConvertor] = []):
+        self._root = {}
+        for converter in converters:
+            self.add(converter)
+    def add(self, converter: PathRootConvertor):
+        node = self._root
+        for ch in converter.expanded.lower():
+            node = node.setdefault(ch, {})
+        node.setdefault(self._CONVERTERS, []).append(converter)
+    def find(self, path: str)->list[PathRootConvertor]:
+        result = []
+        node = self._root
+        for ch in path.lower():
+            if (node := node.get(ch, None)) is None:
+                break
+            if (converters := node.get(self._CONVERTERS, None)):
+                result.extend(converters)
+        return result
+
 class RootsCoder(Singleton):
     """ Implements the module functionality. Should not be used from outside this module. 
     
         verbose can be set to True if debugging the functionality.
     """
 
+    CACHE_SIZE = 4096
     def __init__(self, base_path: str, verbose=False): 
         self._sorter = RootSorter()
         self._initialized = False
         self.verbose=verbose
+        # lru_cache (instead of an OrderedDict) because paths are also encoded from the hashing threads
+        self._encode_cached = lru_cache(maxsize=self.CACHE_SIZE)(self._encode_path)
+        self._decode_cached = lru_cache(maxsize=self.CACHE_SIZE)(self._decode_path)
         self.reset(base_path)
     def reset(self, base_path: str):
         self._converters:list[PathRootConvertor] = []
+        self._code_converters: dict[str,PathRootConvertor] = {} # lowercase code -> converter
+        self._expanded_paths: dict[str,str] = {} # lowercase code -> fully decoded (absolute) path
+        self._trie = RootTrie()
         self._update_known()
+        self._invalidate()
         if not self._initialized:
             path = find_onedrive_path(base_path)
             self._onedrive_coder = OneDriveCoder(Path(path).parent)
@@ -173,8 +208,18 @@ class RootsCoder(Singleton):
         result = self._add(root_path=root_path, code=code)
         self._sort()
         return result
+    def add_many(self, roots: Iterable[Tuple[str|Path,str]])->list[str]:
+        # roots: (root_path, code) tuples, code may be None. The converters are sorted only once.
+        # root_path may be encoded with an earlier root (nested roots), so every root is decoded after the previous ones are added
+        result = [self._add(root_path=self.decode_path(str(root_path)), code=code) for root_path,code in roots]
+        self._sort()
+        return result
     def _sort(self):
         self._converters.sort(key=lambda converter: len(converter.expanded), reverse=True)
+    def _invalidate(self):
+        # called after every change in the roots
+        self._encode_cached.cache_clear()
+        self._decode_cached.cache_clear()
     def _add(self, root_path: str|Path, code = None)->str:
         if already_there := self.__find_expanded(root_path):
             if self.verbose:
@@ -204,7 +249,12 @@ class RootsCoder(Singleton):
                 log_debug(f'root already there: {root_path}')
             return already_there.code
         self._converters.append(new_root)
-        self._update_known()
+        self.known_codes.add(new_root.code)
+        self.known_roots.add(new_root.root)
+        self._code_converters[new_root.code.lower()] = new_root
+        self._trie.add(new_root)
+        self._expand_code(new_root)
+        self._invalidate()
         if self.verbose:
             log_debug(f'root added: {new_root.code}: "{new_root.root}"  ({new_root.expanded})')
         return new_root.code
@@ -218,19 +268,29 @@ class RootsCoder(Singleton):
             path = str(path)
         if not path:
             return ''
+        return self._decode_cached(path)
+    def _decode_path(self, path: str)->str:
         path = self.decode_onedrive(path)
-        for converter in self._converters:
-            if converter.contains_root_code(path):
-                return self.decode_path(converter.decode_path(path))
+        if path[:1] == ':' and (end := path.find(':', 1)) > 0:
+            code = path[:end+1]
+            if (converter := self._code_converters.get(code.lower(), None)) and converter.contains_root_code(path):
+                return self._expand_code(converter) + path[len(code):]
         return path
+    def _expand_code(self, converter: PathRootConvertor)->str:
+        # nested codes (:ROOT3: = :ROOT1:\\hallo) are resolved only once
+        if (result := self._expanded_paths.get(key := converter.code.lower(), None)) is None:
+            result = self._expanded_paths[key] = self._decode_path(converter.expanded)
+        return result
     def encode_path(self, path: str|Path, allow_single=True)->str:
         if isinstance(path, Path):
             path = str(path)
         if not path:
             return path
+        return self._encode_cached(path, allow_single)
+    def _encode_path(self, path: str, allow_single: bool)->str:
         path = self.decode_onedrive(path)
         candidates = set()
-        for converter in self._converters:
+        for converter in self._trie.find(path):
             if converter.contains_root(path):
                 candidate_encoding = converter.encode_path(path)
                 if allow_single or not self._sorter.is_single_root(candidate_encoding):
@@ -248,6 +308,11 @@ class RootsCoder(Singleton):
     def replace_onedrive(self, old_onedrive: str, new_onedrive: str):
         for converter in self._converters:
             converter.replace_onedrive(str(old_onedrive), str(new_onedrive))
+        self._trie = RootTrie(self._converters)
+        self._expanded_paths = {}
+        for converter in self._converters:
+            self._expand_code(converter)
+        self._invalidate()
         self._sort()        
     def set_onedrive_root(self, path: str):
         old_root = self._onedrive_coder.onedrive_root
@@ -376,6 +441,21 @@ class Roots:
         """
         return _roots.add(root_path, code=code)
     @staticmethod	
+    def add_roots(roots: Iterable[Tuple[str|Path,str]])->list[str]:    
+        """ add several new roots at once, see add_root. 
+
+            parameters
+            ----------
+                roots: (root_path, code) tuples, code can be None. 
+                    root_path can be encoded with one of the earlier roots (as stored in the database).
+
+            returns
+            -------
+                the root codes, in the same order as roots.
+
+        """
+        return _roots.add_many(roots)
+    @staticmethod	
     def decode_path(path: str|Path)->str:
         """decode an encoded path (encoded with encode_path)."""
         return _roots.decode_path(path)
@@ -25,7 +25,7 @@ from data.general.roots import Roots
 
 class AAPaException(Exception): pass
 
-DBVERSION = '1.25'
+DBVERSION = '1.26'
 class DBVersie(Versie):
     def __init__(self, db_versie = DBVERSION, **kwargs):
         super().__init__(**kwargs)
@@ -58,19 +58,18 @@ class FileRootTableDefinition(TableDefinition):
         self.add_column('root', dbc.TEXT)
 
 def create_root(database: Database, code, root: str):
-    database._execute_sql_command('insert into FILEROOT (code, root) values (?,?);', [code, root])
-    database.commit()
+    create_roots(database, [(code, root)])
 
-def create_roots(database: Database):
-    for code,root in Roots.get_roots():
-        create_root(database, code, root)        
+def create_roots(database: Database, roots: list[tuple[str,str]] = None):
+    # roots: (code,root) tuples, default all known roots. Inserted in one statement and one transaction.
+    database._execute_many_sql_command('insert into FILEROOT (code, root) values (?,?);', roots if roots is not None else Roots.get_roots())
+    database.commit()
             
 def load_roots(database: Database):
     Roots.reset_roots()
-    for row in database._execute_sql_command('select code, root from fileroot', [], True): 
-        if row['code'] == ':ROOT1:':
-            continue # first row is already loaded, this is the NHL Stenden BASEPATH
-        Roots.add_root(Roots.decode_path(row['root']), row['code']) 
+    rows = database._execute_sql_command('select code, root from fileroot', [], True)
+    # first row (:ROOT1:) is already loaded, this is the NHL Stenden BASEPATH
+    Roots.add_roots([(row['root'], row['code']) for row in rows if row['code'] != ':ROOT1:'])
             
 class DetailsTableDefinition(TableDefinition):
     def __init__(self, name: str, 
@@ -83,6 +82,8 @@ class DetailsTableDefinition(TableDefinition):
         self.add_foreign_key(main_alias_id, main_table_name, 'id', onupdate=ForeignKeyAction.CASCADE, ondelete=ForeignKeyAction.CASCADE)
         #NOTE: no foreign key on second column, this could be coupled to more than one table
         #   class_code determines how to interpret detail_id!
+        # the primary key covers searching on main_alias_id, this is for searching the other way around 
+        self.add_index(f'{name.lower()}_detail_index', ['detail_id', 'class_code'])
     def add_detail(self, detail_code: str, detail_table: TableDefinition):
         self._detail_tables[detail_code] = detail_table
 
@@ -95,6 +96,8 @@ class StudentenTableDefinition(TableDefinition):
         self.add_column('first_name', dbc.TEXT)
         self.add_column('email', dbc.TEXT, notnull=True)
         self.add_column('status', dbc.INTEGER)
+        self.add_index('studenten_email_index', 'email')
+        self.add_index('studenten_name_index', 'full_name')
 
 class BedrijvenTableDefinition(TableDefinition):
     def __init__(self):
@@ -139,11 +142,8 @@ class VerslagDetailsTableDefinition(DetailsTableDefinition):
         super().__init__('VERSLAGEN_DETAILS', main_table_name='VERSLAGEN', main_alias_id='verslag_id')
         self.add_detail(detail_code=ClassCodes.classtype_to_code(File), detail_table=FilesTableDefinition)
 
-#NOTE: een index op FILES (bijvoorbeeld op filename, filetype of digest) ligt voor de hand
-# Bij onderzoek blijkt echter dat dit bij de huidige grootte van de database (1000 files) 
-# geen noemenswaardige tijdswinst oplevert. Dit kan dus beter wachten.
-# De functionaliteit is al geprogrammeerd, de code kan eenvoudig worden aangezet.
-# er is dan wel nog eenmalig een database migratie nodig.
+#NOTE: de index op digest is toegevoegd in database versie 1.26 
+# (bestanden worden vaak op digest gezocht, bijvoorbeeld bij het detecteren van bekende bestanden)
 class FilesTableDefinition(TableDefinition):
     def __init__(self):
         super().__init__('FILES')
@@ -154,8 +154,7 @@ class FilesTableDefinition(TableDefinition):
         self.add_column('filetype', dbc.INTEGER)
         self.add_column('mijlpaal_type', dbc.INTEGER)
         self.add_index('name_index', 'filename')
-        # self.add_index('digest_index', 'digest')
-        # self.add_index('name_digest_index', ['digest','name'])
+        self.add_index('digest_index', 'digest')
 
 class UndoLogsTableDefinition(TableDefinition):
     def __init__(self):
@@ -344,7 +343,7 @@ class AAPaSchema(Schema):
     def _dump_view_or_table_sql(table_or_view: TableDefinition|ViewDefinition, file:TextIO, wrapper: TextWrapper=None):
         if isinstance(table_or_view, TableDefinition):
             file.write(f'table {table_or_view.name}:\n')
-            sql = SQLcreateTable(table_or_view)
+            sql = SQLcreateTable(table_or_view, include_indexes=True)
         else:
             file.write(f'view {table_or_view.name}:\n')
             sql = SQLcreateView(table_or_view)
@@ -1,19 +1,52 @@
 from __future__ import annotations
 from contextlib import contextmanager
 import sqlite3 as sql3
-from typing import Any, Iterable
+import time
+from typing import Any, Callable, Iterable
+from weakref import WeakSet
 import database.classes.dbConst as dbc
-from database.classes.table_def import TableDefinition
+from database.classes.table_def import IndexDefinition, TableDefinition
 from database.classes.view_def import ViewDefinition
+from database.classes.sql_base import SQLbase
 from database.classes.sql_view import SQLcreateView, SQLdropView, SQLselectView
-from database.classes.sql_table import SQLTablebase, SQLdelete, SQLinsert, SQLselect, SQLupdate, SQLcreateTable, SQLdropTable
+from database.classes.sql_table import SQLTablebase, SQLcreateIndex, SQLdelete, SQLinsert, SQLselect, SQLupdate, SQLcreateTable, SQLdropTable
 from database.classes.sql_expr import Ops, SQE
+from database.classes.sql_cache import flat_values, statement_cache
+from database.classes.sql_stats import statement_statistics
 from general.fileutil import file_exists
-from main.log import log_debug, log_error, log_exception, log_info
+from main.config import BoolValueConvertor, IntValueConvertor, config
+from main.log import log_debug, log_debug_enabled, log_error, log_exception, log_info, log_warning
 from general.singular_or_plural import sop
 
 class DatabaseException(Exception): pass
 
+# performance profiles: pragmas applied when the connection is opened
+#   default:     SQLite defaults, nothing is changed
+#   safe:        rollback journal with full sync (the SQLite default), larger page cache, temporary tables in memory
+#   performance: write-ahead log with normal sync (commits do not wait for a fsync), larger page cache, 
+#                temporary tables in memory, memory mapped I/O. 
+#                NOTE: the WAL-mode is stored in the database file. Do not use this on a network or cloud-synced drive.
+PERFORMANCE_PROFILES = {'default': [], 
+                        'safe': ['journal_mode=DELETE', 'synchronous=FULL', 'cache_size', 'temp_store=MEMORY'], 
+                        'performance': ['journal_mode=WAL', 'synchronous=NORMAL', 'cache_size', 'temp_store=MEMORY', 'mmap_size']}
+DEFAULT_PROFILE = 'safe'
+def init_config():
+    config.init('database', 'profile', DEFAULT_PROFILE)
+    config.register('database', 'cache_size', IntValueConvertor)
+    config.init('database', 'cache_size', -16000) # negative: in KiB
+    config.register('database', 'mmap_size', IntValueConvertor)
+    config.init('database', 'mmap_size', 268435456)
+    config.register('database', 'log_rows', BoolValueConvertor)
+    config.init('database', 'log_rows', False) # dump every fetched row in the debug log
+    config.register('database', 'index_advisor', BoolValueConvertor)
+    config.init('database', 'index_advisor', False) # record the statements for debug/index_advisor.py
+init_config()
+
+_recording_databases: WeakSet[Database] = WeakSet()
+def recording_databases()->list[Database]:
+    # databases recording their statements since they were opened ([database] index_advisor)
+    return [database for database in _recording_databases if database.recorded_statements is not None]
+
 class SchemaTableDef(TableDefinition):
     def __init__(self):
         super().__init__('sqlite_schema')
@@ -26,14 +59,20 @@ class SchemaTableDef(TableDefinition):
 def one_line(value: str)->str:
     return value.replace('\n', ' ')
 class Database:
-    def __init__(self, filename: str, _reset_flag = False):
+    def __init__(self, filename: str, _reset_flag = False, profile: str = None):
         if not _reset_flag and not file_exists(filename):
             log_error(f'Database {filename} niet gevonden.')
             return None
         self.raise_error = True
         self._reset_flag = _reset_flag
         self._commit_level = 0
+        self._savepoint_level = 0
         self._foreign_key_level = 0
+        self.recorded_statements: dict[str, Iterable[Any]] = None
+        if config.get('database', 'index_advisor'):
+            self.start_recording()
+            _recording_databases.add(self)
+        self.log_rows = config.get('database', 'log_rows')
         self.connection = None
         try:
             self.connection = self.open_database(filename)
@@ -42,6 +81,7 @@ class Database:
             self.log_info('database logging started...') 
             self.log_info(f'connection ({filename}) opened...')
             self.connection.row_factory = sql3.Row
+            self.apply_performance_profile(profile if profile else config.get('database', 'profile'))
             self.enable_foreign_keys()
         except Exception as E:
             log_error(f'Kan database {filename} niet initialiseren:\n\t{E}')
@@ -103,34 +143,96 @@ class Database:
             if self.raise_error:
                 raise e
             return None
+    def apply_performance_profile(self, profile: str):
+        if (pragmas := PERFORMANCE_PROFILES.get(profile, None)) is None:
+            log_warning(f'Onbekend database-profiel "{profile}". Standaardprofiel ({DEFAULT_PROFILE}) wordt gebruikt.')
+            profile = DEFAULT_PROFILE
+            pragmas = PERFORMANCE_PROFILES[profile]
+        for pragma in pragmas:
+            if not '=' in pragma: # value from configuration
+                pragma = f"{pragma}={config.get('database', pragma)}"
+            self._execute_sql_command(f'pragma {pragma}')
+        self.profile = profile
+    def start_recording(self):
+        # record all (different) statements with their first set of parameters, e.g. for debug/index_advisor.py
+        self.recorded_statements = {}
+    def stop_recording(self)->dict[str, Iterable[Any]]:
+        result = self.recorded_statements
+        self.recorded_statements = None
+        return result
+    def _record_statement(self, string: str, parameters: Iterable[Any]):
+        if self.recorded_statements is not None and string not in self.recorded_statements:
+            self.recorded_statements[string] = parameters
     def _execute_sql_command(self, string, parameters:Iterable[Any]=None, return_values=False):
+        self._record_statement(string, parameters)
         try:
             c = self.connection.cursor()
+            if log_debug_enabled(): # info logging is always on: the SQL of every query only at debug level
+                self.log_info(f'{string} {parameters}' if parameters else string)
+            start = time.perf_counter() if statement_statistics.enabled else None
             if parameters:
-                self.log_info(f'{string} {parameters}')
                 c.execute('' + string + '', parameters)
             else:
-                self.log_info(string)
                 c.execute('' + string + '')
+            result = c.fetchall() if return_values else None
+            if start is not None:
+                statement_statistics.record(string, time.perf_counter() - start, 
+                                            rows=len(result) if return_values else max(c.rowcount, 0), parameters=parameters)
             if return_values:
-                result = c.fetchall()
-                log_debug(f'\tQuery result: {sop(len(result), "row", "rows")}')
-                if result:
-                    for n,row in enumerate(result):
-                        log_debug(f'\t\trow {n}: {self.convert_row(row)}')
+                if log_debug_enabled():
+                    log_debug(f'\tQuery result: {sop(len(result), "row", "rows")}')
+                    if self.log_rows:
+                        for n,row in enumerate(result):
+                            log_debug(f'\t\trow {n}: {self.convert_row(row)}')
                 return result
         except sql3.Error as e:
             self.log_error('***ERROR***: '+str(e))
             if self.raise_error:
                 raise e
         return None
+    def _execute_many_sql_command(self, string, parameters_list:Iterable[Iterable[Any]]):
+        # same statement for a list of parameter sets (cursor.executemany)
+        try:
+            parameters_list = list(parameters_list)
+            if parameters_list:
+                self._record_statement(string, parameters_list[0])
+            if log_debug_enabled():
+                self.log_info(f'{string} [{sop(len(parameters_list), "parameter set", "parameter sets")}]')
+            start = time.perf_counter() if statement_statistics.enabled else None
+            c = self.connection.cursor()
+            c.executemany('' + string + '', parameters_list)
+            if start is not None:
+                statement_statistics.record(string, time.perf_counter() - start, rows=max(c.rowcount, 0), 
+                                            parameters=f'[{sop(len(parameters_list), "parameter set", "parameter sets")}]')
+        except sql3.Error as e:
+            self.log_error('***ERROR***: '+str(e))
+            if self.raise_error:
+                raise e
+    def execute_template(self, signature: tuple, build_sql: Callable[[list[Any]], SQLbase], values: list[Any], return_values=False):
+        # the statement is built by build_sql(values) only once per signature, see SQLStatementCache
+        if statement_cache.enabled:
+            template = statement_cache.get_template(signature, build_sql, values)
+            return self._execute_sql_command(template.query, template.parameters(flat_values(values)), return_values)
+        sql = build_sql(values)
+        return self._execute_sql_command(sql.query, sql.parameters, return_values)
+    @staticmethod
+    def _where_template(where_columns: list[str], where_values: list[Any])->SQE:
+        # where_columns[0] = ? AND where_columns[1] = ? ...; a list value gives an IN clause
+        where = None
+        for column, value in zip(where_columns, where_values):
+            where_part = SQE(column, Ops.IN if isinstance(value, list) else Ops.EQ, value, no_column_ref=True)
+            where = where_part if not where else SQE(where, Ops.AND, where_part)
+        return where
+    @staticmethod
+    def _where_signature(where_columns: list[str], where_values: list[Any])->tuple:
+        return (tuple(where_columns), tuple(len(value) if isinstance(value, list) else -1 for value in where_values))
     def execute_sql_command(self, sql:SQLTablebase):        
         self._execute_sql_command(sql.query, sql.parameters)
     def execute_select(self, sql:SQLselect):
         return self._execute_sql_command(sql.query, sql.parameters, True)
     def commit(self):
-        if self._commit_level > 0:
-            log_debug(f'Committing (level: {self._commit_level})')
+        if self._commit_level > 0 or self._savepoint_level > 0:
+            log_debug(f'Committing (level: {self._commit_level}, savepoint level: {self._savepoint_level})')
             return
         self.log_info('Committing')
         self.connection.commit()
@@ -138,13 +240,39 @@ class Database:
         self._commit_level += 1
     def enable_commit(self):
         self._commit_level -= 1
-    #note: SQLite savepoints do not work as expected in python
+    @contextmanager
+    def savepoint(self, name: str = 'unit_of_work'):
+        # unit of work, may be nested: on an exception all changes since the start of the savepoint are rolled back, 
+        # changes made before are kept. Commits are postponed until the outermost savepoint is released.
+        #note: python's sqlite3 module only starts a transaction before INSERT/UPDATE/DELETE, 
+        #      a SAVEPOINT outside a transaction would start (and RELEASE would commit) a transaction of its own. 
+        if not self.connection.in_transaction:
+            self._execute_sql_command('BEGIN')
+        self._savepoint_level += 1
+        savepoint_name = f'{name}_{self._savepoint_level}'
+        self._execute_sql_command(f'SAVEPOINT {savepoint_name}')
+        try:
+            yield
+        except Exception:
+            self.log_info(f'Rolling back to {savepoint_name}')
+            self._execute_sql_command(f'ROLLBACK TO {savepoint_name}')
+            self._execute_sql_command(f'RELEASE {savepoint_name}')
+            raise
+        else:
+            self._execute_sql_command(f'RELEASE {savepoint_name}')
+        finally:
+            self._savepoint_level -= 1
     def rollback(self):
         self.log_info('Rolling back')
         self.connection.rollback()
-    def create_table(self, tabledef):
+    def create_table(self, tabledef: TableDefinition):
         sql = SQLcreateTable(tabledef)
         self.execute_sql_command(sql)
+        for index in tabledef.indexes:
+            self.create_index(tabledef, index)
+    def create_index(self, tabledef: TableDefinition, index: IndexDefinition):
+        sql = SQLcreateIndex(tabledef, index)
+        self.execute_sql_command(sql)
     def create_view(self, viewdef: ViewDefinition):
         sql = SQLcreateView(viewdef)
         self.execute_sql_command(sql)
@@ -154,21 +282,52 @@ class Database:
     def drop_view(self, viewdef):
         sql = SQLdropView(viewdef)
         self.execute_sql_command(sql)
-    def create_record(self, tabledef, **args):
-        sql = SQLinsert(tabledef, **args)
-        self.execute_sql_command(sql)
+    def create_record(self, tabledef, columns: list[str], values: list[Any]):
+        self.execute_template(('insert', tabledef.name, tuple(columns)), 
+                              lambda values: SQLinsert(tabledef, columns=columns, values=values), values)
+    def create_records(self, tabledef, columns: list[str], values_list: Iterable[list[Any]]):
+        # bulk version of create_record: one INSERT statement for all records
+        template = statement_cache.get_template(('insert', tabledef.name, tuple(columns)), 
+                                                lambda values: SQLinsert(tabledef, columns=columns, values=values), columns)
+        self._execute_many_sql_command(template.query, values_list)
     def read_record(self, tabledef, **args):
         sql = SQLselect(tabledef, **args)        
         return self.execute_select(sql)
+    def read_records_where(self, tabledef, where_columns: list[str], where_values: list[Any], columns: list[str] = None)->list[Any]:
+        # SELECT (with cached statement), see _where_template
+        return self.execute_template(('select', tabledef.name, tuple(columns) if columns else (), *Database._where_signature(where_columns, where_values)),
+                                     lambda values: SQLselect(tabledef, columns=columns if columns else [], where=Database._where_template(where_columns, values)),
+                                     where_values, return_values=True)
     def read_view_record(self, viewdef: ViewDefinition, **args):
         sql = SQLselectView(viewdef, **args)        
         return self.execute_select(sql)
     def update_record(self, tabledef, **args):
         sql = SQLupdate(tabledef, **args)
         self.execute_sql_command(sql)
+    def update_record_where(self, tabledef, columns: list[str], values: list[Any], where_columns: list[str], where_values: list[Any]):
+        # UPDATE (with cached statement), see _where_template
+        n_columns = len(columns)
+        self.execute_template(('update', tabledef.name, tuple(columns), *Database._where_signature(where_columns, where_values)),
+                              lambda values: SQLupdate(tabledef, columns=columns, values=values[:n_columns], 
+                                                       where=Database._where_template(where_columns, values[n_columns:])),
+                              [*values, *where_values])
+    def update_records(self, tabledef, columns: list[str], values_list: Iterable[list[Any]], where_columns: list[str]):
+        # bulk version of update_record: one UPDATE statement for all records
+        # each entry in values_list: the values for the columns, followed by the values for the where_columns
+        n_columns = len(columns)
+        template = statement_cache.get_template(('update', tabledef.name, tuple(columns), tuple(where_columns), (-1,)*len(where_columns)),
+                                                lambda values: SQLupdate(tabledef, columns=columns, values=values[:n_columns], 
+                                                                         where=Database._where_template(where_columns, values[n_columns:])),
+                                                [*columns, *where_columns])
+        self._execute_many_sql_command(template.query, values_list)
     def delete_record(self, tabledef, **args):
         sql = SQLdelete(tabledef, **args)
         self.execute_sql_command(sql)
+    def delete_records_where(self, tabledef, where_columns: list[str], where_values: list[Any]):
+        # DELETE (with cached statement), see _where_template
+        self.execute_template(('delete', tabledef.name, *Database._where_signature(where_columns, where_values)),
+                              lambda values: SQLdelete(tabledef, where=Database._where_template(where_columns, values)),
+                              where_values)
 
 class Schema:
     def __init__(self):
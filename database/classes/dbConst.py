@@ -6,6 +6,8 @@ INTEGER = 'INTEGER'
 REAL = 'REAL'
 DATE = 'TEXT' # SQLITE doesn't have a separate DATE type
 
+MAX_SQL_VARIABLES = 999 # SQLITE_MAX_VARIABLE_NUMBER for older SQLite versions (newer versions allow more)
+
 
 NAME = 'name'
 TYPE = 'type'
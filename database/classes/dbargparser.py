@@ -1,22 +1,22 @@
 class dbArgParser:
-    def __parse_args(self, target, store, default, Key, **args):
+    def __parse_args(self, target, store, default, Key, lowered_args: list[tuple]):
         if isinstance(default, list):
             value = default.copy()
+            Keys = Key + 's'
+            for key,arg_value in lowered_args:
+                if key == Keys:
+                    value.extend(arg_value)
+                elif key == Key:
+                    value.append(arg_value)
         else:
             value = default
-        for arg in args:
-            key = arg.lower()
-            if isinstance(default, list):                
-                if key == Key + 's':
-                    value.extend(args[arg])
-                elif key == Key:
-                    value.append(args[arg])
-            else:
+            for key,arg_value in lowered_args:
                 if key == Key:
-                    value = args[arg]
+                    value = arg_value
         setattr(target, store, value)        
     def parse(self, flags, target, flag_map, **args):
+        lowered_args = [(arg.lower(), value) for arg,value in args.items()]
         for map in flag_map:
             if map.get("flag", None) in flags:
-                self.__parse_args(target, map["attribute"], map["default"], map["key"], **args)
+                self.__parse_args(target, map["attribute"], map["default"], map["key"], lowered_args)
     
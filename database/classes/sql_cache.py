@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+class SQLparameter:
+    """ placeholder for a value while building a statement template: the index of the value (see SQLStatementCache) """
+    __slots__ = ('index',)
+    def __init__(self, index: int):
+        self.index = index
+    def __repr__(self):
+        return f'?{self.index}'
+
+class SQLtemplate(NamedTuple):
+    query: str
+    parameter_order: tuple[int,...] # for each ? in the query: the index of the value
+    def parameters(self, values: list[Any])->list[Any]:
+        return [values[index] for index in self.parameter_order]
+
+def flat_values(values: list[Any])->list[Any]:
+    # the values of a statement, the values of a list (IN clause) are included one by one
+    return [item for value in values for item in (value if isinstance(value, list) else (value,))]
+
+class SQLStatementCache:
+    """ Cache for statement templates: the finished SQL string and the order of the parameters.
+
+        Keyed by a signature supplied by the caller, e.g. ('select', table name, columns, where columns, IN sizes).
+        The signature must be cheap to compute and must determine the SQL completely
+        (so it includes e.g. the number of values in an IN clause), but not the values themselves.
+
+        On a miss the statement is built once, with placeholders (SQLparameter) instead of the values.
+        On a hit no statement (or WHERE expression) is built at all: the parameters are taken
+        from the values in the order of the template.
+
+        Least recently used signatures are dropped when the cache is full.
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.enabled = True
+        self._templates: OrderedDict[Hashable, SQLtemplate] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    @staticmethod
+    def _placeholders(values: list[Any])->list[Any]:
+        # same structure as values (lists stay lists), numbered as in flat_values
+        result = []
+        n = 0
+        for value in values:
+            if isinstance(value, list):
+                result.append([SQLparameter(index) for index in range(n, n + len(value))])
+                n += len(value)
+            else:
+                result.append(SQLparameter(n))
+                n += 1
+        return result
+    @staticmethod
+    def _build(build_sql: Callable[[list[Any]], Any], values: list[Any])->SQLtemplate:
+        sql = build_sql(SQLStatementCache._placeholders(values))
+        return SQLtemplate(sql.query, tuple(parameter.index for parameter in (sql.parameters or [])))
+    def get_template(self, signature: Hashable, build_sql: Callable[[list[Any]], Any], values: list[Any])->SQLtemplate:
+        """ build_sql(values) returns the statement (SQLbase) for a list of values """
+        if not self.enabled:
+            return SQLStatementCache._build(build_sql, values)
+        if (result := self._templates.get(signature, None)) is not None:
+            self._templates.move_to_end(signature)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = SQLStatementCache._build(build_sql, values)
+        self._templates[signature] = result
+        if len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
+        return result
+    def clear(self):
+        self._templates.clear()
+        self.hits = 0
+        self.misses = 0
+    def __len__(self)->int:
+        return len(self._templates)
+
+statement_cache = SQLStatementCache()
@@ -49,6 +49,7 @@ class Ops(Enum):
 #     NO_COLUMN_REF = auto()
 
 class SQLexpression:
+    column_ref_pattern = re.compile(r'.+\..+')
     def __init__(self, part1, operator:Ops, part2, **flags):
         if part1 is None and not isinstance(part2, SQLexpression):
             raise SyntaxError(f'SQL expression: {part1}, {operator}, {part2}')
@@ -57,7 +58,6 @@ class SQLexpression:
         self.part2 = part2
         self.brackets = True
         self.apply = None
-        self.column_ref_pattern = re.compile(r'.+\..+')
 #TODO: uitzoeken waarom dit gedoe met column_ref niet goed werkt 
 # daardoor kan je nl niet string parameters met een punt hebben, 
 # dit is alleen een hack om dat weg te toveren        
@@ -72,7 +72,9 @@ class SQLexpression:
                     self.apply = flags[flag]
                 case 'no_column_ref':
                     self.ignore_column_ref = flags[flag]
-        self._prepare()
+        # parametrized string and parameters are only built when needed
+        self._parametrized = None
+        self._parameters = None
     def _apply(self, str):
         if self.apply:
             return f'{self.apply} ({str})'
@@ -104,37 +106,49 @@ class SQLexpression:
     @staticmethod
     def _is_string_parameter(s: str):       
         return s and s[0] == "'" and s[-1] == "'"
+    def _part2_is_column_ref(self)->bool:
+        return isinstance(self.part2,str) and (not self.ignore_column_ref) and self._is_column_ref(self.part2)
     def _prepare(self):
-        self._parametrized = ''
-        self._parameters = []
         if isinstance(self.part1,SQLexpression):
             part1 = self.part1.parametrized
-            self._parameters.extend(self.part1.parameters)
         else:
             part1 = self.part1
         if isinstance(self.part2,SQLexpression):
             part2 = self.part2.parametrized
-            self._parameters.extend(self.part2.parameters)
-        elif isinstance(self.part2,str) and (not self.ignore_column_ref) and self._is_column_ref(self.part2):
+        elif self._part2_is_column_ref():
             part2 = self.part2
         elif isinstance(self.part2,list):
             part2 = f'({",".join(["?" for _ in self.part2])})'
-            self._parameters.extend(self.part2)
         else:
             part2 = '?'
-            self._parameters.append(self.part2)
         if part1 == None:
             self._parametrized = self._bracket_apply(f'{self.operator} {part2}')
         else:
             self._parametrized = self._bracket_apply(f'{part1} {self.operator} {part2}')
+    def _prepare_parameters(self):
+        self._parameters = []
+        if isinstance(self.part1,SQLexpression):
+            self._parameters.extend(self.part1.parameters)
+        if isinstance(self.part2,SQLexpression):
+            self._parameters.extend(self.part2.parameters)
+        elif self._part2_is_column_ref():
+            pass
+        elif isinstance(self.part2,list):
+            self._parameters.extend(self.part2)
+        else:
+            self._parameters.append(self.part2)
     @property 
     def parametrized(self)->str:
+        if self._parametrized is None:
+            self._prepare()
         return self._parametrized
     @property
     def parameters(self)->list[str]:
+        if self._parameters is None:
+            self._prepare_parameters()
         return self._parameters
     def db_str(self)->str:
-        return f'{self.parametrized} {self._parameters}'
+        return f'{self.parametrized} {self.parameters}'
 SQE=SQLexpression    
 
 class SQEjoin(SQE):
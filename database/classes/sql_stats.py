@@ -0,0 +1,100 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import re
+from general.fileutil import created_directory, from_main_path, test_directory_exists
+from main.config import BoolValueConvertor, FloatValueConvertor, IntValueConvertor, config
+from main.log import log_print
+
+def init_config():
+    config.register('database', 'statistics', BoolValueConvertor)
+    config.init('database', 'statistics', False)
+    config.register('database', 'slow_query_ms', FloatValueConvertor)
+    config.init('database', 'slow_query_ms', 100.0)
+    config.register('database', 'statistics_top', IntValueConvertor)
+    config.init('database', 'statistics_top', 20)
+init_config()
+
+SLOW_QUERY_LOG = 'aapa_slow_queries.log'
+
+@dataclass
+class StatementStats:
+    statement: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+    @property
+    def mean_time(self)->float:
+        return self.total_time / self.count if self.count else 0.0
+
+class StatementStatistics:
+    """ Timing per (normalized) SQL statement: number of calls, wall time and rows returned. 
+
+        Statements are normalized: whitespace is collapsed and parameter lists (?,?,...) 
+        are counted as one statement, independent of the number of parameters.
+        
+        Statements that take longer than slow_query_ms are written to a separate log (SLOW_QUERY_LOG).
+        
+        Enabled through the configuration ([database] statistics = True).
+    """
+    IN_LIST_PATTERN = re.compile(r'\(\?(?:\s*,\s*\?)+\)')
+    def __init__(self):
+        self.enabled = config.get('database', 'statistics')
+        self.slow_query_seconds = config.get('database', 'slow_query_ms') / 1000
+        self._stats: dict[str, StatementStats] = {}
+        self._normalized: dict[str, str] = {}
+        self._slow_logger: logging.Logger = None
+    @staticmethod
+    def _normalize(statement: str)->str:
+        return StatementStatistics.IN_LIST_PATTERN.sub('(?,...)', ' '.join(statement.split()))
+    def normalized(self, statement: str)->str:
+        if (result := self._normalized.get(statement, None)) is None:
+            result = self._normalized[statement] = self._normalize(statement)
+        return result
+    def record(self, statement: str, seconds: float, rows: int = 0, parameters = None):
+        normalized = self.normalized(statement)
+        if (stats := self._stats.get(normalized, None)) is None:
+            stats = self._stats[normalized] = StatementStats(normalized)
+        stats.count += 1
+        stats.total_time += seconds
+        stats.rows += rows
+        if seconds > stats.max_time:
+            stats.max_time = seconds
+        if seconds >= self.slow_query_seconds:
+            self._log_slow_query(normalized, seconds, rows, parameters)
+    def _get_slow_logger(self)->logging.Logger:
+        if self._slow_logger is None:
+            log_path = from_main_path('logs')
+            if not (test_directory_exists(log_path) or created_directory(log_path)):
+                log_path = Path('.').resolve()
+            self._slow_logger = logging.getLogger('aapa.slow_queries')
+            self._slow_logger.propagate = False
+            self._slow_logger.setLevel(logging.INFO)
+            handler = logging.FileHandler(str(log_path.joinpath(SLOW_QUERY_LOG)), encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s-%(message)s', '%Y-%m-%d %H:%M:%S'))
+            self._slow_logger.addHandler(handler)
+        return self._slow_logger
+    def _log_slow_query(self, statement: str, seconds: float, rows: int, parameters):
+        self._get_slow_logger().info(f'{seconds*1000:.1f} ms ({rows} rows): {statement} {parameters if parameters else ""}')
+    def top(self, n: int = None, key = lambda stats: stats.total_time)->list[StatementStats]:
+        n = n if n else config.get('database', 'statistics_top')
+        return sorted(self._stats.values(), key=key, reverse=True)[:n]
+    def report(self, n: int = None):
+        if not self.enabled or not self._stats:
+            return
+        total_time = sum(stats.total_time for stats in self._stats.values())
+        total_count = sum(stats.count for stats in self._stats.values())
+        log_print(f'SQL statistieken: {total_count} statements ({len(self._stats)} verschillend), {total_time:.3f} s.')
+        log_print(f'{"aantal":>8} {"totaal (ms)":>12} {"gem. (ms)":>10} {"max (ms)":>10} {"rijen":>8}  statement')
+        for stats in self.top(n):
+            log_print(f'{stats.count:8} {stats.total_time*1000:12.1f} {stats.mean_time*1000:10.2f} {stats.max_time*1000:10.2f} {stats.rows:8}  {stats.statement}')
+    def clear(self):
+        self._stats.clear()
+        self._normalized.clear()
+
+statement_statistics = StatementStatistics()
+
+def report_statement_statistics(n: int = None):
+    statement_statistics.report(n)
@@ -47,13 +47,19 @@ class SQLselect(SQLselectBase):
             result = result + ',' + ','.join([join for join in self.joins])
         return result
 
+def _create_index_str(index: IndexDefinition, table_name: str)->str:
+    result = 'CREATE '
+    if index.is_unique():
+        result = result + 'UNIQUE '
+    result = result + f'INDEX IF NOT EXISTS {index.name} ON {table_name}(' + ','.join([column for column in index.columns])
+    return result
+
 class SQLcreateTable(SQLTablebase):
-    def __create_index_str(self, index: IndexDefinition)->str:
-        result = 'CREATE '
-        if index.is_unique():
-            result = result + 'UNIQUE '
-        result = result + f'INDEX IF NOT EXISTS {index.name} ON {self.table_name}(' + ','.join([column for column in index.columns])
-        return result
+    def __init__(self, table_def: TableDefinition, include_indexes = False, **args):
+        # include_indexes: the CREATE INDEX statements are part of the query (more than one statement, can not be executed!)
+        # see Database.create_table for creating the table with its indexes
+        self.include_indexes = include_indexes
+        super().__init__(table_def, **args)
     def _get_query(self):
         def column_string(column: ColumnDefinition):
             result = f'{column.name} {column.type}'
@@ -75,10 +81,17 @@ class SQLcreateTable(SQLTablebase):
             result = result + f',PRIMARY KEY({",".join([column.name for column in self.table_def.columns if column.is_primary()])})'
         if self.table_def.has_foreign_keys():
             result  = result + ',' + ','.join([f'FOREIGN KEY({key.column_name}) REFERENCES {key.ref_table}({key.ref_column}){key.action_str()}' for key in self.table_def.foreign_keys])
-        if self.table_def.has_index():
-            result  = result + ');\n' + ');\n'.join([self.__create_index_str(index) for index in self.table_def.indexes])
+        if self.include_indexes and self.table_def.has_index():
+            result  = result + ');\n' + ');\n'.join([_create_index_str(index, self.table_name) for index in self.table_def.indexes])
         return result + ');'
 
+class SQLcreateIndex(SQLTablebase):
+    def __init__(self, table_def: TableDefinition, index: IndexDefinition, **args):
+        self.index = index
+        super().__init__(table_def, **args)
+    def _get_query(self):
+        return _create_index_str(self.index, self.table_name) + ');'
+
 class SQLdropTable(SQLTablebase):
     def _get_query(self):
         return f'DROP TABLE IF EXISTS {self.table_name};'
@@ -1,4 +1,5 @@
 import logging
+from types import CodeType, FrameType
 from general.classutil import find_calling_module
 from general.fileutil import file_exists, from_main_path
 from general.singleton import Singleton
@@ -37,6 +38,8 @@ class DebugConfig(Singleton):
     def __init__(self):
         self.info = _ModuleInfo()
         self.info.add('__main__')
+        self._enabled_cache: dict[str,bool] = {} # module name -> enabled, decided once per module
+        self._code_cache: dict[CodeType,bool] = {} # code object -> enabled, see frame_is_enabled
     def enabled_loggers(self)->list[str]:
         return [info.module_name for info in self.info if info.enabled]
     def disabled_loggers(self)->list[str]:
@@ -58,8 +61,19 @@ class DebugConfig(Singleton):
                 elif l[0] == '#':
                     continue
                 self.info.add(l, enabled)
+        self._enabled_cache.clear()
+        self._code_cache.clear()
     def module_is_enabled(self, module_name: str)->bool:
-        return self.info.is_enabled(module_name)
+        if (enabled := self._enabled_cache.get(module_name)) is None:
+            enabled = self._enabled_cache[module_name] = self.info.is_enabled(module_name)
+        return enabled
+    def frame_is_enabled(self, frame: FrameType, calling_module: str)->bool:
+        # the module of a code object does not change, so frames are only walked for a new code object
+        if (enabled := self._code_cache.get(frame.f_code)) is None:
+            if (module_name := frame.f_globals.get('__name__', '')) == calling_module:
+                return self.module_is_enabled(find_calling_module(calling_module))
+            enabled = self._code_cache[frame.f_code] = self.module_is_enabled(module_name)
+        return enabled
     def _initialize_disabled_loggers(self):
         for module_name,logger in logging.root.manager.loggerDict.items():
             logger.disabled = not module_is_enabled(module_name)
@@ -86,6 +100,9 @@ def module_is_enabled(module_name: str)->bool:
 def check_caller_is_enabled(calling_module: str)->bool:
     caller = find_calling_module(calling_module)
     return module_is_enabled(caller)
+def check_frame_is_enabled(frame: FrameType, calling_module: str)->bool:
+    """ as check_caller_is_enabled, for a known caller frame (cached per code object). """
+    return _debug_config.frame_is_enabled(frame, calling_module)
 def get_disabled_loggers()->list[str]:
     return _debug_config.disabled_loggers()
 def get_enabled_loggers()->list[str]:
@@ -0,0 +1,71 @@
+""" INDEX_ADVISOR
+
+    Runs EXPLAIN QUERY PLAN for statements executed on the database and
+    reports the statements that scan a complete table.
+
+    Usage:
+        database.start_recording()
+        ... (normal processing)
+        advisor = IndexAdvisor(database)
+        advisor.report(advisor.analyze(database.stop_recording()))
+
+    or for a complete run: set [database] index_advisor = True in aapa_config.ini, 
+    the statements are recorded from opening the database and reported at the end 
+    of the run (report_index_advice, see aapa.py and run_plugin.py).
+
+    Only statements with a WHERE clause are checked: a SELECT without WHERE 
+    will always scan the complete table.
+"""
+from dataclasses import dataclass
+import re
+from typing import Any, Iterable
+from database.classes.database import Database, recording_databases
+from main.log import log_info, log_print, log_warning
+
+@dataclass
+class TableScan:
+    statement: str
+    table: str
+    detail: str
+
+class IndexAdvisor:
+    STATEMENT_PATTERN = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b.*\bWHERE\b', re.IGNORECASE | re.DOTALL)
+    SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS \w+)?$', re.IGNORECASE) # SQLite < 3.36: "SCAN TABLE X"
+    def __init__(self, database: Database):
+        self.database = database
+    def must_check(self, statement: str)->bool:
+        return self.STATEMENT_PATTERN.match(statement) is not None
+    def query_plan(self, statement: str, parameters: Iterable[Any] = None)->list[str]:
+        try:
+            rows = self.database.connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters if parameters else [])
+            return [row[-1] for row in rows]
+        except Exception as E:
+            log_warning(f'Kan query plan niet bepalen voor {statement}: {E}')
+            return []
+    def analyze(self, statements: dict[str, Iterable[Any]])->list[TableScan]:
+        result = []
+        if not statements:
+            return result
+        for statement, parameters in statements.items():
+            if not self.must_check(statement):
+                continue
+            for detail in self.query_plan(statement, parameters):
+                if (match := self.SCAN_PATTERN.match(detail)) and not match.group('table').lower().startswith('sqlite_'): # internal tables
+                    result.append(TableScan(statement=statement, table=match.group('table'), detail=detail))
+        log_info(f'Index advisor: {len(statements)} statements, {len(result)} table scans.')
+        return result
+    def report(self, table_scans: list[TableScan]):
+        if not table_scans:
+            log_print('Geen volledige table scans gevonden.')
+            return
+        log_print(f'Volledige table scans ({len(table_scans)}):')
+        for table in sorted({scan.table for scan in table_scans}):
+            log_print(f'\t{table}:')
+            for scan in table_scans:
+                if scan.table == table:
+                    log_print(f'\t\t{" ".join(scan.statement.split())}')
+
+def report_index_advice():
+    for database in recording_databases():
+        advisor = IndexAdvisor(database)
+        advisor.report(advisor.analyze(database.stop_recording()))
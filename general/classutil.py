@@ -1,5 +1,6 @@
 import inspect
 import re
+import sys
 from typing import Any, Tuple, Type
 import importlib
 from pathlib import Path
@@ -30,23 +31,13 @@ def find_attribute_name(owner: Type[Any], object: Any)->str:
     return ''
 
 def find_calling_module(calling_module: str)->str:
-    MODULEPATTERN = r"\<module '(?P<module>.*)' from (?P<file>.*)\>"
-    def find_module_name(module_str: str)->str:
-        if (m := re.match(MODULEPATTERN, module_str)):
-            return m.group("module")
-        return ""
-    def _caller_(stack_frame: inspect.FrameInfo)->str:
-        return find_module_name(str(inspect.getmodule(stack_frame[0])))       
-    stack = inspect.stack()
-    level = 0
-    cur_module = _caller_(stack[level])
-    while level < len(stack) and cur_module != calling_module:
-        cur_module = _caller_(stack[level])
-        level+=1
-    while level < len(stack) and cur_module == calling_module:
-        cur_module = _caller_(stack[level])
-        level+=1
-    return cur_module
+    # walks the frame chain directly: inspect.stack() builds (and reads the source context of) every frame
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') != calling_module:
+        frame = frame.f_back
+    while frame is not None and frame.f_globals.get('__name__') == calling_module:
+        frame = frame.f_back
+    return frame.f_globals.get('__name__', '') if frame is not None else ''
 
 def find_all_modules(root: str, import_as_well = False)->list[str]:
     root_path = Path(root.replace('.', '/'))
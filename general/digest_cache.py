@@ -0,0 +1,79 @@
+import atexit
+from pathlib import Path
+import sqlite3 as sql3
+from threading import Lock
+from data.general.roots import Roots
+from general.fileutil import from_main_path
+from main.config import BoolValueConvertor, config
+from main.log import log_warning
+
+def init_config():
+    config.register('digests', 'cache', BoolValueConvertor)
+    config.init('digests', 'cache', False) # opt-in: see aapa_config.ini
+    config.init('digests', 'cache_file', 'aapa_digests.db')
+init_config()
+
+class DigestCache:
+    """ Persistent cache for file digests (sidecar SQLite database).
+
+        Keyed by (encoded path, algorithm, size, mtime_ns): a digest is valid as long as the file size
+        and modification time are unchanged. The path is encoded (see Roots) so the cache
+        is independent of the computer (OneDrive root).
+
+        New digests are committed in batches of COMMIT_BATCH and at exit.
+    """
+    COMMIT_BATCH = 100
+    def __init__(self, filename: str|Path = None):
+        self.filename = filename
+        self.enabled = config.get('digests', 'cache')
+        self._connection: sql3.Connection = None
+        self._lock = Lock() # hashing may be done on several threads
+        self._n_pending = 0
+        self.hits = 0
+        self.misses = 0
+    def _get_connection(self)->sql3.Connection:
+        if self._connection is None:
+            filename = self.filename if self.filename else from_main_path(config.get('digests', 'cache_file'))
+            try:
+                self._connection = sql3.connect(str(filename), check_same_thread=False)
+                self._connection.execute('CREATE TABLE IF NOT EXISTS FILE_DIGESTS (path TEXT, algorithm TEXT, size INTEGER, mtime_ns INTEGER, digest TEXT, PRIMARY KEY(path, algorithm))')
+                atexit.register(self.close)
+            except sql3.Error as E:
+                log_warning(f'Digest-cache {filename} kan niet worden geopend ({E}). Digests worden niet bewaard.')
+                self.enabled = False
+        return self._connection
+    @staticmethod
+    def path_key(path: str|Path)->str:
+        return Roots.encode_path(str(path)).lower()
+    def get(self, path: str|Path, algorithm: str, size: int, mtime_ns: int)->str:
+        """ the stored digest, None if unknown or if the file has changed """
+        with self._lock:
+            if not self.enabled or (connection := self._get_connection()) is None:
+                return None
+            row = connection.execute('SELECT digest FROM FILE_DIGESTS WHERE path=? AND algorithm=? AND size=? AND mtime_ns=?',
+                                     [self.path_key(path), algorithm, size, mtime_ns]).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+    def put(self, path: str|Path, algorithm: str, size: int, mtime_ns: int, digest: str):
+        with self._lock:
+            if not self.enabled or (connection := self._get_connection()) is None:
+                return
+            connection.execute('INSERT OR REPLACE INTO FILE_DIGESTS (path, algorithm, size, mtime_ns, digest) VALUES (?,?,?,?,?)',
+                               [self.path_key(path), algorithm, size, mtime_ns, digest])
+            self._n_pending += 1
+            if self._n_pending >= self.COMMIT_BATCH:
+                self._commit()
+    def _commit(self):
+        self._connection.commit()
+        self._n_pending = 0
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+digest_cache = DigestCache()
@@ -1,15 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Iterable
 from hashlib import file_digest 
+from general.digest_cache import digest_cache
+from main.config import IntValueConvertor, config
+from main.log import log_warning
 
-def _hashfunc(file:BinaryIO):
-    return file_digest(file, 'sha3_256').hexdigest()
+# SHA3-256 digests are stored as is (untagged), digests computed with another algorithm 
+# are tagged with the algorithm, e.g. "blake2b:0a1b2c...". 
+# In this way digests computed with an earlier algorithm remain valid. 
+DEFAULT_ALGORITHM = 'sha3_256'
+DIGEST_ALGORITHMS = ['sha3_256', 'blake2b']
+def init_config():
+    config.init('digests', 'algorithm', DEFAULT_ALGORITHM)
+    config.register('digests', 'threads', IntValueConvertor)
+    config.init('digests', 'threads', 0) # 0: number of processors (at most 8)
+init_config()
 
-def hash_file_digest(file: str|Path|BinaryIO)->str:
-    """ return a (SHA3-256) hash in string form. """
+def digest_algorithm(digest: str)->str:
+    """ return the algorithm used to compute a (stored) digest. """
+    if digest and (tag_end := digest.find(':')) != -1:
+        return digest[:tag_end]
+    return DEFAULT_ALGORITHM
+
+def current_digest_algorithm()->str:
+    """ return the algorithm for new digests (configuration setting). """
+    if (algorithm := config.get('digests', 'algorithm')) in DIGEST_ALGORITHMS:
+        return algorithm
+    log_warning(f'Onbekend digest-algoritme "{algorithm}". Standaard ({DEFAULT_ALGORITHM}) wordt gebruikt.')
+    config.set('digests', 'algorithm', DEFAULT_ALGORITHM)
+    return DEFAULT_ALGORITHM
+
+def _hashfunc(file:BinaryIO, algorithm: str):
+    digest = file_digest(file, algorithm).hexdigest()
+    return digest if algorithm == DEFAULT_ALGORITHM else f'{algorithm}:{digest}'
+
+def hash_file_digest(file: str|Path|BinaryIO, algorithm: str = None)->str:
+    """ return a hash in string form. 
+
+        The algorithm defaults to the configured algorithm (see current_digest_algorithm).
+        For files given by name the digest cache (see DigestCache, [digests] cache) is used if enabled:
+        the file is only hashed if it is new or has been changed. 
+    """
+    algorithm = algorithm if algorithm else current_digest_algorithm()
     if isinstance(file,str|Path):
+        stat = os.stat(file)
+        if (digest := digest_cache.get(file, algorithm, stat.st_size, stat.st_mtime_ns)) is not None:
+            return digest
         with open(file, "rb") as file_obj:
-            return _hashfunc(file_obj)
+            digest = _hashfunc(file_obj, algorithm)
+        digest_cache.put(file, algorithm, stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+    else:
+        return _hashfunc(file, algorithm)
+
+def _try_hash_file_digest(file: str|Path, algorithm: str)->str:
+    try:
+        return hash_file_digest(file, algorithm)
+    except OSError:
+        return None
+
+def hash_many(files: Iterable[str|Path], threads: int = None, algorithm: str = None)->dict[str,str]:
+    """ return the hashes of a number of files: {str(filename): hash}.
+
+        The files are hashed in parallel (hashlib releases the GIL while hashing).
+        Files that can not be read are left out. 
+    """
+    filenames = list(dict.fromkeys(str(file) for file in files))
+    algorithm = algorithm if algorithm else current_digest_algorithm()
+    threads = threads if threads else (config.get('digests', 'threads') or min(8, os.cpu_count() or 1))
+    if threads <= 1 or len(filenames) <= 1:
+        digests = [_try_hash_file_digest(filename, algorithm) for filename in filenames]
     else:
-        return _hashfunc(file)
-    
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            digests = list(executor.map(lambda filename: _try_hash_file_digest(filename, algorithm), filenames))
+    return {filename: digest for filename, digest in zip(filenames, digests) if digest is not None}
@@ -1,11 +1,23 @@
+import atexit
 from dataclasses import dataclass
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
+import queue
+import sys
+from types import FrameType
 from typing import Protocol
 from general.fileutil import created_directory, from_main_path, path_with_suffix, test_directory_exists
 from general.singleton import Singleton
-from debug.debug import check_caller_is_enabled, get_disabled_loggers, get_enabled_loggers, initialize_disabled_loggers
+from main.config import BoolValueConvertor, IntValueConvertor, config
+from debug.debug import check_caller_is_enabled, check_frame_is_enabled, get_disabled_loggers, get_enabled_loggers, initialize_disabled_loggers
+
+def init_config():
+    config.register('logging', 'asynchronous', BoolValueConvertor)
+    config.init('logging', 'asynchronous', False) # opt-in: see aapa_config.ini
+    config.register('logging', 'queue_size', IntValueConvertor)
+    config.init('logging', 'queue_size', 10000)
+init_config()
 
 
 class PrintFunc(Protocol):
@@ -55,6 +67,14 @@ class ConsolePrinter(Singleton):
     def debug(self, msg: str):
         self.__check_func('debug', msg)
 
+class _LogQueueHandler(QueueHandler):
+    # the queue is bounded: if the writing thread falls behind, logging waits instead of dropping records
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.put(record)
+    def prepare(self, record: logging.LogRecord)->logging.LogRecord:
+        # formatting is done by the file handler on the listener thread
+        return record
+
 class AAPAlogger(Singleton):
     def __init__(self, filename, debug=False):
         log_path = from_main_path('logs')
@@ -66,43 +86,81 @@ class AAPAlogger(Singleton):
 
     def __init_config(self, filename: str, log_path: str, date_fmt: str, format: str, debug: bool):
         self.is_debug = debug
+        self._listener: QueueListener = None
         if self.is_debug:
             self.__init_debug_config(filename, log_path, date_fmt, format)
         else:
             self.__init_normal_config(filename, log_path, date_fmt, format)
+    def __init_handler(self, handler: logging.Handler, date_fmt: str, format: str, level: int):
+        handler.setFormatter(logging.Formatter(format, datefmt=date_fmt))
+        if config.get('logging', 'asynchronous'):
+            # records are written to the file on a background thread, see _LogQueueHandler
+            self._listener = QueueListener(queue.Queue(maxsize=config.get('logging', 'queue_size')), handler)
+            self._handler = handler
+            logging.basicConfig(handlers=[_LogQueueHandler(self._listener.queue)], level=level)
+            self._listener.start()
+            atexit.register(self.stop)
+        else:
+            logging.basicConfig(handlers=[handler], level=level)
     def __init_debug_config(self, filename: str, log_path: str, date_fmt: str, format: str):
         log_name = Path(filename).stem + '_debug'
-        
-        logging.basicConfig(filename=path_with_suffix(log_path.joinpath(log_name), '.log'),  encoding='utf-8', filemode='w',
-                            format=format, datefmt=date_fmt, level=logging.DEBUG)
+        self.__init_handler(logging.FileHandler(path_with_suffix(log_path.joinpath(log_name), '.log'), mode='w', encoding='utf-8'), 
+                            date_fmt, format, logging.DEBUG)
         initialize_disabled_loggers()
     def __init_normal_config(self, filename: str, log_path: str, date_fmt: str, format: str):
         log_name = Path(filename).name
-        logging.basicConfig(handlers=[TimedRotatingFileHandler(str(path_with_suffix(log_path.joinpath(log_name), '.log')),'D', 1, 7, 
-                            encoding='utf-8')], format=format, datefmt=date_fmt, level=logging.INFO)
+        self.__init_handler(TimedRotatingFileHandler(str(path_with_suffix(log_path.joinpath(log_name), '.log')),'D', 1, 7, 
+                            encoding='utf-8'), date_fmt, format, logging.INFO)
         self.disabled_loggers = []
         self.enabled_loggers = []
+    def stop(self):
+        # writes all queued records, later records are written directly
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        root = logging.getLogger()
+        for handler in [handler for handler in root.handlers if isinstance(handler, _LogQueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(self._handler)
+        self._handler.flush()
     def info(self, msg):
         logging.info(msg)
     def warning(self, msg):
         logging.warning(msg)
     def error(self, msg):
         logging.error(msg)
-    def debug(self, msg):
-        if check_caller_is_enabled(self.__module__):
+    def debug(self, msg, caller: FrameType = None):
+        if check_frame_is_enabled(caller, self.__module__) if caller else check_caller_is_enabled(self.__module__):
             logging.debug(msg)
 
 _logger: AAPAlogger = None
 _console: ConsolePrinter = None
+# set once in init_logging, so callers can skip building messages that would be discarded anyway
+_info_enabled = False
+_debug_enabled = False
 
 def init_logging(filename: str, debug = False):
-    global _logger, _console
+    global _logger, _console, _info_enabled, _debug_enabled
     _logger = AAPAlogger(filename, debug)
+    _info_enabled = True
+    _debug_enabled = _logger.is_debug
     if debug:
         log_debug(f'Debug loaded.\nDisabled packages: {str(get_disabled_loggers())}' + 
                     f'\nEnabled packages: {str(get_enabled_loggers())}')
     _console = ConsolePrinter()
 
+def log_info_enabled()->bool:
+    return _info_enabled
+
+def log_debug_enabled()->bool:
+    return _debug_enabled
+
+def stop_logging():
+    # flush the log queue, called at exit as well
+    if _logger is not None:
+        _logger.stop()
+
 def console_info(msg: str):
     if _console is not None:
         _console.info(msg)
@@ -110,7 +168,7 @@ def console_info(msg: str):
         print(msg)
 
 def log_info(msg: str, to_console=False):
-    if _logger is not None:
+    if _info_enabled:
         _logger.info(f'INFO:{msg}')
     if to_console:
         console_info(msg)
@@ -159,8 +217,8 @@ def console_debug(msg: str):
         print(print_str)
 
 def log_debug(msg: str, to_console=False):
-    if _logger is not None:
-        _logger.debug(f'DEBUG:{msg}')
+    if _debug_enabled:
+        _logger.debug(f'DEBUG:{msg}', sys._getframe(1))
     if to_console:
         console_debug(msg)
 
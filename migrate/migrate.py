@@ -111,3 +111,6 @@ def modify_table(database: Database, new_table: TableDefinition, copy_data: copy
     database.execute_sql_command(SQLcreateTable(new_table))
     if copy_data is None or copy_data(database, old_table_name, new_table.name):
         database._execute_sql_command(f'drop table {old_table_name}')
+        # only now: the renamed table still has the indexes with the same names
+        for index in new_table.indexes:
+            database.create_index(new_table, index)
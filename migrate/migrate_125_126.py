@@ -0,0 +1,26 @@
+""" migratie naar database v1.26
+
+Aanpassingen database: indexen.
+    FILES: digest
+    *_DETAILS: detail_id (+ class_code)
+    STUDENTEN: email, full_name
+
+"""
+from database.aapa_database import AanvraagDetailsTableDefinition, FilesTableDefinition, MijlpaalDirectoryDetailsTableDefinition, StudentDirectoryDetailsTableDefinition, StudentenTableDefinition, UndologDetailsTableDefinition, VerslagDetailsTableDefinition
+from database.classes.database import Database
+
+def create_indexes(database: Database):
+    print('creating new indexes')
+    for table in [FilesTableDefinition(), StudentenTableDefinition(), AanvraagDetailsTableDefinition(), VerslagDetailsTableDefinition(), 
+                  UndologDetailsTableDefinition(), StudentDirectoryDetailsTableDefinition(), MijlpaalDirectoryDetailsTableDefinition()]:
+        for index in table.indexes:
+            print(f'\t{index}')
+            database.create_index(table, index) # IF NOT EXISTS: existing indexes are not changed
+    database._execute_sql_command('ANALYZE')
+    print('end creating new indexes')
+
+def migrate_database(database: Database, phase = 42):    
+    create_indexes(database)
+
+def after_migrate(database_name: str, debug=False, phase=42):
+    pass
@@ -27,6 +27,7 @@ from storage.aapa_storage import AAPAStorage
 from storage.queries.base_dirs import BaseDirsQueries
 from storage.queries.studenten import StudentenQueries
 from general.fileutil import test_directory_exists
+from general.filehash import digest_algorithm
 from main.log import log_debug, log_error, log_info, log_print, log_warning
 from general.singular_or_plural import sop
 from general.timeutil import TSC
@@ -158,6 +159,7 @@ class StudentDirectoryDetector(FileProcessor):
             for subdirectory in Path(dirname).glob('*'):
                 if subdirectory.is_dir() and (new_item := self._process_subdirectory(subdirectory, student)):                    
                     student_directory.add(new_item)
+            File.prefetch_digests(student_directory.get_files())
             self.__update_kansen(student_directory)
             self.report_directory('Student directory:', student_directory)
             return student_directory
@@ -223,23 +225,30 @@ class MilestoneDetectorPipeline(FilePipeline):
             self.sqls.insert('student_directory_directories', [stud_dir_id, mijlpaal_directory.id])
             self.__get_sql_files(mijlpaal_directory.id, mijlpaal_directory.get_files(), stored_files=stored_files) 
     def __get_sql_files(self, mp_dir_id: int, files_list: list[File], stored_files: list[File]):
-        def _get_values(file: File, id_first = True)->list[Any]:
+        def _get_values(file: File, file_id: int, id_first = True)->list[Any]:
             return self.__get_values([Roots.encode_path(file.filename),TSC.timestamp_to_sortable_str(file.timestamp),
                                         file.digest,file.filetype,file.mijlpaal_type],
-                                      file.id, id_first)
+                                      file_id, id_first)
+        def _same_digest(file: File, stored: File)->bool:
+            # compare within the algorithm of the stored digest (see general.filehash)
+            if (algorithm := digest_algorithm(stored.digest)) == digest_algorithm(file.digest):
+                return file.digest == stored.digest
+            return File.get_digest(file.filename, algorithm) == stored.digest
         def _get_stored(file: File, stored_files: list[File])->File:
             for stored in stored_files:
-                if file.filename == stored.filename and file.digest == stored.digest:
+                if file.filename == stored.filename and _same_digest(file, stored):
                     return stored
             return None
         self.sqls.delete('mijlpaal_directory_files', [mp_dir_id])
         for file in files_list:            
             if (stored := _get_stored(file, stored_files)):
                 if file != stored: 
-                    self.sqls.update('files', _get_values(file, False))                  
+                    self.sqls.update('files', _get_values(file, stored.id, False))                  
+                file_id = stored.id
             else:
-                self.sqls.insert('files', _get_values(file, True))
-            self.sqls.insert('mijlpaal_directory_files', [mp_dir_id, file.id])   
+                self.sqls.insert('files', _get_values(file, file.id, True))
+                file_id = file.id
+            self.sqls.insert('mijlpaal_directory_files', [mp_dir_id, file_id])   
     def __get_sql(self, student_directory: StudentDirectory, 
                   stored_directory: StudentDirectory,
                   stored_mijlpaal_directories: list[MijlpaalDirectory], 
@@ -256,11 +265,11 @@ class MilestoneDetectorPipeline(FilePipeline):
     def __get_stored_files(self, student_directory: StudentDirectory)->list[File]:
         stored_list = []
         for mijlpaal_directory in student_directory.directories:
-            files_list = mijlpaal_directory.get_files()
-            stored_list.extend(self.storage.find_values('files', ['filename', 'digest'], 
-                                                    [{file.filename for file in files_list},
-                                                     {file.digest for file in files_list}],
-                                                     read_many=True))
+            # digests are compared in __get_sql_files, within the algorithm of the stored digest
+            if files_list := mijlpaal_directory.get_files():
+                stored_list.extend(self.storage.find_values('files', 'filename', 
+                                                        {file.filename for file in files_list},
+                                                        read_many=True))
         return stored_list
     def __get_stored_mijlpaal_directories(self, student_directory: StudentDirectory)->list[MijlpaalDirectory]:       
         result = []
@@ -53,6 +53,8 @@ class StudentenXLSImporter(FileProcessor):
         self.n_new = 0
         self.n_modified = 0
         self.n_already_there = 0
+        self.new_students: list[Student] = []
+        self.modified_students: list[Student] = []
         self.sql=SQLcollectors()# to use in migration script
         self.sql.add('studenten',
             SQLcollector({'insert':{'sql':'insert into STUDENTEN (id,stud_nr,full_name,first_name,email,status) values(?,?,?,?,?,?)'}, 
@@ -71,8 +73,13 @@ class StudentenXLSImporter(FileProcessor):
                 log_warning(f'\tVerschil in {attrib}: {a1}, {a2} in database.')
                 return True
             return False
+        def is_pending(student: Student)->bool:
+            return any(new.stud_nr == student.stud_nr or new.email == student.email for new in self.new_students)
         queries: StudentenQueries = storage.queries('studenten')
-        if stored:=queries.find_student_by_name_or_email_or_studnr(student):
+        if is_pending(student):
+            log_warning(f'\tStudent {student} komt meerdere keren voor')
+            self.n_already_there += 1
+        elif stored:=queries.find_student_by_name_or_email_or_studnr(student):
             log_warning(f'\tStudent {student} al in database')
             different = check_diff(student, stored, 'email') or\
                     check_diff(student, stored, 'first_name') or\
@@ -80,15 +87,21 @@ class StudentenXLSImporter(FileProcessor):
                     check_diff(student, stored, 'status')
             if different:
                 self.n_modified += 1
-                storage.update('studenten', student)
-                self.__add_sql(student, False)
+                self.modified_students.append(student)
             else:
                 self.n_already_there += 1
         else:
             log_info(f'\tNieuwe student: {student}', to_console=True)
-            storage.create('studenten', student)
-            self.__add_sql(student, True)
+            self.new_students.append(student)
             self.n_new += 1
+    def __store_students(self, storage: AAPAStorage):
+        # all new and modified students in one go
+        storage.create_many('studenten', self.new_students)
+        for student in self.new_students:
+            self.__add_sql(student, True)
+        storage.update_many('studenten', self.modified_students)
+        for student in self.modified_students:
+            self.__add_sql(student, False)
     def process_file(self, filename: str, storage: AAPAStorage, preview = False, **kwargs)->Tuple[int,int,int]:
         reader = ExcelReader(filename, StudentExcelMapper.COLUMNS)
         if reader.error:
@@ -99,11 +112,14 @@ class StudentenXLSImporter(FileProcessor):
         self.n_new = 0
         self.n_modified = 0
         self.n_already_there = 0
+        self.new_students = []
+        self.modified_students = []
         for row,value in enumerate(reader.read()):
             if not (student := mapper.db_to_object(value)):
                 log_error(f'Fout bij lezen rij {row}: {value}.')
             else:
                 self.__check_and_store_student(student, storage)
+        self.__store_students(storage)
         return (self.n_new,self.n_modified,self.n_already_there)
                     
 class StudentenExcelImporter(PluginBase):
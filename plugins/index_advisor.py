@@ -0,0 +1,50 @@
+""" INDEX_ADVISOR
+
+    Debug-plugin: leest alle objecten via de storage-laag, zoekt een aantal 
+    bestanden (filename en digest) en studenten (naam, email) op en rapporteert 
+    daarna de statements waarvoor SQLite een volledige table scan uitvoert 
+    (EXPLAIN QUERY PLAN, zie debug/index_advisor.py).
+
+"""
+from argparse import ArgumentParser
+from data.classes.files import File
+from data.classes.studenten import Student
+from debug.index_advisor import IndexAdvisor
+from main.log import log_print
+from plugins.plugin import PluginBase
+from process.main.aapa_processor import AAPARunnerContext
+from storage.aapa_storage import AAPAStorage
+from storage.queries.studenten import StudentenQueries
+
+class IndexAdvisorPlugin(PluginBase):
+    def get_parser(self)->ArgumentParser:
+        parser = super().get_parser()
+        parser.add_argument('--sample', dest='sample', type=int, default=10, help='Aantal bestanden en studenten om op te zoeken') 
+        return parser
+    def before_process(self, context: AAPARunnerContext, **kwdargs)->bool:
+        self.storage: AAPAStorage = context.storage
+        self.sample = kwdargs.get('sample', 10)
+        return True
+    def _exercise(self):
+        found = {}
+        for module in self.storage.modules():
+            found[module] = self.storage.find_all(module)
+            log_print(f'{module}: {len(found[module])} gelezen.')
+        files: list[File] = found.get('files', [])[:self.sample]
+        for file in files:
+            self.storage.find_values('files', attributes='filename', values=file.filename)
+            self.storage.find_values('files', attributes='digest', values=file.digest)
+        student_queries: StudentenQueries = self.storage.queries('studenten')
+        students: list[Student] = found.get('studenten', [])[:self.sample]
+        for student in students:
+            student_queries.find_student_by_name_or_email_or_studnr(student)
+    def process(self, context: AAPARunnerContext, **kwdargs)->bool:
+        database = self.storage.database
+        database.start_recording()
+        try:
+            self._exercise()
+        finally:
+            statements = database.stop_recording()
+        advisor = IndexAdvisor(database)
+        advisor.report(advisor.analyze(statements))
+        return True
@@ -0,0 +1,53 @@
+""" REHASH_DIGESTS
+
+    Berekent de digests van bestanden in de database opnieuw met het ingestelde
+    digest-algoritme ([digests] algorithm in aapa_config.ini, zie general/filehash.py).
+
+    Digests die met een ander (eerder) algoritme zijn berekend blijven geldig,
+    dit kan dus geleidelijk gebeuren: met --max wordt per keer slechts een deel
+    van de bestanden opnieuw berekend.
+
+"""
+from argparse import ArgumentParser
+from data.classes.files import File
+from data.general.roots import Roots
+from general.filehash import current_digest_algorithm, digest_algorithm, hash_many
+from general.singular_or_plural import sop
+from main.log import log_print
+from plugins.plugin import PluginBase
+from process.general.preview import Preview, pva
+from process.main.aapa_processor import AAPARunnerContext
+from storage.aapa_storage import AAPAStorage
+
+class RehashDigestsPlugin(PluginBase):
+    def get_parser(self)->ArgumentParser:
+        parser = super().get_parser()
+        parser.add_argument('--max', dest='max', type=int, default=0, help='Maximaal aantal bestanden (0: alle bestanden)')
+        return parser
+    def before_process(self, context: AAPARunnerContext, **kwdargs)->bool:
+        self.storage: AAPAStorage = context.storage
+        self.max = kwdargs.get('max', 0)
+        self.algorithm = current_digest_algorithm()
+        return True
+    def _find_candidates(self)->dict[int,str]:
+        rows = self.storage.database._execute_sql_command("SELECT id,filename,digest FROM FILES WHERE digest IS NOT NULL AND digest != ''", [], True)
+        result = {row['id']: Roots.decode_path(row['filename']) for row in rows if digest_algorithm(row['digest']) != self.algorithm}
+        log_print(f'{sop(len(result), "bestand", "bestanden")} met digest van ander algoritme dan {self.algorithm}.')
+        if self.max and len(result) > self.max:
+            result = dict(list(result.items())[:self.max])
+        return result
+    def process(self, context: AAPARunnerContext, **kwdargs)->bool:
+        candidates = self._find_candidates()
+        digests = hash_many(candidates.values(), algorithm=self.algorithm)
+        new_digests = {id: digests[filename] for id,filename in candidates.items() if filename in digests}
+        # not the materialized files (these may be details of other objects): update_many discards these, 
+        # the commit ends the session (see AAPAStorage.commit)
+        with self.storage.crud('files').pause_identity_map():
+            files: list[File] = self.storage.read_many('files', set(new_digests.keys()))
+        for file in files:
+            file.digest = new_digests[file.id]
+        with Preview(context.preview, self.storage, 'rehash digests'):
+            self.storage.update_many('files', files)
+            self.storage.commit()
+        log_print(f'{sop(len(files), "digest", "digests")} {pva(context.preview, "te herberekenen", "herberekend")} ({sop(len(candidates)-len(files), "bestand", "bestanden")} niet gevonden).')
+        return True
@@ -10,6 +10,7 @@ from data.classes.studenten import Student
 from data.general.aapa_class import AAPAclass
 from data.general.const import UNKNOWN_STUDNR
 from data.general.roots import Roots
+from general.filehash import digest_algorithm
 from general.sql_coll import SQLcollector, SQLcollectors
 from general.timeutil import TSC
 from main.log import log_info, log_print
@@ -144,7 +145,7 @@ class StudentDirectoryCompareProcessor:
         queries: FilesQueries = self.storage.queries('files')
         return queries.find_values('filename', Roots.encode_path(file.filename)) != []
     def _add_new_files(self, actual_mp_dir: MijlpaalDirectory, store_in_dir: MijlpaalDirectory, handled: list[File] = []):
-        for actual_file in actual_mp_dir.get_files()():
+        for actual_file in actual_mp_dir.get_files():
             if actual_file in handled:
                 continue
             if self._file_is_already_known(actual_file):
@@ -197,10 +198,13 @@ class StudentDirectoryCompareProcessor:
     def compare_mp_dirs(self, stored_mp_dir: MijlpaalDirectory, actual_mp_dir: MijlpaalDirectory):
         assert str(stored_mp_dir.directory).lower() == str(actual_mp_dir.directory).lower()
         handled:list[File] = []
-        for stored_file in stored_mp_dir.get_files()():
-            if (actual_file:=actual_mp_dir._find_file(stored_file)):
+        for stored_file in stored_mp_dir.get_files():
+            if (actual_file:=actual_mp_dir.find_file(stored_file.filename)):
                 handled.append(actual_file)
                 actual_file.ensure_timestamp_and_digest()
+                if digest_algorithm(actual_file.digest) != (algorithm := digest_algorithm(stored_file.digest)):
+                    # stored digest was computed with another algorithm, see plugin rehash_digests
+                    actual_file.digest = File.get_digest(actual_file.filename, algorithm)
                 if actual_file.equal_relevant_attributes(stored_file):
                     continue
                 else:
@@ -8,7 +8,7 @@ from data.classes.files import File
 from main.options import AAPAProcessingOptions
 from storage.aapa_storage import AAPAStorage
 from debug.debug import ITEM_DEBUG_DIVIDER, MINOR_DEBUG_DIVIDER
-from main.log import log_debug, log_error, log_info
+from main.log import log_debug, log_debug_enabled, log_error, log_info
 from process.general.preview import Preview
 from process.general.aanvraag_processor import AanvraagCreator, AanvraagProcessor
 from process.general.pipeline import FilePipeline, Pipeline
@@ -46,7 +46,9 @@ class AanvragenPipeline(Pipeline):
         return self._processors
     def _process_aanvraag_processor(self, processor: AanvraagProcessor, aanvraag: Aanvraag, preview=False, **kwargs)->bool:
         try:
-            result = processor.must_process(aanvraag, preview=preview, **kwargs) and processor.process(aanvraag, preview, **kwargs)                                                
+            # a failing processor only rolls back its own changes, the other processors go on
+            with self.storage.unit_of_work('process_aanvraag_processor'):
+                result = processor.must_process(aanvraag, preview=preview, **kwargs) and processor.process(aanvraag, preview, **kwargs)                                                
             log_debug(f'_process_aanvraag_processor: {result}')
             return result
         except Exception as E:
@@ -54,10 +56,23 @@ class AanvragenPipeline(Pipeline):
         log_debug(f'_process_aanvraag_processor: FALSE')
         return False
     def _process_aanvraag(self, aanvraag: Aanvraag, preview=False, **kwargs)->bool:
+        # all processors for this aanvraag in one unit of work, committed together (see BatchCommitter)
+        status = aanvraag.status
+        try:
+            with self.storage.unit_of_work('process_aanvraag'):
+                return self._process_aanvraag_processors(aanvraag, preview, **kwargs)
+        except Exception as E:
+            # the changes are rolled back: the status must match the database again
+            aanvraag.status = status
+            log_error(f'Fout bij processing aanvraag ({self.description}) {aanvraag.summary()}:\n\t{E}')
+        log_debug(f'_process_aanvraag: FALSE')
+        return False
+    def _process_aanvraag_processors(self, aanvraag: Aanvraag, preview=False, **kwargs)->bool:
         processed = False               
         for processor in self.processors:
             log_debug(ITEM_DEBUG_DIVIDER)
-            log_debug(f'processor: {processor.description} [args: {kwargs}]  {processor.must_process(aanvraag, **kwargs)}')
+            if log_debug_enabled():
+                log_debug(f'processor: {processor.description} [args: {kwargs}]  {processor.must_process(aanvraag, **kwargs)}')
             if not processor.in_entry_states(aanvraag.status):
                 break
             if self._process_aanvraag_processor(processor, aanvraag, preview, **kwargs):
@@ -67,9 +82,9 @@ class AanvragenPipeline(Pipeline):
                     aanvraag.status = processor.exit_state                       
                 if not processor.read_only:
                     self.storage.update('aanvragen', aanvraag)
-                    self.storage.commit()
             else:
-                log_debug(f'Not processed: {processor.description} {self.undo_log}')
+                if log_debug_enabled():
+                    log_debug(f'Not processed: {processor.description} {self.undo_log}')
             log_debug(ITEM_DEBUG_DIVIDER)
         return processed
     def process(self, preview=False, filter_func = None, **kwargs)->int:
@@ -81,6 +96,7 @@ class AanvragenPipeline(Pipeline):
                 if self._process_aanvraag(aanvraag, preview, **kwargs):
                     n_processed += 1            
                     self.undo_log_aanvraag(aanvraag) 
+                self.committer.item_done()
             self.stop_logging()
             log_debug(MINOR_DEBUG_DIVIDER)
         return n_processed
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
+import time
 from typing import Iterable
 from data.classes.aanvragen import Aanvraag
 from data.classes.files import File
@@ -9,12 +10,42 @@ from main.options import AAPAProcessingOptions
 from storage.aapa_storage import AAPAStorage
 from storage.general.storage_const import StoredClass
 from debug.debug import ITEM_DEBUG_DIVIDER, MINOR_DEBUG_DIVIDER
-from main.log import log_debug, log_error
+from main.config import FloatValueConvertor, IntValueConvertor, config
+from main.log import log_debug, log_debug_enabled, log_error
 from process.general.preview import Preview
 from general.timeutil import TSC
 from process.general.base_processor import BaseProcessor, FileProcessor
 
+def init_config():
+    # not config.init: 0 (commit after every item) would be overwritten
+    config.register('pipeline', 'commit_items', IntValueConvertor)
+    if config.get('pipeline', 'commit_items') is None:
+        config.set('pipeline', 'commit_items', 50)
+    config.register('pipeline', 'commit_seconds', FloatValueConvertor)
+    if config.get('pipeline', 'commit_seconds') is None:
+        config.set('pipeline', 'commit_seconds', 5.0)
+init_config()
+
 class PipelineException(Exception): pass
+class BatchCommitter:
+    # commits after every commit_items items or commit_seconds seconds, whichever comes first
+    def __init__(self, storage: AAPAStorage, commit_items: int = None, commit_seconds: float = None):
+        self.storage = storage
+        self.commit_items = commit_items if commit_items is not None else config.get('pipeline', 'commit_items')
+        self.commit_seconds = commit_seconds if commit_seconds is not None else config.get('pipeline', 'commit_seconds')
+        self.start()
+    def start(self):
+        self._n_items = 0
+        self._last_commit = time.monotonic()
+    def item_done(self):
+        self._n_items += 1
+        if self._n_items >= self.commit_items or time.monotonic() - self._last_commit >= self.commit_seconds:
+            self.commit()
+    def commit(self):
+        log_debug(f'BatchCommitter: committing {self._n_items} items')
+        self.storage.commit()
+        self.start()
+
 class Pipeline:
     def __init__(self, description: str, processors: BaseProcessor|list[BaseProcessor], 
                  storage: AAPAStorage, activity: UndoLog.Action, processing_mode: AAPAProcessingOptions.PROCESSINGMODE, can_undo = True):
@@ -26,11 +57,13 @@ class Pipeline:
         else:
             self._processors.append(processors)
         self.storage = storage
+        self.committer = BatchCommitter(storage)
         self.undo_log = UndoLog(activity, processing_mode, description, can_undo=can_undo)
     @property
     def description(self)->str:
         return self.undo_log.description
     def start_logging(self):
+        self.committer.start()
         self.undo_log.start()
         log_debug(f'STARTING pipeline {self.undo_log}')
     def undo_log_aanvraag(self, aanvraag: Aanvraag):
@@ -70,28 +103,31 @@ class FilePipeline(Pipeline):
         return self._processors
     def _process_file_processor(self, processor: FileProcessor, filename: str, preview=False, **kwargs)->bool:
         if processor.must_process_file(filename, self.storage, **kwargs):
-            try:
-                object = processor.process_file(filename, self.storage, preview, **kwargs)
-                if object is None:
-                    self._add_invalid_file(str(filename))
-                    return False
-                elif isinstance(object, list):
-                    for obj in object:
-                        self._store_new(obj)
-                else:
-                    self._store_new(object)
-                self.storage.commit()
-                return True
-            except Exception as E:
-                log_error(f'Fout bij processing file ({self.description})\n\t{File.display_file(filename)}:\n\t{E}')
+            object = processor.process_file(filename, self.storage, preview, **kwargs)
+            if object is None:
+                self._add_invalid_file(str(filename))
+                return False
+            elif isinstance(object, list):
+                for obj in object:
+                    self._store_new(obj)
+            else:
+                self._store_new(object)
+            return True
         return False
     def _process_file(self, filename: Path, preview=False, **kwargs ):
-        for processor in self.processors:
-            log_debug(f'processor: {processor.__class__} {filename} {kwargs}  {processor.must_process_file(str(filename), self.storage, **kwargs)}')
-            if not self._process_file_processor(processor, str(filename), preview, **kwargs):
-                log_debug('returning false...')
-                return False
-        return True
+        # all processors for this file in one unit of work: if one of them fails, all changes for the file are rolled back
+        try:
+            with self.storage.unit_of_work('process_file'):
+                for processor in self.processors:
+                    if log_debug_enabled():
+                        log_debug(f'processor: {processor.__class__} {filename} {kwargs}  {processor.must_process_file(str(filename), self.storage, **kwargs)}')
+                    if not self._process_file_processor(processor, str(filename), preview, **kwargs):
+                        log_debug('returning false...')
+                        return False
+            return True
+        except Exception as E:
+            log_error(f'Fout bij processing file ({self.description})\n\t{File.display_file(filename)}:\n\t{E}')
+        return False
     def _sorted(self, files: Iterable[Path])->Iterable[Path]:
         return files
     def _store_invalid(self, filename: str, filetype: File.Type)->File:
@@ -119,11 +155,13 @@ class FilePipeline(Pipeline):
                     continue                    
                 if self._process_file(filename, preview, **kwargs):
                     n_processed += 1
+                self.committer.item_done()
                 log_debug(ITEM_DEBUG_DIVIDER)
             log_debug(f'INVALID_FILES: {len(self._invalid_files)}')
             for entry in self._invalid_files:
                 log_debug(f'invalid file: {entry}')                
-                self.undo_log.add(self._store_invalid(filename=entry['filename'], filetype=entry['filetype']))
+                with self.storage.unit_of_work('store_invalid'):
+                    self.undo_log.add(self._store_invalid(filename=entry['filename'], filetype=entry['filetype']))
             self.storage.commit()
             self.stop_logging()     
             log_debug(f'end process (f"{self.description}") {n_processed=} {n_files=}')       
@@ -146,7 +184,8 @@ class SingleFilePipeline(Pipeline):
                 log_error(f'Fout bij processing file ({self.description}) {File.display_file(filename)}:\n\t{E}')
         return 0
     def _process_file(self, filename: Path, preview=False, **kwargs )->int:
-        log_debug(f'processor: {self.processor.__class__} {filename} {kwargs}  {self.processor.must_process_file(str(filename), self.storage, **kwargs)}')
+        if log_debug_enabled():
+            log_debug(f'processor: {self.processor.__class__} {filename} {kwargs}  {self.processor.must_process_file(str(filename), self.storage, **kwargs)}')
         return self._process_file_processor(str(filename), preview, **kwargs)
     def process(self, filename: str, preview=False, **kwargs)->int:
         with Preview(preview, self.storage, f'process (single_filepipeline) {self.description}'):
@@ -16,7 +16,7 @@ class Preview:
     def __exit__(self, exc_type, exc_value, exc_traceback):
         Preview.level -=1
         if self.preview and Preview.level == 0:
-            self.storage.database.rollback()
+            self.storage.rollback()
             self.storage.database.enable_commit()
             console_info('*** end  PREVIEW ***')
 
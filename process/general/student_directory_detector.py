@@ -135,6 +135,7 @@ class StudentDirectoryDetector:
             for subdirectory in Path(dirname).glob('*'):
                 if subdirectory.is_dir() and (new_item := self._process_subdirectory(subdirectory, student)):                    
                     student_directory.add(new_item)
+            File.prefetch_digests(student_directory.get_files())
             self.__ensure_keys(student_directory,storage)
             self.__update_kansen(student_directory)
             self.report_directory('Student directory:', student_directory)
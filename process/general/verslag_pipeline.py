@@ -2,7 +2,7 @@ import datetime
 from data.classes.undo_logs import UndoLog
 from data.classes.verslagen import Verslag
 from debug.debug import ITEM_DEBUG_DIVIDER, MINOR_DEBUG_DIVIDER
-from main.log import log_debug, log_error, log_info
+from main.log import log_debug, log_debug_enabled, log_error, log_info
 from main.options import AAPAProcessingOptions
 from process.general.preview import Preview
 from storage.aapa_storage import AAPAStorage
@@ -44,7 +44,9 @@ class VerslagenPipeline(Pipeline):
         return self._processors
     def _process_verslag_processor(self, processor: VerslagProcessor, verslag: Verslag, preview=False, **kwargs)->bool:
         try:
-            result = (MP:=processor.must_process(verslag, preview=preview, **kwargs)) and processor.process(verslag, preview, **kwargs)                                                
+            # a failing processor only rolls back its own changes, the other processors go on
+            with self.storage.unit_of_work('process_verslag_processor'):
+                result = (MP:=processor.must_process(verslag, preview=preview, **kwargs)) and processor.process(verslag, preview, **kwargs)                                                
             log_debug(f'_process_verslag_processor: {result}')
             return result
         except Exception as E:
@@ -52,10 +54,23 @@ class VerslagenPipeline(Pipeline):
         log_debug(f'_process_verslag_processor: FALSE')
         return False
     def _process_verslag(self, verslag: Verslag, preview=False, **kwargs)->bool:
+        # all processors for this verslag in one unit of work, committed together (see BatchCommitter)
+        status = verslag.status
+        try:
+            with self.storage.unit_of_work('process_verslag'):
+                return self._process_verslag_processors(verslag, preview, **kwargs)
+        except Exception as E:
+            # the changes are rolled back: the status must match the database again
+            verslag.status = status
+            log_error(f'Fout bij processing verslag ({self.description}) {verslag.summary()}:\n\t{E}')
+        log_debug(f'_process_verslag: FALSE')
+        return False
+    def _process_verslag_processors(self, verslag: Verslag, preview=False, **kwargs)->bool:
         processed = False               
         for processor in self.processors:
             log_debug(ITEM_DEBUG_DIVIDER)
-            log_debug(f'processor: {processor.description} [args: {kwargs}]  {processor.must_process(verslag, **kwargs)}')
+            if log_debug_enabled():
+                log_debug(f'processor: {processor.description} [args: {kwargs}]  {processor.must_process(verslag, **kwargs)}')
             if not processor.in_entry_states(verslag.status):
                 break
             if self._process_verslag_processor(processor, verslag, preview, **kwargs):
@@ -65,9 +80,9 @@ class VerslagenPipeline(Pipeline):
                     verslag.status = processor.exit_state                       
                 if not processor.read_only:
                     self.storage.update('verslagen', verslag)
-                    self.storage.commit()
             else:
-                log_debug(f'Not processed: {processor.description} {self.undo_log}')
+                if log_debug_enabled():
+                    log_debug(f'Not processed: {processor.description} {self.undo_log}')
             log_debug(ITEM_DEBUG_DIVIDER)
         return processed
     def process(self, preview=False, filter_func = None, **kwargs)->int:
@@ -81,6 +96,7 @@ class VerslagenPipeline(Pipeline):
                     if self._process_verslag(verslag, preview, **kwargs):
                         n_processed += 1            
                         self.undo_log_verslag(verslag) 
+                    self.committer.item_done()
             self.stop_logging()
             log_debug(MINOR_DEBUG_DIVIDER)
         return n_processed
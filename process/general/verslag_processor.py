@@ -6,7 +6,7 @@ from process.general.student_dir_builder import SDB
 from storage.aapa_storage import AAPAStorage
 from storage.queries.files import FileStorageAnalyzer, FilesQueries
 from general.fileutil import file_exists
-from main.log import log_debug, log_error, log_info, log_warning
+from main.log import log_debug, log_debug_enabled, log_error, log_info, log_warning
 from process.general.base_processor import BaseProcessor, FileProcessor
 from process.input.importing.aanvraag_importer import ImportException
 
@@ -18,7 +18,8 @@ class VerslagImporter(FileProcessor):
     def must_process_file(self, filename: str, storage: AAPAStorage, **kwargs)->bool:        
         queries: FilesQueries = storage.queries('files')
         status,stored_file = queries.analyze(filename)
-        log_debug(f'MUST_PROCESS_FILE {filename}\n\treason: {status}  {stored_file}')
+        if log_debug_enabled():
+            log_debug(f'MUST_PROCESS_FILE {filename}\n\treason: {status}  {stored_file}')
         match status:
             case FileStorageAnalyzer.Status.STORED | FileStorageAnalyzer.Status.STORED_INVALID:
                 return False
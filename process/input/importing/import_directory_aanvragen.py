@@ -1,5 +1,6 @@
 from pathlib import Path
 import re
+from typing import Iterable
 
 from data.classes.undo_logs import UndoLog
 from main.options import AAPAProcessingOptions
@@ -85,6 +86,22 @@ class DirectoryImporter(AanvraagCreatorPipeline):
         return False
     def _skip(self, filename: str)->bool:
         return self._in_skip_directory(filename) or self._check_skip_file(filename)
+    def _sorted(self, files: Iterable[Path])->Iterable[Path]:
+        result = super()._sorted(files)
+        # all files are hashed in one parallel batch, the files queries (analyze) use these digests during the import
+        queries: FilesQueries = self.storage.queries('files')
+        queries.prefetch_digests([filename for filename in result if not self._in_skip_directory(filename)])
+        return result
+    def _store_new(self, aanvraag: Aanvraag):
+        queries: FilesQueries = self.storage.queries('files')
+        File.prefetch_digests(aanvraag.files_list, queries.prefetched_digests)
+        super()._store_new(aanvraag)
+    def process(self, files: Iterable[Path], preview=False, **kwargs)->tuple[int, int]:
+        try:
+            return super().process(files, preview=preview, **kwargs)
+        finally:
+            queries: FilesQueries = self.storage.queries('files')
+            queries.clear_prefetched_digests()
 
 def import_directory(directory: str, output_directory: str, storage: AAPAStorage, recursive = True, preview=False)->int:
     def _get_pattern(recursive: bool):
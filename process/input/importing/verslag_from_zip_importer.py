@@ -112,9 +112,8 @@ class VerslagFromZipImporter(VerslagImporter):
             return True
         return False
     def _check_in_database(self, student_directory:StudentDirectory, filename_to_create: str)->bool:        
-        for file in student_directory.get_files():
-            if file.filename.lower() == filename_to_create.lower():
-                return True
+        if student_directory and student_directory.find_file(filename_to_create):
+            return True
         # if we get here, try a good-luck search. Hopefully the database is not out-of-sync with reality        
         return self.files_queries.is_known_file(filename_to_create)
     def _register_verslag(self, verslag: Verslag, filename: str):
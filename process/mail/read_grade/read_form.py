@@ -1,6 +1,7 @@
 from data.classes.aanvragen import Aanvraag
 from data.classes.files import File
 from data.classes.studenten import Student
+from general.filehash import digest_algorithm
 from general.fileutil import file_exists
 from main.log import log_error, log_print, log_warning
 from process.general.aanvraag_processor import AanvraagProcessor
@@ -17,7 +18,7 @@ class ReadFormGradeProcessor(AanvraagProcessor):
         registered_timestamp = aanvraag.files.get_timestamp(filetype)
         current_timestamp = File.get_timestamp(filename)
         registered_digest  = aanvraag.files.get_digest(filetype)
-        current_digest = File.get_digest(filename)        
+        current_digest = File.get_digest(filename, digest_algorithm(registered_digest))        
         return current_timestamp != registered_timestamp or current_digest != registered_digest
         #TODO: Er lijkt wel eens wat mis te gaan bij het opslaan van de digest, maar misschien valt dat mee. Gevolgen lijken mee te vallen.
     def must_process(self, aanvraag: Aanvraag, preview=False): 
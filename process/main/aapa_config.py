@@ -90,11 +90,10 @@ class AAPAConfiguration:
         # initialize file roots BEFORE processing to cover for cases where aanvraagformulieren 
         # (stored in the output_directory) are created with the wrong root
         # this will cause problems later on
-        if not preview:
-            self.storage.add_file_root(str(Roots.encode_onedrive(self.root)))
+        roots = [] if preview else [str(Roots.encode_onedrive(self.root))]
         if created_directory(self.output_directory):
             log_print(f'Map {self.output_directory} aangemaakt.')
-        self.storage.add_file_root(str(self.output_directory))
+        self.storage.add_file_roots(roots + [str(self.output_directory)])
     def __initialize_directories(self, preview: bool)->bool:        
         self.root = self.__get_directory(self.config_options.root_directory, 'root','Root directory voor aanvragen', True)
         valid = True
@@ -5,7 +5,9 @@ from storage.aapa_storage import AAPAStorage
 class StudentDirectoryReporter:
     def report(self, storage: AAPAStorage):
         print('STUDENT-DIRECTORIES:')
-        for student_directory in storage.find_all('student_directories'):
+        student_directories = storage.find_all('student_directories')
+        storage.prefetch('student_directories', student_directories)
+        for student_directory in student_directories:
             print(student_directory)
         print('.... READY')
 
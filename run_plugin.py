@@ -1,5 +1,7 @@
 from argparse import SUPPRESS, ArgumentParser
 from main.log import init_logging, log_info
+from database.classes.sql_stats import report_statement_statistics
+from debug.index_advisor import report_index_advice
 from plugins.plugin import PluginException, PluginRunner
 
 # use this as first argument to signal the end of the modules
@@ -37,6 +39,8 @@ if __name__ == "__main__":
             print(f'Kan module(s) {modules} niet initialiseren.')
             exit(1)
         runner.run(args=arguments)
+        report_statement_statistics()
+        report_index_advice()
     except Exception as E:
         print(f'Error running plugin: {E}')
 
@@ -1,12 +1,15 @@
 from __future__ import annotations
+from contextlib import contextmanager
 import datetime
 from pathlib import Path
 from typing import Any, Protocol
 
-from database.aapa_database import create_root
+from database.aapa_database import create_roots
 from data.general.aapa_class import AAPAclass
 from data.classes.base_dirs import BaseDir
+from storage.general.aggregator_crud import AggregatorCRUD
 from storage.general.CRUDs import CRUD, CRUDQueries, CallBackFunc, EnsureKeyAction, create_crud, get_registered_type
+from storage.general.identity_map import IdentityMap, register_identity_map
 from storage.general.storage_const import STORAGE_CLASSES, KeyClass, StorageException, StoredClass
 from database.classes.database import Database
 from data.general.roots import Roots
@@ -20,6 +23,9 @@ class AAPAStorage:
         self._crud_dict:dict[str,CRUD] = {}
         self._class_index: dict[AAPAclass,CRUD] = {}
         self._module_names: dict[AAPAclass,str] = {}
+        # one identity map per session: every stored object is materialized at most once
+        self.identity_map = IdentityMap()
+        register_identity_map(database, self.identity_map)
         self.__init_modules()
     def __init_modules(self):
         #initialize the crud variables from the actual modules in the STORAGE_CLASSES directory
@@ -37,6 +43,8 @@ class AAPAStorage:
                 self._module_names[class_type] = module_name
     def crud(self, module: str)->CRUD:
         return self._crud_dict.get(module, None)
+    def modules(self)->list[str]:
+        return list(self._crud_dict.keys())
     def queries(self, module: str)->CRUDQueries:
         if crud := self.crud(module):
             return crud.queries
@@ -76,6 +84,18 @@ class AAPAStorage:
                 # it caused objects with key already set elsewehere to not be created.
                     crud.create(aapa_obj)
                 case _: pass
+    def create_many(self, module: str, aapa_objs: list[StoredClass]):
+        # bulk version of create: the new objects are inserted with one statement per table
+        if crud := self.crud(module):
+            new_objs = []
+            batch: dict[tuple,StoredClass] = {}
+            for aapa_obj in aapa_objs:
+                if (first := batch.setdefault(crud.query_builder.identity_values(aapa_obj), aapa_obj)) is not aapa_obj:
+                    # duplicate within the batch: same key as the first one, not created again
+                    setattr(aapa_obj, crud.table.key, getattr(first, crud.table.key))
+                elif crud.queries.ensure_key(aapa_obj) in {EnsureKeyAction.KEY_CREATED, EnsureKeyAction.NOTHING}:
+                    new_objs.append(aapa_obj)
+            crud.create_many(new_objs)
     def read(self, module: str, key: KeyClass|list[KeyClass])->StoredClass:
         if crud := self.crud(module):
             return crud.read(key)
@@ -84,20 +104,34 @@ class AAPAStorage:
         if crud := self.crud(module):
             return crud.read_many(keys, callback=callback)
         return []
+    def prefetch(self, module: str, aapa_objs: list[StoredClass], deep=True):
+        # hint: the details of these objects will all be needed (only relevant for lazily loaded details)
+        if isinstance(crud := self.crud(module), AggregatorCRUD):
+            crud.prefetch_details(aapa_objs, deep=deep)
     def update(self, module: str, aapa_obj: StoredClass):
         if crud := self.crud(module):
             crud.update(aapa_obj)
+    def update_many(self, module: str, aapa_objs: list[StoredClass]):
+        if crud := self.crud(module):
+            crud.update_many(aapa_objs)
     def delete(self, module: str, aapa_obj: StoredClass):
         if crud := self.crud(module):
             crud.delete(aapa_obj)    
     def add_file_root(self, root: str, code = None)->str:
-        encoded_root = Roots.encode_path(root)
-        code = Roots.add_root(encoded_root, code)
-        if encoded_root != code: 
-        #this means the root is already registered, re-encoding causes it to reduce to just the code
-            create_root(self.database, code, encoded_root)
-            # self.commit()
-        return code
+        return self.add_file_roots([root], [code])[0]
+    def add_file_roots(self, roots: list[str], codes: list[str] = None)->list[str]:
+        # new roots are stored in one statement (and one transaction)
+        result = []
+        new_roots = []
+        for root, code in zip(roots, codes if codes else [None]*len(roots)):
+            encoded_root = Roots.encode_path(root) # encoded with the roots added before
+            result.append(code := Roots.add_root(encoded_root, code))
+            if encoded_root != code: 
+            #this means the root is already registered, re-encoding causes it to reduce to just the code
+                new_roots.append((code, encoded_root))
+        if new_roots:
+            create_roots(self.database, new_roots)
+        return result
     def add_basedir(self, basedir: str|Path, year: int = datetime.datetime.today().year, period: str = '1', forms_version='?'):        
         self.add_file_root(basedir)
         new_basedir = BaseDir(year, period, forms_version, Roots.encode_path(str(basedir)))
@@ -105,5 +139,20 @@ class AAPAStorage:
         self.crud('base_dirs').create(new_basedir)
     def commit(self):
         self.database.commit()
+        # end of the session: objects are materialized again from the database
+        self.identity_map.clear()
+    def rollback(self):
+        # materialized objects may reflect changes that are rolled back
+        self.identity_map.clear()
+        self.database.rollback()
+    @contextmanager
+    def unit_of_work(self, name: str = 'unit_of_work'):
+        # changes are rolled back if an exception occurs, see Database.savepoint
+        try:
+            with self.database.savepoint(name):
+                yield
+        except Exception:
+            self.identity_map.clear()
+            raise
 
         
@@ -32,6 +32,7 @@ register_crud(class_type=MijlpaalDirectory,
                 mapper_type=MijlpaalDirectoriesTableMapper, 
                 queries_type=MijlpaalDirectoriesQueries,
                 details_record_type=MijlpaalDirectoryDetailsRecord,
+                lazy_details=True,
                 )
 register_crud(class_type=MijlpaalDirectoryDetailsRecord, 
                 table=MijlpaalDirectoryDetailsTableDefinition(), 
@@ -34,7 +34,8 @@ register_crud(class_type=StudentDirectory,
                 crud=AggregatorCRUD,     
                 mapper_type=StudentDirectoriesTableMapper, 
                 queries_type=StudentDirectoriesQueries,
-                details_record_type=StudentDirectoryDetailsRecord,                    
+                details_record_type=StudentDirectoryDetailsRecord,
+                lazy_details=True,
                 )
 
 register_crud(class_type=StudentDirectoryDetailsRecord, 
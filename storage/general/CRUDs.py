@@ -1,23 +1,35 @@
 from __future__ import annotations
+from contextlib import contextmanager
 from enum import Enum, auto
-from typing import Any, Protocol, Tuple, Type
+from typing import Any, Iterable, Iterator, Protocol, Tuple, Type
 from data.general.aapa_class import AAPAclass
 from data.general.details_record import DetailsRecord
 from storage.general.mappers import ColumnMapper
 from storage.general.table_mapper import TableMapper
 from storage.general.query_builder import QIF, QueryBuilder
+from storage.general.identity_map import IdentityMap, get_identity_map
 from storage.general.storage_const import DATA_CLASSES, STORAGE_CLASSES, DBtype, KeyClass, StorageException, StoredClass
 from database.classes.database import Database
-from database.classes.dbConst import EMPTY_ID
+from database.classes.dbConst import EMPTY_ID, MAX_SQL_VARIABLES
 from database.classes.sql_expr import SQE, Ops
 from database.classes.table_def import TableDefinition
 from general.classutil import classmodule, classname
 from general.keys import get_next_key
-from main.log import log_debug
+from main.log import log_debug, log_debug_enabled
 from general.singleton import Singleton
 
 class CallBackFunc(Protocol):
     def __call__(self, msg: str, n: int)->bool: pass
+def chunked(values: Iterable[Any], chunk_size: int = MAX_SQL_VARIABLES)->Iterator[list[Any]]:
+    # split values for IN queries, SQLite limits the number of variables in a single statement
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 class CRUDs(dict):
     # All CRUD (or subclasses) objects have this to access any CRUD.
     # any cruds are created as needed 
@@ -57,14 +69,19 @@ class CRUD:
             queries: the CRUDQueries object: functions to query the table 
                 (can be subclassed for specialized queries, e.g. AanvraagQueries)
             table: the TableDefinition
+            identity_map: the IdentityMap registered for the database (by AAPAStorage), or None
+                read and read_many return already materialized objects from the identity map, 
+                update and delete discard the written objects from the identity map.
 
         methods
         -------
             basic CRUD functions (subclasses can overload to define more complicated behaviours ---
                 create(StoredClass): create a new object in the database
+                create_many(list[StoredClass]): create new objects in the database (one INSERT statement), the objects are registered in the identity map
                 read(Key): read a object from the database
                 read_many(list[Key]): read a list of objects from the database (utility when a list of IDs has already been generated by a query)
                 update(StoredClass): update the object values in the database
+                update_many(list[StoredClass]): update the object values in the database (one UPDATE statement)
                 delete(StoredClass): delete the object from the database            
 
             get_crud: access to associated cruds 
@@ -93,54 +110,140 @@ class CRUD:
     @property
     def query_builder(self)->QueryBuilder:
         return self.queries.query_builder
+    @property
+    def identity_map(self)->IdentityMap:
+        return get_identity_map(self.database)
+    def _find_materialized(self, key: KeyClass)->StoredClass:
+        if (identity_map := self.identity_map) is not None:
+            return identity_map.get(self.class_type, key)
+        return None
+    def _register_materialized(self, aapa_obj: StoredClass):
+        if aapa_obj is not None and (identity_map := self.identity_map) is not None:
+            identity_map.add(aapa_obj)
+    def _discard_materialized(self, aapa_obj: StoredClass):
+        if (identity_map := self.identity_map) is not None:
+            identity_map.discard_object(aapa_obj)
+    @contextmanager
+    def pause_identity_map(self):
+        if (identity_map := self.identity_map) is not None:
+            with identity_map.paused():
+                yield
+        else:
+            yield
     def get_crud(self, class_type = None)->CRUD:
         return self if not class_type or class_type == self.class_type else self._cruds.get_crud(class_type)
     def create(self, aapa_obj: StoredClass): 
-        log_debug(f'CRUD CREATE ({classname(self)}) {classname(aapa_obj)}: {str(aapa_obj)}')
+        if log_debug_enabled():
+            log_debug(f'CRUD CREATE ({classname(self)}) {classname(aapa_obj)}: {str(aapa_obj)}')
         columns,values = self.mapper.object_to_db(aapa_obj)
         self.database.create_record(self.table, columns=columns, values=values)
         log_debug(f'END CRUD CREATE')   
+    def create_many(self, aapa_objs: list[StoredClass]):
+        if log_debug_enabled():
+            log_debug(f'CRUD CREATE_MANY ({classname(self)}|{self.table.name}) {len(aapa_objs)} objects')
+        if aapa_objs:
+            columns = self.mapper.columns()
+            self.database.create_records(self.table, columns=columns, 
+                                         values_list=[self.mapper.object_to_db(aapa_obj, column_names=columns)[1] for aapa_obj in aapa_objs])
+            for aapa_obj in aapa_objs:
+                self._register_materialized(aapa_obj)
+        log_debug(f'END CRUD CREATE_MANY')   
     def read(self, key: KeyClass|list[KeyClass])->StoredClass: 
-        log_debug(f'CRUD READ ({classname(self)}|{self.table.name}) {classname(self.class_type)}:{key=}')
-        result = None
+        if log_debug_enabled():
+            log_debug(f'CRUD READ ({classname(self)}|{self.table.name}) {classname(self.class_type)}:{key=}')
+        if (result := self._find_materialized(key)) is None:
+            result = self._load(key)
+        if log_debug_enabled():
+            log_debug(f'END CRUD READ: {str(result)}')
+        return result
+    def _load(self, key: KeyClass|list[KeyClass])->StoredClass:
+        #read from the database and register the result in the identity map
         #TODO: this could probably somehow be better integrated with queries.find_values_where
         if isinstance(key,list):
-            where = self.query_builder.build_where_from_values(column_names=self.table.keys, 
-                                                               values=key,flags={QIF.NO_MAP_VALUES})
+            rows = self.database.read_records_where(self.table, self.table.keys, key)
         else:
-            where = SQE(self.table.key, Ops.EQ, self.mapper.value_to_db(key, self.table.key))
-        if rows := self.database.read_record(self.table, where=where):
+            rows = self.database.read_records_where(self.table, [self.table.key], [self.mapper.value_to_db(key, self.table.key)])
+        if rows:
             result = self.mapper.db_to_object(rows[0])
-        log_debug(f'END CRUD READ: {str(result)}')
-        return result
+            self._register_materialized(result)
+            return result
+        return None
     def read_many(self, keys:set[KeyClass], callback: CallBackFunc=None)->list[StoredClass]: 
-        log_debug(f'CRUD READ_MANY ({classname(self)}|{self.table.name}) {classname(self.class_type)}')
-        result = None
-        #TODO: this could probably somehow be better integrated with queries.find_values_where
+        if log_debug_enabled():
+            log_debug(f'CRUD READ_MANY ({classname(self)}|{self.table.name}) {classname(self.class_type)}')
         if not isinstance(keys,set):
             raise StorageException(f'invalid call to read_many (must be set)')
-        where = self.query_builder.build_where_for_many(column_name=self.table.key, 
-                                                               values=keys,flags={QIF.NO_MAP_VALUES})
         result = []
-        for n,row in enumerate(self.database.read_record(self.table, where=where)):
+        keys_to_load = set()
+        for key in keys:
+            if (materialized := self._find_materialized(key)) is not None:
+                result.append(materialized)
+            else:
+                keys_to_load.add(key)
+        if keys_to_load:
+            result.extend(self._load_many(keys_to_load, callback=callback))
+        if log_debug_enabled():
+            log_debug(f'END CRUD READ_MANY: {str(result)}')
+        return result    
+    def _load_many(self, keys:set[KeyClass], callback: CallBackFunc=None)->list[StoredClass]: 
+        #read from the database and register the results in the identity map
+        #TODO: this could probably somehow be better integrated with queries.find_values_where
+        rows = []
+        for chunk in chunked(keys):
+            rows.extend(self.database.read_records_where(self.table, [self.table.key], [list(chunk)]))
+        self._prefetch_references(rows)
+        result = []
+        for n,row in enumerate(rows):
             if callback and not callback('read many', n):
                 break
-            result.append(self.mapper.db_to_object(row))
-        log_debug(f'END CRUD READ_MANY: {str(result)}')
-        return result    
+            result.append(aapa_obj := self.mapper.db_to_object(row))
+            self._register_materialized(aapa_obj)
+        return result
+    def _prefetch_references(self, rows: list[Any]):
+        # load all referenced objects (e.g. aanvraag.student) with one query per referenced table.
+        # they are registered in the identity map, so mapping the rows does not query them one by one.
+        if not rows or (identity_map := self.identity_map) is None or not identity_map.enabled:
+            return
+        for mapper in self.mapper.mappers():
+            if isinstance(mapper, CRUDColumnMapper):
+                if references := {row[mapper.column_name] for row in rows} - {None, EMPTY_ID}:
+                    if log_debug_enabled():
+                        log_debug(f'CRUD PREFETCH ({classname(self)}|{self.table.name}) {mapper.attribute_name}: {len(references)}')
+                    mapper.crud.read_many(references)
+    def update_details(self, aapa_obj: StoredClass):
+        # only the details of aapa_obj (if any), see AggregatorCRUD
+        pass
     def update(self, aapa_obj: StoredClass): 
-        log_debug(f'CRUD UPDATE ({classname(self)}|{self.table.name}) {classname(aapa_obj)}: {str(aapa_obj)}')
+        if log_debug_enabled():
+            log_debug(f'CRUD UPDATE ({classname(self)}|{self.table.name}) {classname(aapa_obj)}: {str(aapa_obj)}')
         columns,values= self.mapper.object_to_db(aapa_obj,include_key=False)
         #TODO: this could probably somehow be better integrated with queries.find_values_where
-        self.database.update_record(self.table, columns=columns, values=values, 
-                                            where=self.query_builder.build_where_from_object(aapa_obj, column_names=self.mapper.table_keys()))
+        key_columns = self.mapper.table_keys()
+        self.database.update_record_where(self.table, columns=columns, values=values, 
+                                          where_columns=key_columns, where_values=self.mapper.get_values(aapa_obj, columns=key_columns))
+        self._discard_materialized(aapa_obj)
         log_debug(f'END CRUD UPDATE')
         
+    def update_many(self, aapa_objs: list[StoredClass]):
+        if log_debug_enabled():
+            log_debug(f'CRUD UPDATE_MANY ({classname(self)}|{self.table.name}) {len(aapa_objs)} objects')
+        if aapa_objs:
+            columns = self.mapper.columns(include_key=False)
+            key_columns = self.mapper.table_keys()
+            self.database.update_records(self.table, columns=columns, 
+                                         values_list=[[*self.mapper.object_to_db(aapa_obj, column_names=columns)[1], 
+                                                       *self.mapper.get_values(aapa_obj, columns=key_columns)] for aapa_obj in aapa_objs],
+                                         where_columns=key_columns)
+            for aapa_obj in aapa_objs:
+                self._discard_materialized(aapa_obj)
+        log_debug(f'END CRUD UPDATE_MANY')
     def delete(self, aapa_obj: StoredClass):
-        log_debug(f'CRUD DELETE ({classname(self)}|{self.table.name}) {classname(aapa_obj)}: {str(aapa_obj)}')
+        if log_debug_enabled():
+            log_debug(f'CRUD DELETE ({classname(self)}|{self.table.name}) {classname(aapa_obj)}: {str(aapa_obj)}')
         #TODO: this could probably somehow be better integrated with queries.find_values_where
-        self.database.delete_record(self.table, 
-                                    where=self.query_builder.build_where_from_object(aapa_obj, column_names=self.mapper.table_keys()))        
+        key_columns = self.mapper.table_keys()
+        self.database.delete_records_where(self.table, where_columns=key_columns, where_values=self.mapper.get_values(aapa_obj, columns=key_columns))
+        self._discard_materialized(aapa_obj)
         log_debug(f'END CRUD DELETE')
 
     # ---------------- utility functions ---------------
@@ -175,7 +278,8 @@ class CRUDQueries:
             Zet tevens het ID van het betreffende object op de waarde in de database indien aanwezig.
             
         """
-        self.__db_log('CHECK_ALREADY_THERE', f'object: {aapa_obj}')
+        if log_debug_enabled():
+            self.__db_log('CHECK_ALREADY_THERE', f'object: {aapa_obj}')
         if stored_ids := self.query_builder.find_ids_from_object(aapa_obj): 
             log_debug(f'\tCAT: --- already in database ----')                
             setattr(aapa_obj, self.table.key, stored_ids[0])
@@ -183,14 +287,19 @@ class CRUDQueries:
         log_debug(f'\tCAT: not there')                
         return False
     def is_changed(self, aapa_obj: StoredClass)->bool:
-        self.__db_log('IS_CHANGED', f'object: {aapa_obj}')
-        if stored := self.crud.read(aapa_obj.id): 
+        if log_debug_enabled():
+            self.__db_log('IS_CHANGED', f'object: {aapa_obj}')
+        # the identity map is paused: compare with the database version, not with the object itself
+        with self.crud.pause_identity_map():
+            stored = self.crud.read(aapa_obj.id)
+        if stored: 
             log_debug(f'\tSTORED ----')                            
             return stored != aapa_obj
         log_debug(f'\tIS_CHANGED: not there')                
         return True
     def create_key_if_needed(self, aapa_obj: StoredClass, table: TableDefinition = None, autoID=True)->bool:
-        self.__db_log('CREATE_KEY_IF_NEEDED', f'object: {aapa_obj}  table: {table.name if table else None} {autoID=}')
+        if log_debug_enabled():
+            self.__db_log('CREATE_KEY_IF_NEEDED', f'object: {aapa_obj}  table: {table.name if table else None} {autoID=}')
         autoID = autoID if autoID else self.crud.autoID
         table = table if table else self.table
         if autoID and getattr(aapa_obj, table.key, EMPTY_ID) == EMPTY_ID:
@@ -199,7 +308,8 @@ class CRUDQueries:
             return True
         return False
     def ensure_exists(self, aapa_obj: StoredClass, attribute: str, attribute_key: str = 'id'):
-        self.__db_log('ENSURE_EXISTS', f'object: {aapa_obj}  {attribute=}  {attribute_key=}')
+        if log_debug_enabled():
+            self.__db_log('ENSURE_EXISTS', f'object: {aapa_obj}  {attribute=}  {attribute_key=}')
         if not (attr_obj := getattr(aapa_obj, attribute, None)):
             log_debug(f'\tEE: attribute object not found')
             return
@@ -232,19 +342,23 @@ class CRUDQueries:
         wanted_values = values if isinstance(values, list) else [values]
         return (wanted_attributes, wanted_values)
     def find_count(self, attributes: str|list[str]=None, values: Any|list[Any]=None)->int:
-        self.__db_log('FIND_COUNT', f'attributes: {attributes} values: {values}')
+        if log_debug_enabled():
+            self.__db_log('FIND_COUNT', f'attributes: {attributes} values: {values}')
         qb = self.query_builder
         wanted_attributes, wanted_values = self.__get_wanted_values(attributes, values) 
-        log_debug(f'\tFC: {wanted_attributes=} {wanted_values=}')
+        if log_debug_enabled():
+            log_debug(f'\tFC: {wanted_attributes=} {wanted_values=}')
         return qb.find_count(
                     where=qb.build_where_from_values(
                         column_names=wanted_attributes, values=wanted_values,
                             flags={QIF.ATTRIBUTES, QIF.NO_MAP_VALUES}))        
     def find_max_value(self, attribute: str, where_attributes: str|list[str]=None, where_values: Any|list[Any]=None)->Any:
-        self.__db_log('FIND_MAX_VALUE', f'attribute: {attribute}  where_attributes: {where_attributes} where_values: {where_values}')
+        if log_debug_enabled():
+            self.__db_log('FIND_MAX_VALUE', f'attribute: {attribute}  where_attributes: {where_attributes} where_values: {where_values}')
         qb = self.query_builder
         wanted_attributes, wanted_values = self.__get_wanted_values(where_attributes, where_values) 
-        log_debug(f'\tFMV: {wanted_attributes=} {wanted_values=}')
+        if log_debug_enabled():
+            log_debug(f'\tFMV: {wanted_attributes=} {wanted_values=}')
         if wanted_attributes == [None]:
             where = None
         else:
@@ -253,17 +367,20 @@ class CRUDQueries:
                             flags={QIF.ATTRIBUTES, QIF.NO_MAP_VALUES})     
         return qb.find_max_value(attribute, where= where)
     def find_all(self, map_values = True, callback: CallBackFunc=None)->list[AAPAclass]:
-        self.__db_log('FIND_ALL', f'keys: {self.table.keys} [{map_values=}]')
+        if log_debug_enabled():
+            self.__db_log('FIND_ALL', f'keys: {self.table.keys} [{map_values=}]')
         qb = self.query_builder
         if ids := qb.find_ids():
             return self.crud.read_many(set(ids), callback=callback)
         log_debug(f'\tFALL: no values found')
         return []
     def find_values(self, attributes: str|list[str], values: Any|list[Any], map_values = True, read_many=False, callback: CallBackFunc=None)->list[AAPAclass]:
-        self.__db_log('FIND_VALUES', f'attributes: {attributes} values: {values} [{map_values=}, {read_many=}]')
+        if log_debug_enabled():
+            self.__db_log('FIND_VALUES', f'attributes: {attributes} values: {values} [{map_values=}, {read_many=}]')
         qb = self.query_builder
         wanted_attributes, wanted_values = self.__get_wanted_values(attributes, values) 
-        log_debug(f'\tFV: {wanted_attributes=} {wanted_values=}')
+        if log_debug_enabled():
+            log_debug(f'\tFV: {wanted_attributes=} {wanted_values=}')
         if (ids := qb.find_ids_from_values(attributes=wanted_attributes, values=wanted_values, 
                         flags={QIF.ATTRIBUTES} if map_values else {QIF.ATTRIBUTES, QIF.NO_MAP_VALUES})):
             if read_many:
@@ -276,10 +393,12 @@ class CRUDQueries:
                           where_values: Any|list[Any] = None, 
                           where_operators: list[Ops] = None)->list[int]:
         where_str = f'{where_operators=} ' if where_operators else 'equal'
-        self.__db_log('FIND_IDS_WHERE', f'where_attributes: {where_attributes} {where_str}where_values: {where_values} ')
+        if log_debug_enabled():
+            self.__db_log('FIND_IDS_WHERE', f'where_attributes: {where_attributes} {where_str}where_values: {where_values} ')
         qb = self.query_builder
         wanted_attributes, wanted_values = self.__get_wanted_values(where_attributes, where_values)
-        log_debug(f'\tFVW: {wanted_attributes=} {wanted_values=}')        
+        if log_debug_enabled():
+            log_debug(f'\tFVW: {wanted_attributes=} {wanted_values=}')        
         result = qb.find_ids_from_values(
                     # where=qb.build_where_from_values(
                         attributes=wanted_attributes, values=wanted_values,#operators=where_operators,
@@ -289,17 +408,20 @@ class CRUDQueries:
                           where_values: Any|list[Any], 
                           where_operators: list[Ops] = None)->list[Any]:
         where_str = f'{where_operators=} ' if where_operators else 'nowhere'
-        self.__db_log('FIND_VALUES_WHERE', f'attribute: {attribute}  where_attributes: {where_attributes} {where_str}where_values: {where_values} ')
+        if log_debug_enabled():
+            self.__db_log('FIND_VALUES_WHERE', f'attribute: {attribute}  where_attributes: {where_attributes} {where_str}where_values: {where_values} ')
         qb = self.query_builder
         wanted_attributes, wanted_values = self.__get_wanted_values(where_attributes, where_values)
-        log_debug(f'\tFVW: {wanted_attributes=} {wanted_values=}')        
+        if log_debug_enabled():
+            log_debug(f'\tFVW: {wanted_attributes=} {wanted_values=}')        
         return qb.find_all([attribute],
                     where=qb.build_where_from_values(
                         column_names=wanted_attributes, values=wanted_values, operators=where_operators,
                             flags={QIF.ATTRIBUTES, QIF.NO_MAP_VALUES}))            
     def find_values_where_explicit(self, where_str: str, where_values: list[Any], callback: CallBackFunc=None)->list[Any]:
         """ shortcut to do queries that don't fit the pattern, such as "LIKE" queries """
-        self.__db_log('FIND_VALUES_WHERE_EXPLICIT', f'{where_str} where_values: {where_values} ')
+        if log_debug_enabled():
+            self.__db_log('FIND_VALUES_WHERE_EXPLICIT', f'{where_str} where_values: {where_values} ')
         database = self.query_builder.database
         query = f'SELECT id from {self.table.name} where {where_str}'
         ids = {row['id'] for row in database._execute_sql_command(query, where_values, True)}
@@ -330,6 +452,7 @@ class ClassRegistryData:
                         queries_type = CRUDQueries,
                         details_record_type:DetailsRecord=None,
                         autoID=True,
+                        lazy_details=False,
                         module_name=''):
         self.table = table
         self.mapper_type = mapper_type
@@ -337,6 +460,7 @@ class ClassRegistryData:
         self.queries_type = queries_type
         self.details_record_type = details_record_type
         self.autoID = autoID
+        self.lazy_details = lazy_details
         self.module_name = module_name
 
 class CRUDRegistry(Singleton):
@@ -358,6 +482,7 @@ class CRUDRegistry(Singleton):
                         queries_type = CRUDQueries,
                         details_record_type: DetailsRecord = None, 
                         autoID=True, 
+                        lazy_details=False,
                         main=True):
         self.__check_valid(class_type, False)
         module_name = classmodule(class_type).replace(DATA_CLASSES,STORAGE_CLASSES) if main else ''            
@@ -367,6 +492,7 @@ class CRUDRegistry(Singleton):
                                                               queries_type = queries_type,
                                                               details_record_type=details_record_type,
                                                               autoID=autoID,
+                                                              lazy_details=lazy_details,
                                                               module_name=module_name)
     def _is_registered(self, class_type: StoredClass)->bool:
         return class_type in self._registered_data.keys()
@@ -394,6 +520,7 @@ def register_crud(class_type: Type[StoredClass],
                   queries_type = CRUDQueries,
                   details_record_type: DetailsRecord = None, 
                   autoID=True, 
+                  lazy_details=False,
                   main=True):
     _crud_registry.register(class_type, 
                             table=table, 
@@ -402,5 +529,6 @@ def register_crud(class_type: Type[StoredClass],
                             queries_type=queries_type,
                             details_record_type=details_record_type,  
                             autoID=autoID,
+                            lazy_details=lazy_details,
                             main=main)
     
\ No newline at end of file
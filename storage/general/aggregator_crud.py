@@ -4,10 +4,15 @@ from storage.general.details_crud import DetailsCRUD
 from storage.general.storage_const import KeyClass, StorageException, StoredClass
 from database.classes.database import Database
 from general.classutil import classname
-from main.log import log_debug
+from main.log import log_debug, log_debug_enabled
 
 class AggregatorCRUD(CRUD):
-    """ CRUD with automatic support for detail tables (Aggregator objects) """
+    """ CRUD with automatic support for detail tables (Aggregator objects) 
+    
+        If the class is registered with lazy_details, the details are not read with the object itself, 
+        but on the first access to the Aggregator. The details of all objects read together are then read 
+        in one go. Use prefetch_details if all details are needed anyway.
+    """
     def __init__(self, database: Database, class_type: StoredClass):
         super().__init__(database, class_type)
         self.details = DetailsCRUD(database, class_type) if self._data.details_record_type else None
@@ -23,50 +28,128 @@ class AggregatorCRUD(CRUD):
         if self.details:
             self.details.create(aapa_obj)
     def create(self, aapa_obj: StoredClass):
-        self.__db_log('CREATE', f'[{classname(aapa_obj)}]')
+        if log_debug_enabled():
+            self.__db_log('CREATE', f'[{classname(aapa_obj)}]')
         self.__check_valid(aapa_obj, f"{classname(self)}.create")
         self.create_references(aapa_obj) 
         already_there = CRUDQueries(self).check_already_there(aapa_obj)
         if already_there:
             if CRUDQueries(self).is_changed(aapa_obj):
-                log_debug(f'Updating {aapa_obj}')
+                if log_debug_enabled():
+                    log_debug(f'Updating {aapa_obj}')
                 self.update(aapa_obj)
         else:
-            log_debug(f'Creating new {aapa_obj}')
+            if log_debug_enabled():
+                log_debug(f'Creating new {aapa_obj}')
             self._create_new(aapa_obj)
         self.__db_log('END CREATE')
-    def read(self, key: KeyClass)->StoredClass|list:
-        self.__db_log('READ', f'[{key}]')
-        result = super().read(key)        
+    def create_many(self, aapa_objs: list[StoredClass]):
+        # assumes the objects are new (see AAPAStorage.create_many)
+        if log_debug_enabled():
+            self.__db_log('CREATE MANY', f'[{len(aapa_objs)} objects]')
+        for aapa_obj in aapa_objs:
+            self.__check_valid(aapa_obj, f"{classname(self)}.create_many")
+            self.create_references(aapa_obj) 
+            CRUDQueries(self).create_key_if_needed(aapa_obj)
+        super().create_many(aapa_objs)
+        if self.details:
+            for aapa_obj in aapa_objs:
+                self.details.create(aapa_obj)
+        self.__db_log('END CREATE MANY')
+    def _load(self, key: KeyClass)->StoredClass:
+        if log_debug_enabled():
+            self.__db_log('READ', f'[{key}]')
+        result = super()._load(key)        
         if result and self.details:
-            self.details.read(result)
-        self.__db_log('END READ', f'{result}')
-        return result
-    def read_many(self, keys: set[KeyClass], callback: CallBackFunc=None)->StoredClass|list:
-        self.__db_log('READ MANY', f'[{keys}]')
-        results = super().read_many(keys,callback=callback)
-        for n,result in enumerate(results):
-            if result and self.details:
+            if self._data.lazy_details:
+                self._set_details_loader([result])
+            else:
                 self.details.read(result)
-                if callback and not callback('reading details', n):
-                    break
-        self.__db_log('END READ MANY', f'{results}')
+        if log_debug_enabled():
+            self.__db_log('END READ', f'{result}')
+        return result
+    def _load_many(self, keys: set[KeyClass], callback: CallBackFunc=None)->list[StoredClass]:
+        if log_debug_enabled():
+            self.__db_log('READ MANY', f'[{keys}]')
+        results = super()._load_many(keys,callback=callback)
+        if results and self.details and self._data.lazy_details:
+            self._set_details_loader(results)
+        elif results and self.details:
+            n_read = self.details.read_many(results, callback=callback)
+            for unread in results[n_read:]:
+                # details not read: do not keep these in the identity map
+                self._discard_materialized(unread)
+        if log_debug_enabled():
+            self.__db_log('END READ MANY', f'{results}')
         return results
     def update(self, aapa_obj: StoredClass):
-        self.__db_log('UPDATE', f'[{classname(aapa_obj)}]')
+        if log_debug_enabled():
+            self.__db_log('UPDATE', f'[{classname(aapa_obj)}]')
         self.__check_valid(aapa_obj, f"{classname(self)}.update")
         self.create_references(aapa_obj)
         super().update(aapa_obj)
-        if self.details:
-            self.details.update(aapa_obj)
+        self.update_details(aapa_obj)
         self.__db_log('END UPDATE')
+    def update_details(self, aapa_obj: StoredClass):
+        if self.details and self._details_loaded(aapa_obj):
+            self.details.update(aapa_obj)
+    def update_many(self, aapa_objs: list[StoredClass]):
+        if log_debug_enabled():
+            self.__db_log('UPDATE MANY', f'[{len(aapa_objs)} objects]')
+        for aapa_obj in aapa_objs:
+            self.__check_valid(aapa_obj, f"{classname(self)}.update_many")
+            self.create_references(aapa_obj)
+        super().update_many(aapa_objs)
+        for aapa_obj in aapa_objs:
+            self.update_details(aapa_obj)
+        self.__db_log('END UPDATE MANY')
     def delete(self, aapa_obj: StoredClass):
-        self.__db_log('DELETE', f'[{classname(aapa_obj)}]')
+        if log_debug_enabled():
+            self.__db_log('DELETE', f'[{classname(aapa_obj)}]')
         self.__check_valid(aapa_obj, f"{classname(self)}.delete")
         if self.details:
             self.details.delete(aapa_obj)
         super().delete(aapa_obj)
         self.__db_log('END DELETE')
+    # lazy details
+    def _set_details_loader(self, aapa_objs: list[StoredClass]):
+        # the first access to one of the aggregators reads the details for all objects that are still not loaded
+        batch = list(aapa_objs)
+        def load_details(aggregator: Aggregator):
+            pending = []
+            for aapa_obj in batch:
+                if (details := self.details.aggregator(aapa_obj)) is aggregator or details._loader is load_details:
+                    details.set_loader(None)
+                    pending.append(aapa_obj)
+            batch.clear()
+            if log_debug_enabled():
+                self.__db_log('LOAD DETAILS', f'[{len(pending)} objects]')
+            self.details.read_many(pending)
+        for aapa_obj in batch:
+            self.details.aggregator(aapa_obj).set_loader(load_details)
+    def _details_loaded(self, aapa_obj: StoredClass)->bool:
+        # details that were never loaded are not changed, so need not be updated
+        return self.details.aggregator(aapa_obj).is_loaded
+    def prefetch_details(self, aapa_objs: list[StoredClass], deep=True):
+        """ read the details of the objects (if not yet loaded), for all objects in one go
+         
+            deep: also prefetch the details of the detail objects (if these are lazy as well)
+        """
+        if not self.details:
+            return
+        if pending := [aapa_obj for aapa_obj in aapa_objs if not self._details_loaded(aapa_obj)]:
+            for aapa_obj in pending:
+                self.details.aggregator(aapa_obj).set_loader(None)
+            self.details.read_many(pending)
+        if deep:
+            details_objs: dict[type, list[StoredClass]] = {}
+            for aapa_obj in aapa_objs:
+                aggregator = self.details.aggregator(aapa_obj)
+                for class_type in aggregator.class_types():
+                    details_objs.setdefault(class_type, []).extend(aggregator.as_list(class_type))
+            for class_type, objs in details_objs.items():
+                if objs and isinstance(crud := self.get_crud(class_type), AggregatorCRUD):
+                    crud.prefetch_details(objs, deep=deep)
     # utility functions
     def create_references(self, aapa_obj: StoredClass):
         for mapper in self.mapper.mappers():
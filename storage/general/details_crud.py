@@ -1,17 +1,19 @@
-from copy import deepcopy
+from typing import Iterator
 from data.general.aapa_class import AAPAclass
 from data.general.aggregator import Aggregator
 from data.general.class_codes import ClassCodes
 from data.general.details_record import DetailsRecord
-from storage.general.CRUDs import CRUD, CRUDQueries
+from storage.general.CRUDs import CRUD, CRUDQueries, CallBackFunc, chunked
 from storage.general.mappers import ColumnMapper
 from storage.general.table_mapper import TableMapper
 from storage.general.query_builder import QIF
 from storage.general.storage_const import StorageException, StoredClass
 from database.classes.database import Database
+from database.classes.dbConst import EMPTY_ID
+from database.classes.sql_expr import SQE, Ops
 from database.classes.table_def import TableDefinition
 from general.classutil import classname
-from main.log import log_debug
+from main.log import log_debug, log_debug_enabled
 
 class DetailsRecordTableMapper(TableMapper):
     def __init__(self, database: Database, table: TableDefinition, class_type: DetailsRecord, main_id: str):
@@ -39,41 +41,44 @@ class DetailsCRUD(CRUD):
         self.main_class_type = main_class_type
         self.details_record_type = self._data.details_record_type
         self.crud = self.get_crud(self.details_record_type)
-        self._aggregator_name = None
         self.main_column_name = self.crud.mapper._get_columns_from_attributes(['main_id'])[0]
         self.database = database
     def __db_log(self, function: str, params: str=''):
         log_debug(f'DRC({classname(self)}): {function}{(" - " + params) if params else ""}')        
+    _aggregator_names: dict[type, str] = {} # per class, shared by all DetailsCRUDs
     def get_aggregator_name(self, aapa_obj: AAPAclass)->str:
-        if self._aggregator_name:
-            return self._aggregator_name
-        else:
-            for attribute in dir(aapa_obj):
-                if attribute[0] == '_': continue
-                if isinstance(getattr(aapa_obj,attribute), Aggregator):
-                    self._aggregator_name = attribute
-                    break
-            if not self._aggregator_name:                
-                raise StorageException(f'Aggregator not found in object {aapa_obj}.')
-            return self._aggregator_name
+        if (result := DetailsCRUD._aggregator_names.get(class_type := type(aapa_obj), None)):
+            return result
+        for attribute in dir(aapa_obj):
+            if attribute[0] == '_': continue
+            if isinstance(getattr(aapa_obj,attribute), Aggregator):
+                DetailsCRUD._aggregator_names[class_type] = attribute
+                return attribute
+        raise StorageException(f'Aggregator not found in object {aapa_obj}.')
     def aggregator(self, aapa_obj: AAPAclass)->Aggregator:
         return getattr(aapa_obj, self.get_aggregator_name(aapa_obj))       
     def _get_class_codes(self, aggregator: Aggregator)->list[str]:
         return [ClassCodes.classtype_to_code(class_type) for class_type in aggregator.class_types()]
-    def create(self, owning_obj: StoredClass):
-        self.__db_log('CREATE', f'({classname(owning_obj)}: {str(owning_obj)}) [{classname(self.details_record_type)}] ({owning_obj.id=})')
-        aggregator = self.aggregator(owning_obj)
+    def _aggregator_items(self, aggregator: Aggregator)->Iterator[tuple[str, CRUD, AAPAclass]]:
         # this cycles through all objects in the aggregator by object type
         for class_code in self._get_class_codes(aggregator):
             details_class_type = ClassCodes.code_to_classtype(class_code)
             details_crud = self.get_crud(details_class_type)
             for details_item in aggregator.as_list(details_class_type): 
-                self._create_detail_record(owning_obj.id, details_crud, details_item, class_code)
+                yield (class_code, details_crud, details_item)
+    def create(self, owning_obj: StoredClass):
+        if log_debug_enabled():
+            self.__db_log('CREATE', f'({classname(owning_obj)}: {str(owning_obj)}) [{classname(self.details_record_type)}] ({owning_obj.id=})')
+        links = set()
+        for class_code, details_crud, details_item in self._aggregator_items(self.aggregator(owning_obj)):
+            self._ensure_detail_item(details_crud, details_item)
+            links.add((details_item.id, class_code))
+        self._insert_links(owning_obj.id, links)
+        self._invalidate_owner(owning_obj)
         self.__db_log('END CREATE')
-    def _create_detail_record(self, owner_id: int, details_crud: CRUD, details_item: AAPAclass, class_code: str):
+    def _ensure_detail_item(self, details_crud: CRUD, details_item: AAPAclass):
         # first make sure the items exist in the database and has a valid ID
         # then check whether the item is changed (in that case: update it)
-        # finally create the detail record linking the owner object and the detail items.
         CRUDQueries(details_crud).create_key_if_needed(details_item)
         if not CRUDQueries(details_crud).check_already_there(details_item):
             # create the item if it doesn't exist yet, bv to avoid foreign key problems
@@ -81,31 +86,106 @@ class DetailsCRUD(CRUD):
         elif CRUDQueries(details_crud).is_changed(details_item):
             # if the item was changed, make sure it is stored in the database
             details_crud.update(details_item)
-        self.crud.create(self.details_record_type(main_id=owner_id, detail_id=details_item.id, class_code=class_code))
-
+    def _update_changed_items(self, details_crud: CRUD, details_items: list[AAPAclass]):
+        # compare the (already linked) items with their rows in the database, one read per chunk of items. 
+        # the items are not read as objects (that would read their details as well): 
+        # the details of an item are compared by its own DetailsCRUD, using the links only
+        columns = details_crud.mapper.columns()
+        key = details_crud.table.key
+        stored_rows: dict[int, list] = {}
+        for chunk in chunked({item.id for item in details_items}):
+            for row in self.database.read_records_where(details_crud.table, [key], [list(chunk)], columns=columns):
+                stored_rows[row[key]] = [row[column] for column in columns]
+        for details_item in details_items:
+            if stored_rows.get(details_item.id, None) != details_crud.mapper.get_values(details_item, columns):
+                details_crud.update(details_item)
+            else:
+                details_crud.update_details(details_item)
+    def _invalidate_owner(self, owning_obj: StoredClass):
+        # the links are written directly, another materialized version of the owner has outdated details
+        if (identity_map := self.identity_map) is not None:
+            identity_map.invalidate(owning_obj)
+    def _stored_links(self, owner_id: int)->set[tuple[int,str]]:
+        qb = self.crud.query_builder
+        where = qb.build_where_from_values([self.main_column_name], [owner_id], flags={QIF.NO_MAP_VALUES})
+        return {(row['detail_id'], row['class_code']) for row in qb.find_all(['detail_id', 'class_code'], where=where)}
+    def _insert_links(self, owner_id: int, links: set[tuple[int,str]]):
+        # create the detail records linking the owner object and the detail items, one statement for all
+        if not links:
+            return
+        self.database.create_records(self.crud.table, [self.main_column_name, 'detail_id', 'class_code'], 
+                                     [[owner_id, detail_id, class_code] for (detail_id, class_code) in sorted(links)])
+    def _delete_links(self, owner_id: int, links: set[tuple[int,str]]):
+        # remove the detail records, one statement per class_code (and chunk)
+        detail_ids: dict[str,list[int]] = {}
+        for (detail_id, class_code) in links:
+            detail_ids.setdefault(class_code, []).append(detail_id)
+        for class_code, ids in detail_ids.items():
+            for chunk in chunked(sorted(ids)):
+                where = SQE(SQE(self.main_column_name, Ops.EQ, owner_id, no_column_ref=True), Ops.AND, 
+                            SQE(SQE('class_code', Ops.EQ, class_code, no_column_ref=True), Ops.AND, SQE('detail_id', Ops.IN, chunk)))
+                self.database.delete_record(self.crud.table, where=where)
     def read(self, owning_obj: StoredClass):
-        self.__db_log('START READ', f'({classname(owning_obj)}: {str(owning_obj)}) [{classname(self.details_record_type)}] ({owning_obj.id=})')
-        aggregator = self.aggregator(owning_obj)
-        read_dict = { class_code: {'ids': set(), 'crud': self.get_crud(ClassCodes.code_to_classtype(class_code))} 
-                     for class_code in self._get_class_codes(aggregator)}
+        self.read_many([owning_obj])
+    def read_many(self, owning_objs: list[StoredClass], callback: CallBackFunc=None)->int:
+        """ read the details for all owning objects, with one query on the details table 
+            (per chunk of owners) and one read_many per detail class.
+
+            returns the number of owning objects for which the details were read
+            (less than all if the callback stops the reading)
+        """
+        if log_debug_enabled():
+            self.__db_log('START READ', f'({len(owning_objs)} objects) [{classname(self.details_record_type)}]')
+        owners = {owning_obj.id: owning_obj for owning_obj in owning_objs}
+        details: dict[int, dict[str, list[int]]] = {owner_id: {} for owner_id in owners.keys()}
+        detail_ids: dict[str, set[int]] = {}
         qb = self.crud.query_builder
-        where = qb.build_where_from_values([self.main_column_name], [owning_obj.id], flags={QIF.NO_MAP_VALUES})
-        for row in qb.find_all(['detail_id','class_code'], where=where):
-            read_dict[row['class_code']]['ids'].add(row['detail_id'])
-        for entry in read_dict.values():            
-            aggregator.add(entry['crud'].read_many(entry['ids']))
+        for chunk in chunked(owners.keys()):
+            where = qb.build_where_for_many(self.main_column_name, set(chunk))
+            for row in qb.find_all([self.main_column_name, 'detail_id','class_code'], where=where):
+                details[row[self.main_column_name]].setdefault(row['class_code'], []).append(row['detail_id'])
+                detail_ids.setdefault(row['class_code'], set()).add(row['detail_id'])
+        detail_objects: dict[str, dict[int, AAPAclass]] = {}
+        for class_code, ids in detail_ids.items():
+            detail_objects[class_code] = {detail.id: detail for detail in self.get_crud(ClassCodes.code_to_classtype(class_code)).read_many(ids)}
+        for n,(owner_id, owner_details) in enumerate(details.items()):
+            aggregator = self.aggregator(owners[owner_id])
+            for class_code in self._get_class_codes(aggregator):
+                if ids := owner_details.get(class_code, None):
+                    aggregator.add([detail_objects[class_code][id] for id in sorted(ids) if id in detail_objects[class_code]])
+            if callback and not callback('reading details', n):
+                self.__db_log('END READ (stopped)')
+                return n+1
         self.__db_log('END READ')
+        return len(owners)
     def update(self, owning_obj: StoredClass):
-        self.__db_log('UPDATE', f'({classname(owning_obj)}: {str(owning_obj)})')
-        #the simplest: just remove all details and create them again
-        #else you need to find out differences between existing details and current details
-        self.delete(deepcopy(owning_obj))
-        self.create(owning_obj) 
-        self.__db_log('END UPDATE')
+        if log_debug_enabled():
+            self.__db_log('UPDATE', f'({classname(owning_obj)}: {str(owning_obj)})')
+        # compare the stored links with the links in the aggregator, only write the differences
+        stored_links = self._stored_links(owning_obj.id)
+        current_links = set()
+        linked_items: dict[str, tuple[CRUD, list[AAPAclass]]] = {}
+        for class_code, details_crud, details_item in self._aggregator_items(self.aggregator(owning_obj)):
+            if details_item.id == EMPTY_ID or not (details_item.id, class_code) in stored_links:
+                self._ensure_detail_item(details_crud, details_item)
+            else:
+                linked_items.setdefault(class_code, (details_crud, []))[1].append(details_item)
+            current_links.add((details_item.id, class_code))
+        for details_crud, details_items in linked_items.values():
+            self._update_changed_items(details_crud, details_items)
+        if removed := stored_links - current_links:
+            self._delete_links(owning_obj.id, removed)
+        if added := current_links - stored_links:
+            self._insert_links(owning_obj.id, added)
+        if removed or added:
+            self._invalidate_owner(owning_obj)
+        if log_debug_enabled():
+            self.__db_log('END UPDATE', f'{len(added)} added, {len(removed)} removed')
     def delete(self, owning_obj: StoredClass):
-        self.__db_log('DELETE', f'({classname(owning_obj)}: {str(owning_obj)}) [{classname(self.details_record_type)}] ({owning_obj.id=})')
+        if log_debug_enabled():
+            self.__db_log('DELETE', f'({classname(owning_obj)}: {str(owning_obj)}) [{classname(self.details_record_type)}] ({owning_obj.id=})')
         qb = self.crud.query_builder
         where = qb.build_where_from_values([self.main_column_name], [owning_obj.id], flags={QIF.NO_MAP_VALUES})
-        for row in qb.find_all(['detail_id', 'class_code'], where=where):
-            self.crud.delete(self.details_record_type(owning_obj.id,row['detail_id'], row['class_code']))
+        self.database.delete_record(self.crud.table, where=where)
+        self._invalidate_owner(owning_obj)
         self.__db_log('END DELETE')
@@ -0,0 +1,82 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Type
+from weakref import WeakKeyDictionary
+from storage.general.storage_const import KeyClass, StoredClass
+from database.classes.database import Database
+from database.classes.dbConst import EMPTY_ID
+from general.classutil import classname
+from main.log import log_debug
+
+class IdentityMap:
+    """ Identity map: every stored object is materialized at most once per session.
+
+        Objects are registered by (class type, key) when they are read from the database.
+        A next read of the same object (for instance the student of many aanvragen) returns
+        the registered object instead of issuing a new query.
+
+        Writes (update, delete) discard the entries for the written objects, so the next
+        read will reflect the database again. Writes outside the CRUD functions (e.g. the links 
+        written by DetailsCRUD) invalidate the entries they affect (see invalidate). 
+        The session ends with a commit or rollback (see AAPAStorage): the map is then cleared.
+
+        The map can be paused (nested), e.g. to compare an object with the database version.
+        While paused, objects are neither looked up nor registered.
+    """
+    def __init__(self):
+        self._objects: dict[tuple[Type[StoredClass],KeyClass], StoredClass] = {}
+        self._pause_level = 0
+        self.hits = 0
+        self.misses = 0
+    @property
+    def enabled(self)->bool:
+        return self._pause_level == 0
+    @staticmethod
+    def _is_valid_key(key: KeyClass)->bool:
+        return key is not None and key != EMPTY_ID and not isinstance(key, list)
+    def get(self, class_type: Type[StoredClass], key: KeyClass)->StoredClass:
+        if not self.enabled or not IdentityMap._is_valid_key(key):
+            return None
+        if (result := self._objects.get((class_type, key), None)) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+    def contains(self, class_type: Type[StoredClass], key: KeyClass)->bool:
+        return (class_type, key) in self._objects
+    def add(self, aapa_obj: StoredClass, key: KeyClass = None):
+        key = key if key is not None else getattr(aapa_obj, 'id', None)
+        if self.enabled and aapa_obj is not None and IdentityMap._is_valid_key(key):
+            self._objects[(type(aapa_obj), key)] = aapa_obj
+    def discard(self, class_type: Type[StoredClass], key: KeyClass):
+        self._objects.pop((class_type, key), None)
+    def discard_object(self, aapa_obj: StoredClass):
+        self.discard(type(aapa_obj), getattr(aapa_obj, 'id', None))
+    def invalidate(self, aapa_obj: StoredClass):
+        # aapa_obj is (partly) written outside the CRUD functions: another object registered with the same key is outdated
+        key = (type(aapa_obj), getattr(aapa_obj, 'id', None))
+        if self._objects.get(key, aapa_obj) is not aapa_obj:
+            del self._objects[key]
+    def clear(self):
+        log_debug(f'{classname(self)}: cleared ({len(self._objects)} objects, {self.hits} hits, {self.misses} misses)')
+        self._objects.clear()
+    def disable(self):
+        self._pause_level += 1
+    def enable(self):
+        self._pause_level -= 1
+    @contextmanager
+    def paused(self):
+        self.disable()
+        try:
+            yield
+        finally:
+            self.enable()
+    def __len__(self)->int:
+        return len(self._objects)
+
+_identity_maps: WeakKeyDictionary[Database, IdentityMap] = WeakKeyDictionary()
+
+def register_identity_map(database: Database, identity_map: IdentityMap):
+    _identity_maps[database] = identity_map
+def get_identity_map(database: Database)->IdentityMap:
+    return _identity_maps.get(database, None)
@@ -8,7 +8,7 @@ from database.classes.database import Database
 from database.classes.sql_expr import SQE, Ops
 from database.classes.sql_table import SQLselect
 from general.classutil import classname
-from main.log import log_debug
+from main.log import log_debug, log_debug_enabled
 
 class QueryInfo:
     class Flags(Enum):
@@ -39,7 +39,8 @@ class QueryInfo:
     def __get_values(self, data_columns: list[str], aapa_obj: StoredClass, values: list[Any], no_map_values: bool)->list[Any]:
         if values:
             if len(values) != len(data_columns):
-                log_debug(f'values: {values}  columns: {data_columns}')
+                if log_debug_enabled():
+                    log_debug(f'values: {values}  columns: {data_columns}')
                 raise MapperException(f'Invalid parameters: {len(values)} values, but {len(data_columns)} columns')              
             if no_map_values:
                 data_values = values
@@ -70,38 +71,47 @@ class QueryBuilder:
     def __db_log(self, function: str, params: str=''):
         log_debug(f'QB{classname(self.mapper.class_type)}: {function}{(" - " + params) if params else ""}')
     def find_all(self, columns: list[str], where: SQE=None)->list[Any]:
-        self.__db_log('FIND_ALL', f'columns:{columns} where:{where.db_str() if where else None}')
+        if log_debug_enabled():
+            self.__db_log('FIND_ALL', f'columns:{columns} where:{where.db_str() if where else None}')
         sql = SQLselect(self.mapper.table, columns=columns, where=where) if where else SQLselect(self.mapper.table, columns=columns)
         return self.database.execute_select(sql) 
     def find_count(self, where:SQE=None)->int:
-        self.__db_log('FIND_COUNT', f'where:{where.db_str() if where else None}')
+        if log_debug_enabled():
+            self.__db_log('FIND_COUNT', f'where:{where.db_str() if where else None}')
         sql = SQLselect(self.mapper.table, columns=['count(id)'], where=where)
         if (row := self.database.execute_select(sql)) and row[0][0]:
             return row[0][0]
         return 0
     def find_ids(self):
-        self.__db_log('FIND_IDS')
+        if log_debug_enabled():
+            self.__db_log('FIND_IDS')
         return self.__find_ids()
     def find_ids_from_object(self, aapa_obj: StoredClass, attributes: list[str] = None, flags={QIF.ATTRIBUTES})->list[int]:
-        self.__db_log('FIND_IDS_FROM_OBJECT', f'object:{aapa_obj}\n\tattributes:{attributes} {flags=}')
-        attributes = attributes if attributes else self.mapper.attributes(include_key = False)
-        for attribute in attributes.copy():
-            if not attribute in aapa_obj.relevant_attributes():
-                attributes.remove(attribute)
-            elif getattr(aapa_obj, attribute) is None:
-                attributes.remove(attribute)
-        return self.__find_ids(*self.query_info.get_data(aapa_obj, columns=attributes, flags=flags))
+        if log_debug_enabled():
+            self.__db_log('FIND_IDS_FROM_OBJECT', f'object:{aapa_obj}\n\tattributes:{attributes} {flags=}')
+        return self.__find_ids(*self.__get_object_data(aapa_obj, attributes, flags))
+    def identity_values(self, aapa_obj: StoredClass)->tuple:
+        # the (database) values find_ids_from_object searches for, e.g. to recognize duplicates before creating them
+        return tuple(zip(*self.__get_object_data(aapa_obj)))
+    def __get_object_data(self, aapa_obj: StoredClass, attributes: list[str] = None, flags={QIF.ATTRIBUTES})->tuple[list[str], list[Any]]:
+        relevant = aapa_obj.cached_relevant_attributes()
+        attributes = [attribute for attribute in (attributes if attributes else self.mapper.attributes(include_key = False)) 
+                      if attribute in relevant and getattr(aapa_obj, attribute) is not None]
+        return self.query_info.get_data(aapa_obj, columns=attributes, flags=flags)
     def find_ids_from_values(self, attributes: list[str], values: list[Any|set[Any]], flags={QIF.ATTRIBUTES})->list[int]:
-        self.__db_log('FIND_IDS_FROM_VALUES', f'attributes:{attributes} values:{values} {flags=}')
+        if log_debug_enabled():
+            self.__db_log('FIND_IDS_FROM_VALUES', f'attributes:{attributes} values:{values} {flags=}')
         return self.__find_ids(*self.query_info.get_data(columns=attributes, values=values, flags=flags))
     def find_max_id(self)->int:
-        self.__db_log('FIND_MAX_ID')
+        if log_debug_enabled():
+            self.__db_log('FIND_MAX_ID')
         sql = SQLselect(self.mapper.table, columns=['max(id)'])
         if (row := self.database.execute_select(sql)) and row[0][0]:
             return row[0][0]
         return 0
     def find_max_value(self, attribute: str, where:SQE = None)->Any:        
-        self.__db_log('FIND_MAX_VALUE', f'attribute:{attribute}  where:{where.db_str() if where else None}')
+        if log_debug_enabled():
+            self.__db_log('FIND_MAX_VALUE', f'attribute:{attribute}  where:{where.db_str() if where else None}')
         col_mapper = self.mapper._find_mapper(attribute)
         sql = SQLselect(self.mapper.table, columns=[f'max({col_mapper.column_name})'], where=where)
         if row:= self.database.execute_select(sql):
@@ -114,21 +124,21 @@ class QueryBuilder:
     #     return self.find_ids_from_values(where_attributes, where_values)
     def __find_ids(self, where_columns: list[str]=None, 
                    where_values: list[Any|set[Any]]=None)->list[int]:
-        if where_columns: 
-            sql = SQLselect(self.mapper.table, columns=self.mapper.table_keys(), 
-                        where=self.__build_where(*(where_columns,where_values)))
-        else:
-            sql = SQLselect(self.mapper.table, columns=self.mapper.table_keys())
-        if rows := self.database.execute_select(sql):
+        # a set of values gives an IN clause
+        if rows := self.database.read_records_where(self.mapper.table, where_columns if where_columns else [], 
+                                                    [list(value) if isinstance(value, set) else value for value in where_values] if where_columns else [],
+                                                    columns=self.mapper.table_keys()):
             result = [self.mapper.db_to_value(row['id'], 'id') for row in rows] 
             return result
         return []   
     def __build_where(self, columns: list[str], values: list[Any|set[Any]], 
                       operators: list[Ops]=None, use_and=True)->SQE:
         result = None
-        log_debug(f'BW: {columns}|{values}')
+        if log_debug_enabled():
+            log_debug(f'BW: {columns}|{values}')
         operators = operators if operators else [Ops.EQ]*len(columns)
-        log_debug(operators)
+        if log_debug_enabled():
+            log_debug(operators)
         connect_op = Ops.AND if use_and else Ops.OR
         for (key,value,operator) in zip(columns, values, operators):
             if isinstance(value, set):
@@ -1,8 +1,11 @@
 from __future__ import annotations
 from ast import Tuple
 from enum import Enum, auto
+from pathlib import Path
+from typing import Iterable
 from data.classes.files import File
 from data.general.roots import Roots
+from general.filehash import DEFAULT_ALGORITHM, current_digest_algorithm, digest_algorithm, hash_many
 from storage.general.CRUDs import CRUD, CRUDQueries
 from storage.general.storage_const import StorageException
 from main.log import log_debug
@@ -17,6 +20,11 @@ class FileStorageAnalyzer:
         MODIFIED            = auto()
     def __init__(self, queries: FilesQueries):
         self.queries = queries
+        self._digests: dict[str,str] = {} # algorithm -> digest of the analyzed file, each digest is computed at most once
+    def __get_digest(self, filename: str, algorithm: str)->str:
+        if (digest := self._digests.get(algorithm)) is None:
+            digest = self._digests[algorithm] = File.get_digest(filename, algorithm)
+        return digest
     def __analyze_stored_name(self, filename: str)->Tuple[Status,File]:
         result_status = FileStorageAnalyzer.Status.UNKNOWN
         result_file:File = None
@@ -26,7 +34,7 @@ class FileStorageAnalyzer:
             result_file: File = stored[0]
             if result_file.filetype == File.Type.INVALID_PDF:
                 result_status = FileStorageAnalyzer.Status.STORED_INVALID
-            elif result_file.digest != File.get_digest(filename):
+            elif result_file.digest != self.__get_digest(filename, digest_algorithm(result_file.digest)):
                 result_status = FileStorageAnalyzer.Status.MODIFIED
             else:
                 result_status = FileStorageAnalyzer.Status.STORED
@@ -34,7 +42,7 @@ class FileStorageAnalyzer:
     def __analyze_stored_digest(self, filename)->Tuple[Status,File]:
         result_status = FileStorageAnalyzer.Status.UNKNOWN
         result_file   = None
-        if stored := self.queries.find_values('digest', File.get_digest(filename)):
+        if stored := self.__find_stored_digest(filename):
             #note: there might be more than one, which is not necessarily an error!
             # files could be copied, e.g. the Aanvraag source file is copied to the FORMS directory
             for stored_file in stored:
@@ -45,7 +53,15 @@ class FileStorageAnalyzer:
                     result_status = FileStorageAnalyzer.Status.DUPLICATE
                     result_file = stored_file
         return result_status,result_file
+    def __find_stored_digest(self, filename)->list[File]:
+        # stored digests are compared within their own algorithm, current algorithm first
+        for algorithm in self.queries.digest_algorithms():
+            if stored := self.queries.find_values('digest', self.__get_digest(filename, algorithm)):
+                return stored
+        return []
     def analyze(self, filename)->Tuple[Status,File]:        
+        if (digest := self.queries.prefetched_digests.get(filename)) is not None:
+            self._digests[current_digest_algorithm()] = digest
         status,stored = self.__analyze_stored_name(filename)
         if status == FileStorageAnalyzer.Status.UNKNOWN:
             status,stored = self.__analyze_stored_digest(filename)
@@ -56,8 +72,22 @@ class FilesQueries(CRUDQueries):
     def __init__(self, crud: CRUD):
         super().__init__(crud)
         self.known_files:list[File] = None 
+        self.prefetched_digests: dict[str,str] = {} # see prefetch_digests
     def analyze(self, filename: str)->Tuple[FileStorageAnalyzer.Status,File]:
         return FileStorageAnalyzer(self).analyze(str(filename))
+    def digest_algorithms(self)->list[str]:
+        """ the algorithms to look for stored digests (see general.filehash): the current algorithm, then the default (untagged) algorithm. """
+        current = current_digest_algorithm()
+        return [current] if current == DEFAULT_ALGORITHM else [current, DEFAULT_ALGORITHM]
+    def prefetch_digests(self, filenames: Iterable[str|Path])->dict[str,str]:
+        """ computes the digests (current algorithm) of a batch of files in parallel, see hash_many.
+        
+            analyze uses these digests until clear_prefetched_digests is called at the end of the batch.
+        """
+        self.prefetched_digests = hash_many(filenames)
+        return self.prefetched_digests
+    def clear_prefetched_digests(self):
+        self.prefetched_digests = {}
     def is_known_file(self, filename: str)->bool:
         return self.find_ids_where(where_attributes=['filename', 'filetype'], where_values=[filename,File.Type.valid_file_types()]) != []
     def files_in_directory(self, directory: str)->list[File]:
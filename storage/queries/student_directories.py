@@ -20,9 +20,9 @@ class StudentDirectoriesQueries(CRUDQueries):
     def find_student_mijlpaal_dir(self, student: Student, mijlpaal_type: MijlpaalType, kans: int = 0)->list[MijlpaalDirectory]:
         if student_directory := self.find_student_dir(student):
             if kans:
-                return list(filter(lambda mp_dir: mp_dir.mijlpaal_type == mijlpaal_type and mp_dir.kans==kans, student_directory.directories))
+                return list(filter(lambda mp_dir: mp_dir.kans==kans, student_directory.get_directories(mijlpaal_type, sorted=False)))
             else:
-                return list(filter(lambda mp_dir: mp_dir.mijlpaal_type == mijlpaal_type, student_directory.directories))
+                return student_directory.get_directories(mijlpaal_type, sorted=False)
         return []
     def find_student_dir_from_directory(self, directory: str|Path)->list[StudentDirectory]:
         return self.find_values(attributes='directory', values=str(directory))
@@ -0,0 +1,66 @@
+from copy import deepcopy
+from data.classes.files import File, Files
+
+def _files()->tuple[Files,File,File]:
+    files = Files(None)
+    file1 = File('een.pdf', filetype=File.Type.UNKNOWN, id=1)
+    file2 = File('twee.pdf', filetype=File.Type.UNKNOWN)
+    files.add([file1, file2])
+    return files, file1, file2
+
+def test_contains_id():
+    files, _, file2 = _files()
+    assert files.contains_id(File('andere.pdf', id=1))
+    assert not files.contains_id(File('andere.pdf', id=2))
+    file2.id = 2 # stored after adding
+    assert files.contains_id(File('andere.pdf', id=2))
+    assert files.get_ids('files') == [1, 2]
+
+def test_remove():
+    files, file1, file2 = _files()
+    assert files.remove(file1) is file1
+    assert files.as_list('files') == [file2]
+    assert not files.contains_id(file1)
+    assert files.remove(file1) is None
+    assert files.nr_items() == 1
+
+def test_is_equal():
+    files, _, _ = _files()
+    copied = deepcopy(files)
+    assert files.is_equal(copied)
+    copied.as_list('files')[0].digest = 'anders'
+    assert not files.is_equal(copied)
+    copied.remove(copied.as_list('files')[0])
+    assert not files.is_equal(copied)
+
+def test_loader():
+    files = Files(None)
+    loaded = []
+    def loader(aggregator: Files):
+        loaded.append(aggregator)
+        aggregator.add(File('geladen.pdf', filetype=File.Type.UNKNOWN, id=3))
+    files.set_loader(loader)
+    assert not files.is_loaded and not loaded
+    assert files.get_ids('files') == [3]
+    assert files.is_loaded and loaded == [files]
+    files.add(File('nieuw.pdf', filetype=File.Type.UNKNOWN, id=4))
+    assert files.nr_items() == 2 and len(loaded) == 1
+
+def test_id_changed():
+    files, file1, file2 = _files()
+    file2.id = 2
+    assert files.contains_id(File('andere.pdf', id=2))
+    file1.id = 3 # e.g. CRUDQueries.check_already_there
+    file2.id = 1
+    assert files.contains_id(File('andere.pdf', id=3))
+    assert not files.contains_id(File('andere.pdf', id=2))
+    assert files.remove(file2) is file2
+    assert not files.contains_id(File('andere.pdf', id=1))
+
+def test_contains():
+    files, file1, file2 = _files()
+    assert files.contains(file1) and files.contains(file2)
+    assert files.contains(File('een.pdf', filetype=File.Type.UNKNOWN, id=1))
+    assert files.contains(File('twee.pdf', filetype=File.Type.UNKNOWN, id=5)) # file2 has no id yet
+    assert not files.contains(File('een.pdf', filetype=File.Type.UNKNOWN, id=5))
+    assert files.contains(File('een.pdf', filetype=File.Type.UNKNOWN))
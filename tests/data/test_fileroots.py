@@ -0,0 +1,37 @@
+from database.aapa_database import FileRootTableDefinition, create_roots, load_roots
+from database.classes.database import Database
+from data.general.roots import BASEPATH, Roots
+
+def _database(tmp_path)->Database:
+    database = Database(str(tmp_path.joinpath('test.db')), _reset_flag=True)
+    database.create_table(FileRootTableDefinition())
+    database.commit()
+    return database
+
+def test_create_load_roots(tmp_path):
+    database = _database(tmp_path)
+    Roots.reset_roots()
+    base = Roots.get_onedrive_root().joinpath(BASEPATH)
+    Roots.add_roots([(base.joinpath('een'), None), (base.joinpath('een', 'twee'), None), (base.joinpath('drie'), None)])
+    roots = Roots.get_roots()
+    create_roots(database)
+    assert len(database._execute_sql_command('select * from FILEROOT', [], True)) == 4
+    Roots.reset_roots()
+    load_roots(database)
+    assert Roots.get_roots() == roots
+    assert Roots.decode_path(Roots.encode_path(base.joinpath('een', 'twee', 'file.pdf'))) == str(base.joinpath('een', 'twee', 'file.pdf'))
+
+def test_load_nested_roots(tmp_path):
+    database = _database(tmp_path)
+    Roots.reset_roots()
+    base = Roots.get_onedrive_root().joinpath(BASEPATH)
+    nested = [base.joinpath('2023-2024'), base.joinpath('2023-2024', 'Beoordelen'), base.joinpath('2023-2024', 'Beoordelen', 'Verslagen')]
+    codes = [Roots.add_root(root) for root in nested]
+    filename = nested[-1].joinpath('student', 'x.pdf')
+    encoded = Roots.encode_path(filename)
+    assert encoded == str(filename).replace(str(nested[-1]), codes[-1])
+    create_roots(database)
+    Roots.reset_roots()
+    load_roots(database)
+    assert Roots.encode_path(filename) == encoded
+    assert Roots.decode_path(encoded) == str(filename)
@@ -0,0 +1,48 @@
+import datetime
+from data.classes.files import File
+from data.classes.studenten import Student
+from data.classes.verslagen import Verslag
+from data.general.const import MijlpaalType
+from general.timeutil import TSC
+
+def test_lazy_digest_and_timestamp(tmp_path, monkeypatch):
+    filename = tmp_path.joinpath('file.pdf')
+    filename.write_text('content')
+    calls = []
+    monkeypatch.setattr(File, 'get_digest', staticmethod(lambda filename: calls.append(filename) or 'digest'))
+    file = File(filename)
+    assert calls == []
+    assert file.digest == 'digest'
+    assert file.digest == 'digest'
+    assert len(calls) == 1
+    assert isinstance(file.timestamp, datetime.datetime)
+def test_known_digest_and_timestamp(tmp_path, monkeypatch):
+    filename = tmp_path.joinpath('file.pdf')
+    filename.write_text('content')
+    monkeypatch.setattr(File, 'get_digest', staticmethod(lambda filename: 1/0))
+    timestamp = datetime.datetime(2024,3,1,12,0,0)
+    file = File(filename, timestamp=timestamp, digest='stored')
+    assert file.digest == 'stored'
+    assert file.timestamp == timestamp
+def test_prefetch_digests(tmp_path, monkeypatch):
+    filenames = [tmp_path.joinpath(f'file_{n}.pdf') for n in range(3)]
+    for n,filename in enumerate(filenames):
+        filename.write_text(f'content {n}')
+    files = [File(filename) for filename in filenames]
+    files[2].digest = 'stored'
+    hashed = []
+    monkeypatch.setattr('data.classes.files.hash_many', lambda filenames: hashed.extend(filenames) or {filename: 'hashed' for filename in filenames})
+    File.prefetch_digests(files, {str(filenames[0]): 'prefetched'})
+    assert [file.digest for file in files] == ['prefetched', 'hashed', 'stored']
+    assert hashed == [str(filenames[1])]
+def test_missing_file():
+    file = File('does_not_exist.pdf')
+    assert file.digest == File.AUTODIGEST
+    assert file.timestamp == TSC.AUTOTIMESTAMP
+
+def test_compact():
+    assert not hasattr(File('een.pdf'), '__dict__')
+    verslag = Verslag(MijlpaalType.PVA, Student('Een Student'), datum=None)
+    assert verslag.files_list == [] and verslag._files is None # files created on first access
+    verslag.files.add(File('een.pdf'))
+    assert len(verslag.files_list) == 1
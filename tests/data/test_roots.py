@@ -104,3 +104,12 @@ def test_expanded():
     
     assert Roots.get_expanded(':ROOT2:') == Roots.decode_path(':ROOT2:')
     assert Roots.get_expanded(':ROOT3:') == Roots.decode_path(':ROOT3:')
+
+def test_cache_invalidated_by_add():
+    Roots.reset_roots()
+    cached = onedrive_base.joinpath('cached')
+    assert Roots.encode_path(cached.joinpath('dinges')) == Roots.encode_path(cached.joinpath('dinges')) # second call from cache
+    new_code = Roots.add_root(cached)
+    assert Roots.encode_path(cached) == new_code
+    assert Roots.encode_path(cached.joinpath('dinges')).startswith(new_code)
+    assert Roots.decode_path(Roots.encode_path(cached.joinpath('dinges'))) == str(cached.joinpath('dinges'))
@@ -0,0 +1,41 @@
+import datetime
+from data.classes.files import File
+from data.classes.mijlpaal_directories import MijlpaalDirectory
+from data.classes.student_directories import StudentDirectory
+from data.classes.studenten import Student
+from data.classes.verslagen import Verslag
+from data.general.const import MijlpaalType
+
+def _student_directory()->tuple[StudentDirectory,Verslag]:
+    student = Student(full_name='Jan Jansen', stud_nr='1234567')
+    stud_dir = StudentDirectory(student, 'Jan Jansen')
+    for n,datum in enumerate([datetime.datetime(2024,3,1), datetime.datetime(2024,1,1)]):
+        mp_dir = MijlpaalDirectory(MijlpaalType.PVA, f'Jan Jansen/PVA {n}', datum)
+        verslag = Verslag(MijlpaalType.PVA, student, datum)
+        verslag.files.add(File(f'Jan Jansen/PVA {n}/Plan van Aanpak.pdf', filetype=File.Type.PVA, mijlpaal_type=MijlpaalType.PVA, id=n+1))
+        mp_dir.register_mijlpaal(verslag)
+        stud_dir.add(mp_dir)
+    return stud_dir, verslag
+
+def test_get_directories():
+    stud_dir, _ = _student_directory()
+    assert [mp_dir.directory for mp_dir in stud_dir.get_directories(MijlpaalType.PVA)] == ['Jan Jansen/PVA 1', 'Jan Jansen/PVA 0']
+    assert [mp_dir.directory for mp_dir in stud_dir.get_directories(MijlpaalType.PVA, sorted=False)] == ['Jan Jansen/PVA 0', 'Jan Jansen/PVA 1']
+    assert stud_dir.get_directories(MijlpaalType.AANVRAAG) == []
+    assert stud_dir.get_directory(datetime.datetime(2024,1,1,10,0,0), MijlpaalType.PVA).directory == 'Jan Jansen/PVA 1'
+    stud_dir.add(MijlpaalDirectory(MijlpaalType.PVA, 'Jan Jansen/PVA 2', datetime.datetime(2023,12,1)))
+    assert stud_dir.get_directories(MijlpaalType.PVA)[0].directory == 'Jan Jansen/PVA 2'
+    assert stud_dir.get_filename_directory('JAN JANSEN/pva 2/nieuw.pdf').directory == 'Jan Jansen/PVA 2'
+
+def test_find_file():
+    stud_dir, verslag = _student_directory()
+    assert len(stud_dir.get_files()) == 2
+    file = stud_dir.find_file('jan jansen/pva 1/PLAN VAN AANPAK.pdf')
+    assert file.id == 2 and stud_dir.get_file_directory(file).directory == 'Jan Jansen/PVA 1'
+    assert stud_dir.find_file('Jan Jansen/PVA 1/Verslag.pdf') is None
+    new_file = File('Jan Jansen/PVA 1/Verslag.pdf', filetype=File.Type.PVA, mijlpaal_type=MijlpaalType.PVA, id=3)
+    verslag.files.add(new_file)
+    assert stud_dir.find_file('Jan Jansen/PVA 1/verslag.pdf') is new_file
+    verslag.files.remove(file)
+    assert stud_dir.find_file(file.filename) is None
+    assert len(stud_dir.get_files()) == 2
@@ -0,0 +1,21 @@
+from database.classes.database import DEFAULT_PROFILE, Database
+
+def _pragma(database: Database, pragma: str):
+    return database._execute_sql_command(f'pragma {pragma}', return_values=True)[0][0]
+
+def test_performance_profile(tmp_path):
+    database = Database(str(tmp_path.joinpath('test.db')), _reset_flag=True, profile='performance')
+    assert database.profile == 'performance'
+    assert _pragma(database, 'journal_mode') == 'wal'
+    assert _pragma(database, 'synchronous') == 1 # NORMAL
+    assert _pragma(database, 'temp_store') == 2 # MEMORY
+    database.close()
+def test_safe_profile(tmp_path):
+    database = Database(str(tmp_path.joinpath('test.db')), _reset_flag=True, profile='safe')
+    assert _pragma(database, 'journal_mode') == 'delete'
+    assert _pragma(database, 'synchronous') == 2 # FULL
+    database.close()
+def test_unknown_profile(tmp_path):
+    database = Database(str(tmp_path.joinpath('test.db')), _reset_flag=True, profile='turbo')
+    assert database.profile == DEFAULT_PROFILE
+    database.close()
@@ -0,0 +1,41 @@
+import sqlite3
+import pytest
+from database.classes.database import Database
+
+def _database(tmp_path)->Database:
+    database = Database(str(tmp_path.joinpath('test.db')), _reset_flag=True)
+    database._execute_sql_command('create table T(x int)')
+    database.commit()
+    return database
+def _stored(tmp_path)->list[int]:
+    with sqlite3.connect(str(tmp_path.joinpath('test.db'))) as connection:
+        return [row[0] for row in connection.execute('select x from T order by x')]
+
+def test_savepoint_release(tmp_path):
+    database = _database(tmp_path)
+    with database.savepoint():
+        database._execute_sql_command('insert into T values(1)')
+    assert database.connection.in_transaction
+    assert _stored(tmp_path) == []
+    database.commit()
+    assert _stored(tmp_path) == [1]
+def test_savepoint_rollback(tmp_path):
+    database = _database(tmp_path)
+    with database.savepoint():
+        database._execute_sql_command('insert into T values(1)')
+    with pytest.raises(ValueError):
+        with database.savepoint():
+            database._execute_sql_command('insert into T values(2)')
+            with database.savepoint():
+                database._execute_sql_command('insert into T values(3)')
+            raise ValueError
+    database.commit()
+    assert _stored(tmp_path) == [1]
+def test_savepoint_postpones_commit(tmp_path):
+    database = _database(tmp_path)
+    with database.savepoint():
+        database._execute_sql_command('insert into T values(1)')
+        database.commit()
+        assert _stored(tmp_path) == []
+    database.commit()
+    assert _stored(tmp_path) == [1]
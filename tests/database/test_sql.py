@@ -1,6 +1,6 @@
 import pytest
 import database.classes.dbConst as dbc
-from database.classes.sql_table import SQLTablebase, SQLcreateTable, SQLdelete, SQLdropTable, SQLinsert, SQLselect, SQLupdate
+from database.classes.sql_table import SQLTablebase, SQLcreateIndex, SQLcreateTable, SQLdelete, SQLdropTable, SQLinsert, SQLselect, SQLupdate
 from database.classes.sql_expr import Ops, SQE
 from database.classes.table_def import TableDefinition
 
@@ -187,32 +187,35 @@ def test_insert_columns_partial6():
     assert sql.parameters == [NUMBER2, STRING1]
 
 #CreateIndex:
-#NO LONGER NEEDED, gebruik IndexDefinition
-# TODO: should be added to unittests
-# def test_create_index_simple():
-#     INDEX = 'index1'
-#     TD = TableDefinition(TEST)
-#     TD.add_column(COLUMN1, dbc.INTEGER)
-#     TD.add_column(COLUMN2, dbc.TEXT)
-#     TD.add_column(COLUMN3, dbc.REAL)
-#     sql = SQLcreateIndex(TD, INDEX, column=COLUMN1)
-#     assert sql.query == f'CREATE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1});'
-# def test_create_index_simple_unique():
-#     INDEX = 'index1'
-#     TD = TableDefinition(TEST)
-#     TD.add_column(COLUMN1, dbc.INTEGER)
-#     TD.add_column(COLUMN2, dbc.TEXT)
-#     TD.add_column(COLUMN3, dbc.REAL)
-#     sql = SQLcreateIndex(TD, INDEX, column=COLUMN1, unique=True)
-#     assert sql.query == f'CREATE UNIQUE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1});'
-# def test_create_index_multiple():
-#     INDEX = 'index1'
-#     TD = TableDefinition(TEST)
-#     TD.add_column(COLUMN1, dbc.INTEGER)
-#     TD.add_column(COLUMN2, dbc.TEXT)
-#     TD.add_column(COLUMN3, dbc.REAL)
-#     sql = SQLcreateIndex(TD, INDEX, columns=[COLUMN1, COLUMN2])
-#     assert sql.query == f'CREATE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1},{COLUMN2});'
+def _index_table():
+    TD = TableDefinition(TEST)
+    TD.add_column(COLUMN1, dbc.INTEGER)
+    TD.add_column(COLUMN2, dbc.TEXT)
+    TD.add_column(COLUMN3, dbc.REAL)
+    return TD
+def test_create_index_simple():
+    INDEX = 'index1'
+    TD = _index_table()
+    TD.add_index(INDEX, COLUMN1)
+    sql = SQLcreateIndex(TD, TD.indexes[0])
+    assert sql.query == f'CREATE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1});'
+def test_create_index_simple_unique():
+    INDEX = 'index1'
+    TD = _index_table()
+    TD.add_index(INDEX, COLUMN1, unique=True)
+    sql = SQLcreateIndex(TD, TD.indexes[0])
+    assert sql.query == f'CREATE UNIQUE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1});'
+def test_create_index_multiple():
+    INDEX = 'index1'
+    TD = _index_table()
+    TD.add_index(INDEX, [COLUMN1, COLUMN2])
+    sql = SQLcreateIndex(TD, TD.indexes[0])
+    assert sql.query == f'CREATE INDEX IF NOT EXISTS {INDEX} ON {TEST}({COLUMN1},{COLUMN2});'
+def test_create_table_without_indexes():
+    TD = _index_table()
+    TD.add_index('index1', COLUMN1)
+    assert not 'INDEX' in SQLcreateTable(TD).query
+    assert 'INDEX' in SQLcreateTable(TD, include_indexes=True).query
 # def test_create_index_multiple_unique():
 #     INDEX = 'index1'
 #     TD = TableDefinition(TEST)
@@ -0,0 +1,71 @@
+import database.classes.dbConst as dbc
+from database.classes.database import Database
+from database.classes.sql_cache import SQLStatementCache, SQLparameter, flat_values
+from database.classes.sql_table import SQLdelete, SQLinsert, SQLselect, SQLupdate
+from database.classes.sql_expr import Ops, SQE
+from database.classes.table_def import TableDefinition
+
+TEST = 'test'
+COLUMN1 = 'COLUMN1'
+COLUMN2 = 'COLUMN2'
+NUMBER1 = 42
+NUMBER2 = 9801
+
+def _table():
+    TD = TableDefinition(TEST)
+    TD.add_column(COLUMN1, dbc.INTEGER, primary = True)
+    TD.add_column(COLUMN2, dbc.TEXT)
+    return TD
+
+def test_cache_get_template():
+    TD = _table()
+    cache = SQLStatementCache(maxsize=2)
+    built = []
+    def build(values):
+        built.append(values)
+        return SQLselect(TD, where=SQE(COLUMN1, Ops.EQ, values[0]))
+    template = cache.get_template(('select', TEST), build, [NUMBER1])
+    assert template.query == f'SELECT * FROM {TEST}\nWHERE ({COLUMN1} = ?);'
+    assert cache.get_template(('select', TEST), build, [NUMBER2]) is template
+    assert template.parameters([NUMBER2]) == [NUMBER2]
+    assert len(built) == 1 and isinstance(built[0][0], SQLparameter)
+    assert cache.hits == 1 and cache.misses == 1
+def test_cache_maxsize():
+    TD = _table()
+    cache = SQLStatementCache(maxsize=2)
+    for key in ['a', 'b', 'a', 'c']:
+        cache.get_template(key, lambda values: SQLdelete(TD, where=SQE(COLUMN1, Ops.EQ, values[0])), [NUMBER1])
+    assert len(cache) == 2
+    cache.get_template('a', lambda values: 1/0, [NUMBER1])
+    assert cache.misses == 3
+def test_cache_disabled():
+    TD = _table()
+    cache = SQLStatementCache()
+    cache.enabled = False
+    for _ in range(2):
+        cache.get_template('a', lambda values: SQLdelete(TD, where=SQE(COLUMN1, Ops.EQ, values[0])), [NUMBER1])
+    assert len(cache) == 0
+def test_parameter_order():
+    TD = _table()
+    cache = SQLStatementCache()
+    values = ['x', NUMBER1]
+    template = cache.get_template('update', lambda values: SQLupdate(TD, columns=[COLUMN2], values=values[:1], where=SQE(COLUMN1, Ops.EQ, values[1])), values)
+    assert template.query == f'UPDATE {TEST} SET {COLUMN2}=?\nWHERE ({COLUMN1} = ?);'
+    assert template.parameters(values) == ['x', NUMBER1]
+    # parameters in another order than the values
+    template = cache.get_template('reversed', lambda values: SQLselect(TD, where=SQE(SQE(COLUMN1, Ops.EQ, values[1]), Ops.AND, SQE(COLUMN2, Ops.EQ, values[0]))), values)
+    assert template.parameters(values) == [NUMBER1, 'x']
+def test_in_clause():
+    values = [[NUMBER1, NUMBER2], 'x']
+    assert flat_values(values) == [NUMBER1, NUMBER2, 'x']
+    template = SQLStatementCache().get_template('in', lambda values: SQLselect(_table(), where=Database._where_template([COLUMN1, COLUMN2], values)), values)
+    assert template.query == f'SELECT * FROM {TEST}\nWHERE (({COLUMN1} IN (?,?)) AND ({COLUMN2} = ?));'
+    assert template.parameters(flat_values(values)) == [NUMBER1, NUMBER2, 'x']
+    assert Database._where_signature([COLUMN1, COLUMN2], values) != Database._where_signature([COLUMN1, COLUMN2], [[NUMBER1], 'x'])
+def test_insert_update_delete():
+    TD = _table()
+    assert SQLinsert(TD, columns=[COLUMN1, COLUMN2], values=[NUMBER1, 'x']).query == f'INSERT INTO {TEST} ({COLUMN1},{COLUMN2}) VALUES(?,?);'
+    sql = SQLupdate(TD, columns=[COLUMN2], values=['x'], where=SQE(COLUMN1, Ops.EQ, NUMBER1))
+    assert sql.query == f'UPDATE {TEST} SET {COLUMN2}=?\nWHERE ({COLUMN1} = ?);'
+    assert sql.parameters == ['x', NUMBER1]
+    assert SQLdelete(TD, where=SQE(COLUMN1, Ops.EQ, NUMBER1)).query == f'DELETE FROM {TEST}\nWHERE ({COLUMN1} = ?);'
@@ -0,0 +1,17 @@
+from database.classes.sql_stats import StatementStatistics
+
+def test_normalize():
+    assert StatementStatistics._normalize('SELECT * FROM T\nWHERE (id IN (?,?,?));') == 'SELECT * FROM T WHERE (id IN (?,...));'
+    assert StatementStatistics._normalize('SELECT * FROM T WHERE (id = ?);') == 'SELECT * FROM T WHERE (id = ?);'
+def test_record_and_top():
+    stats = StatementStatistics()
+    stats.slow_query_seconds = 1000
+    stats.record('SELECT * FROM T WHERE (id IN (?,?));', 0.5, rows=2)
+    stats.record('SELECT * FROM T WHERE (id IN (?,?,?));', 0.25, rows=3)
+    stats.record('DELETE FROM T WHERE (id = ?);', 0.1)
+    top = stats.top(1)
+    assert len(top) == 1
+    assert top[0].statement == 'SELECT * FROM T WHERE (id IN (?,...));'
+    assert top[0].count == 2 and top[0].rows == 5
+    assert top[0].total_time == 0.75 and top[0].max_time == 0.5
+    assert len(stats.top(10)) == 2
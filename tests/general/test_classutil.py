@@ -0,0 +1,30 @@
+import sys
+import types
+from debug.debug import DebugConfig, _ModuleInfo
+from general.classutil import find_calling_module
+
+def _fake_logger_module()->types.ModuleType:
+    module = types.ModuleType('fake.logger')
+    exec('from general.classutil import find_calling_module\n'
+         'def debug(): return find_calling_module(__name__)\n'
+         'def log_debug(): return debug()\n', module.__dict__)
+    return module
+
+def test_find_calling_module():
+    logger = _fake_logger_module()
+    assert logger.debug() == __name__
+    assert logger.log_debug() == __name__
+def test_find_calling_module_not_on_stack():
+    assert find_calling_module('not.on.stack') == ''
+def test_frame_is_enabled_cached(monkeypatch):
+    debug_config = DebugConfig()
+    monkeypatch.setattr(debug_config, 'info', _ModuleInfo())
+    monkeypatch.setattr(debug_config, '_enabled_cache', {})
+    monkeypatch.setattr(debug_config, '_code_cache', {})
+    debug_config.info.add(__name__, False)
+    frame = sys._getframe(0)
+    assert not debug_config.frame_is_enabled(frame, 'fake.logger')
+    calls = []
+    monkeypatch.setattr(debug_config, 'module_is_enabled', lambda module_name: calls.append(module_name) or True)
+    assert not debug_config.frame_is_enabled(frame, 'fake.logger')
+    assert calls == []
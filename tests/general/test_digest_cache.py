@@ -0,0 +1,28 @@
+from general.digest_cache import DigestCache, init_config
+from main.config import config
+
+def test_digest_cache(tmp_path):
+    cache = DigestCache(tmp_path.joinpath('digests.db'))
+    cache.enabled = True
+    filename = str(tmp_path.joinpath('file.pdf'))
+    assert cache.get(filename, 'sha3_256', 10, 1000) is None
+    cache.put(filename, 'sha3_256', 10, 1000, 'abcdef')
+    assert cache.get(filename, 'sha3_256', 10, 1000) == 'abcdef'
+    assert cache.get(filename.upper(), 'sha3_256', 10, 1000) == 'abcdef'
+    assert cache.get(filename, 'sha3_256', 11, 1000) is None
+    assert cache.get(filename, 'sha3_256', 10, 1001) is None
+    cache.put(filename, 'sha3_256', 11, 1001, '123456')
+    assert cache.get(filename, 'sha3_256', 10, 1000) is None
+    assert cache.get(filename, 'blake2b', 11, 1001) is None
+    cache.close()
+    cache = DigestCache(tmp_path.joinpath('digests.db'))
+    cache.enabled = True
+    assert cache.get(filename, 'sha3_256', 11, 1001) == '123456'
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+
+def test_cache_switched_off(monkeypatch):
+    monkeypatch.setitem(config._parser['digests'], 'cache', 'False')
+    init_config()
+    assert config.get('digests', 'cache') is False
+    assert not DigestCache().enabled
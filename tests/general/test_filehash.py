@@ -0,0 +1,22 @@
+from general.digest_cache import digest_cache
+from general.filehash import digest_algorithm, hash_file_digest, hash_many
+
+def test_hash_many(tmp_path, monkeypatch):
+    monkeypatch.setattr(digest_cache, 'enabled', False)
+    files = [tmp_path.joinpath(f'file_{n}.pdf') for n in range(10)]
+    for n,file in enumerate(files):
+        file.write_text(f'content {n}')
+    digests = hash_many(files + [tmp_path.joinpath('missing.pdf')], threads=4)
+    assert len(digests) == 10
+    for file in files:
+        assert digests[str(file)] == hash_file_digest(file)
+    assert hash_many(files, threads=1) == digests
+def test_digest_algorithm(tmp_path, monkeypatch):
+    monkeypatch.setattr(digest_cache, 'enabled', False)
+    file = tmp_path.joinpath('file.pdf')
+    file.write_text('content')
+    sha3 = hash_file_digest(file, 'sha3_256')
+    blake2b = hash_file_digest(file, 'blake2b')
+    assert ':' not in sha3 and digest_algorithm(sha3) == 'sha3_256'
+    assert blake2b.startswith('blake2b:') and digest_algorithm(blake2b) == 'blake2b'
+    assert digest_algorithm('') == 'sha3_256'
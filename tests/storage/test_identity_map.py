@@ -0,0 +1,52 @@
+from data.general.aapa_class import AAPAclass
+from database.classes.dbConst import EMPTY_ID
+from storage.general.identity_map import IdentityMap
+
+class Een(AAPAclass): pass
+class Twee(AAPAclass): pass
+
+def test_add_get():
+    im = IdentityMap()
+    een = Een(id=1)
+    im.add(een)
+    assert im.get(Een, 1) is een
+    assert im.get(Twee, 1) is None
+    assert im.get(Een, 2) is None
+def test_invalid_keys():
+    im = IdentityMap()
+    im.add(Een(id=EMPTY_ID))
+    im.add(Een(id=None))
+    assert len(im) == 0
+    assert im.get(Een, [1,2]) is None
+def test_discard():
+    im = IdentityMap()
+    een = Een(id=1)
+    im.add(een)
+    im.discard_object(een)
+    assert im.get(Een, 1) is None
+    im.discard(Een, 42) # not there: no error
+def test_paused():
+    im = IdentityMap()
+    een = Een(id=1)
+    im.add(een)
+    with im.paused():
+        assert im.get(Een, 1) is None
+        with im.paused():
+            im.add(Een(id=2))
+        assert not im.contains(Een, 2)
+    assert im.get(Een, 1) is een
+def test_clear():
+    im = IdentityMap()
+    im.add(Een(id=1))
+    im.add(Twee(id=1))
+    im.clear()
+    assert len(im) == 0
+def test_invalidate():
+    im = IdentityMap()
+    een = Een(id=1)
+    im.add(een)
+    im.invalidate(een)
+    assert im.get(Een, 1) is een
+    im.invalidate(Een(id=1))
+    assert im.get(Een, 1) is None
+    im.invalidate(Een(id=2)) # not there: no error